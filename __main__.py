@@ -1,34 +1,83 @@
-import argparse
-import logging
+import sys
 
 
-parser = argparse.ArgumentParser()
-parser.add_argument(
-    '-d', '--debug', help='run CLI tool with DEBUG_MODE=TRUE', 
-    action='store_true', default=False
-    )
+def parse_args(argv=None):
+    import argparse
 
-args = parser.parse_args()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-d', '--debug', help='run CLI tool with DEBUG_MODE=TRUE',
+        action='store_true', default=False
+        )
+    parser.add_argument(
+        '-b', '--batch', metavar='INPUT',
+        help="evaluate wind/runway records from INPUT ('-' for stdin) instead of starting the shell"
+        )
+    parser.add_argument(
+        '-o', '--output', metavar='OUTPUT', default='-',
+        help="write batch results to OUTPUT (default: stdout)"
+        )
+    parser.add_argument(
+        '--in-format', choices=['csv', 'jsonl'], default=None,
+        help='batch input format (default: from INPUT extension, else csv)'
+        )
+    parser.add_argument(
+        '--out-format', choices=['csv', 'jsonl'], default=None,
+        help='batch output format (default: from OUTPUT extension, else the input format)'
+        )
+    return parser.parse_args(argv)
 
-DEBUG_MODE = args.debug
 
-log_level = logging.DEBUG if DEBUG_MODE else logging.ERROR
+def configure_logging(debug_mode):
+    import logging
 
-logger = logging.getLogger('winds')
-console_handler = logging.StreamHandler()
+    log_level = logging.DEBUG if debug_mode else logging.ERROR
 
-log_formatter = logging.Formatter(
-    '[{asctime!s}]-[{name!s}]-[{levelname!s}]: {message!s}', style='{'
-    )
-console_handler.setFormatter(log_formatter)
+    logger = logging.getLogger('winds')
+    console_handler = logging.StreamHandler()
 
-logger.addHandler(console_handler)
+    log_formatter = logging.Formatter(
+        '[{asctime!s}]-[{name!s}]-[{levelname!s}]: {message!s}', style='{'
+        )
+    console_handler.setFormatter(log_formatter)
 
-logger.setLevel(log_level)
+    logger.addHandler(console_handler)
 
+    logger.setLevel(log_level)
+    return logger
 
-from winds.shell import WindShell
 
+def run_batch(args, logger):
+    from winds.calculator import WindCalculator
+    from winds.pipeline import run_batch, guess_format
 
-shell = WindShell()
-shell.cmdloop()
+    in_fmt = args.in_format or guess_format(args.batch)
+    out_fmt = args.out_format or guess_format(args.output, default=in_fmt)
+    infile = sys.stdin if args.batch == '-' else open(args.batch, newline='')
+    outfile = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        count = run_batch(infile, outfile, WindCalculator(), in_fmt, out_fmt)
+    finally:
+        for f in (infile, outfile):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
+    logger.info(f'Evaluated {count} records')
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logger = configure_logging(args.debug)
+
+    if args.batch:
+        return run_batch(args, logger)
+
+    from winds.shell import WindShell
+
+    shell = WindShell()
+    shell.cmdloop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,505 @@
+"""
+pytest-benchmark suite for the winds library and shell.
+
+    python -m pytest benchmarks --benchmark-json=bench_output.json
+    python benchmarks/compare.py bench_output.json
+    python -m pytest benchmarks --benchmark-disable     # run every benchmark once, untimed
+"""
+import asyncio
+import io
+import random
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+import winds
+from winds import Direction, DirectionArray
+from winds import airports, magvar
+from winds.archive import ArchiveWriter, WindArchive
+from winds.cache import ObservationCache
+from winds.calculator import WindCalculator
+from winds.envelope import WindEnvelope
+from winds.fetch import MetarFetcher
+from winds.gui.viewmodel import WindCalcViewModel
+from winds.metar import MetarWind, iter_metar_winds
+from winds.monitor import WindMonitor
+from winds.parallel import backtest_airports
+from winds.shell import WindShell
+from winds.solver import WindLimits, solve_max_wind
+from winds.standin import StandInServer
+from winds.taf import TafTimeline, parse_taf
+from winds.trig import TrigTable
+from winds.units import convert_speed
+from winds.usability import WindStats
+
+BATCH_SIZE = 10000
+
+rng = random.Random(1234)
+WIND_DIRS = [rng.randrange(0, 360, 10) for _ in range(BATCH_SIZE)]
+VELOCITIES = [rng.randrange(0, 40) for _ in range(BATCH_SIZE)]
+RCAMS = [rng.randint(1, 6) for _ in range(BATCH_SIZE)]
+SPEED_UNITS = [rng.choice(['KT', 'MPS', 'KMH']) for _ in range(BATCH_SIZE)]
+
+FIXTURES = Path(__file__).resolve().parent.parent.joinpath('tests', 'fixtures')
+STATIONS = ['KJFK', 'KBOS', 'KLGA', 'KORD', 'KDEN', 'KLAX', 'KSFO', 'KMIA', 'KATL', 'EGLL']
+
+
+# scalar calls
+
+def bench_get_winds(benchmark):
+    benchmark(winds.get_winds, 230, 20, 270)
+
+
+def bench_get_headwind(benchmark):
+    benchmark(winds.get_headwind, 230, 20, 270)
+
+
+def bench_get_crosswind(benchmark):
+    benchmark(winds.get_crosswind, 230, 20, 270)
+
+
+def bench_get_winds_trig_table(benchmark):
+    winds.set_trig_table(TrigTable())
+    try:
+        benchmark(winds.get_winds, 230, 20, 270)
+    finally:
+        winds.set_trig_table(None)
+
+
+def bench_get_max_wind_velocity(benchmark):
+    benchmark(winds.get_max_wind_velocity, 10, 38, 200, 90)
+
+
+# batched calls
+
+def bench_get_winds_loop(benchmark):
+    benchmark(lambda: [winds.get_winds(w, v, 270) for w, v in zip(WIND_DIRS, VELOCITIES)])
+
+
+def bench_get_winds_batch(benchmark):
+    benchmark(winds.get_winds_batch, WIND_DIRS, VELOCITIES, 270)
+
+
+def bench_evaluate_limits_batch_rcam(benchmark):
+    benchmark(winds.evaluate_limits_batch, WIND_DIRS, VELOCITIES, 270, rcam=RCAMS)
+
+
+def bench_select_runways(benchmark):
+    benchmark(winds.select_runways, [40, 130, 220, 310], WIND_DIRS, VELOCITIES, 38, 10)
+
+
+def bench_worst_case_winds(benchmark):
+    benchmark(winds.worst_case_winds, WIND_DIRS, VELOCITIES, 30, None, None, 270)
+
+
+# grid generation
+
+@pytest.mark.parametrize('num, increment', [(2, 10), (18, 10), (180, 1), (1800, .1)])
+def bench_max_wind_grid(benchmark, num, increment):
+    benchmark(winds.max_wind_grid, 200, num, 10, 38, increment, 90)
+
+
+@pytest.mark.parametrize('num, increment', [(2, 10), (18, 10), (180, 1), (1800, .1)])
+def bench_wind_grid(benchmark, num, increment):
+    benchmark(winds.wind_grid, 200, num, 10, 38, increment, 90)
+
+
+def bench_cached_wind_grid(benchmark):
+    benchmark(winds.cached_wind_grid, 200, 2, 10, 38, 10, 90)
+
+
+@pytest.mark.parametrize('increment', [1, .1])
+def bench_envelope_build(benchmark, increment):
+    benchmark(WindEnvelope, 90, 10, 38, increment)
+
+
+def bench_envelope_window(benchmark):
+    envelope = WindEnvelope(90, 10, 38)
+    benchmark(envelope.window, 200, 2, 10)
+
+
+# Direction arithmetic
+
+def bench_direction_add(benchmark):
+    a, b = Direction(350), Direction(20)
+    benchmark(lambda: a + b)
+
+
+def bench_direction_sub(benchmark):
+    a, b = Direction(10), Direction(20)
+    benchmark(lambda: a - b)
+
+
+def bench_direction_eq(benchmark):
+    a = Direction(90.04)
+    benchmark(lambda: a == 90)
+
+
+def bench_direction_theta(benchmark):
+    a = Direction(90)
+    benchmark(a.theta, 275)
+
+
+def bench_direction_array_add(benchmark):
+    directions = DirectionArray(WIND_DIRS)
+    benchmark(lambda: directions + 15)
+
+
+# calculator and shell round trips
+
+def bench_calculator_winds(benchmark):
+    calc = WindCalculator()
+    calc.runway_heading = 270
+    benchmark(calc.winds, 230, 20)
+
+
+@pytest.mark.parametrize('line', ['winds 230 20', 'winds 230 20 30', 'grid 200 l', 'best 230 20 90 270 180',
+                                  'show'])
+def bench_shell_onecmd(benchmark, quiet, line):
+    shell = WindShell()
+    shell.onecmd('r 270')
+    benchmark(quiet, shell.onecmd, line)
+
+
+# METAR fetching against the local stand-in server (5 ms per response)
+
+@pytest.fixture(scope='module')
+def standin():
+    with StandInServer(FIXTURES, delay=.005) as server:
+        yield server
+
+
+def _fetch_reports(base_url, max_per_host, cache=None):
+    async def _run():
+        async with MetarFetcher(base_url, max_per_host=max_per_host, cache=cache) as fetcher:
+            return await fetcher.fetch_reports(STATIONS)
+
+    return asyncio.run(_run())
+
+
+@pytest.mark.parametrize('max_per_host', [1, 4])
+def bench_fetch_reports(benchmark, standin, max_per_host):
+    benchmark(_fetch_reports, standin.url, max_per_host)
+
+
+def bench_fetch_reports_cached(benchmark, standin):
+    cache = ObservationCache()
+    _fetch_reports(standin.url, 4, cache)
+    benchmark(_fetch_reports, standin.url, 4, cache)
+
+
+# archive backtesting (ten years of hourly observations)
+
+ARCHIVE_SIZE = 24 * 365 * 10
+
+
+@pytest.fixture(scope='module')
+def wind_archive(tmp_path_factory):
+    path = tmp_path_factory.mktemp('archive').joinpath('KXXX')
+    with ArchiveWriter(path) as writer:
+        for i in range(ARCHIVE_SIZE):
+            writer.append(i * 3600, winds.WindVector(WIND_DIRS[i % BATCH_SIZE], VELOCITIES[i % BATCH_SIZE]))
+    return WindArchive(path)
+
+
+def bench_archive_backtest(benchmark, wind_archive):
+    benchmark(wind_archive.backtest, 220, 10, 38)
+
+
+def bench_metar_rescan_backtest(benchmark):
+    """The same question answered by rescanning METAR text, for comparison (BATCH_SIZE reports only)."""
+    text = ''.join(f'METAR KXXX 121651Z {w:03d}{v:02d}KT 10SM FEW250 22/12 A3001\n'
+                   for w, v in zip(WIND_DIRS, VELOCITIES))
+
+    def rescan():
+        return sum(1 for _, _, wind in iter_metar_winds(io.StringIO(text))
+                   if wind.strength > winds.get_max_wind_velocity(10, 38, wind.direction.value, 220) != -1)
+
+    benchmark.pedantic(rescan, rounds=3)
+
+
+# usability statistics
+
+@pytest.fixture(scope='module')
+def wind_stats():
+    stats = WindStats()
+    stats.add_batch(WIND_DIRS, VELOCITIES)
+    return stats
+
+
+def bench_wind_stats_add_batch(benchmark):
+    benchmark(WindStats().add_batch, WIND_DIRS, VELOCITIES)
+
+
+def bench_wind_stats_add(benchmark):
+    benchmark(WindStats().add, 230, 20)
+
+
+def bench_usability_table(benchmark, wind_stats):
+    benchmark(wind_stats.usability_table, [(40, 10, 38), (130, 10, 38), (220, 10, 38), (310, 10, 38)])
+
+
+def bench_wind_rose(benchmark, wind_stats):
+    benchmark(wind_stats.wind_rose)
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def bench_backtest_airports(benchmark, wind_archive, workers):
+    sources = {f'K{i:03d}': wind_archive for i in range(8)}
+    benchmark.pedantic(backtest_airports, (sources, [(40, 10, 38), (220, 10, 38)], workers, 1 << 16), rounds=5)
+
+
+# GUI view-model: a burst of continuous slider events (16 per frame when coalescing)
+
+SLIDER_EVENTS = [i / 1000 for i in range(1000)]
+
+
+def _drive_view_model(coalesce):
+    frame = []
+    vm = WindCalcViewModel(WindCalculator(), schedule=frame.append if coalesce else None)
+    vm.subscribe(lambda changed: None)
+    for i, value in enumerate(SLIDER_EVENTS):
+        vm.dir_slider_moved(value)
+        vm.speed_slider_moved(value)
+        if frame and i % 16 == 15:
+            frame.pop()()
+    vm.flush()
+    return vm.events
+
+
+@pytest.mark.parametrize('coalesce', [False, True], ids=['per_event', 'per_frame'])
+def bench_view_model_slider_events(benchmark, coalesce):
+    events = benchmark(_drive_view_model, coalesce)
+    if benchmark.stats:  # None under --benchmark-disable
+        benchmark.extra_info['events_per_second'] = events / benchmark.stats.stats.mean
+
+
+# GUI results table: scroll a 360 row grid at 1° through the stub `ui`
+
+STUBS = Path(__file__).parent.parent.joinpath('tests', 'stubs')
+
+
+@pytest.fixture(scope='module')
+def results_table():
+    import importlib
+    import sys
+    sys.path.insert(0, str(STUBS))
+    try:
+        yield importlib.import_module('winds.gui.results'), importlib.import_module('table_harness')
+    finally:
+        sys.path.remove(str(STUBS))
+        for name in ('ui', 'winds.gui.results', 'table_harness'):
+            sys.modules.pop(name, None)
+
+
+def _unpooled_source(results, grid):
+    # the old table: a new cell and a freshly formatted line for every row scrolled into view
+    class Unpooled(results.GridResultsTableSource):
+        def tableview_cell_for_row(self, tableview, section, row):
+            cell = results.ui.TableViewCell()
+            cell.text_label.text = self.format_results_text_line(*self.items[row])
+            return cell
+
+    source = Unpooled()
+    source.items = source.results = list(grid.items())
+    return source
+
+
+@pytest.mark.parametrize('pooled', [False, True], ids=['new_cells', 'cell_pool'])
+def bench_results_table_scroll(benchmark, results_table, pooled):
+    results, harness = results_table
+    envelope = WindEnvelope(90, 10, 38)
+    if pooled:
+        source = results.GridResultsTableSource()
+        source.load_results(results.GridResults.from_envelope(envelope, 200, 180, 1))
+    else:
+        source = _unpooled_source(results, envelope.window(200, 180, 1))
+    cells = benchmark(harness.scroll, source, 3)
+    if benchmark.stats:
+        benchmark.extra_info['cells_per_second'] = cells / benchmark.stats.stats.mean
+
+
+# units: a mixed KT/MPS/KMH batch converted to knots
+
+def _convert_rows(speeds, speed_units):
+    return [convert_speed(speed, unit) for speed, unit in zip(speeds, speed_units)]
+
+
+def bench_convert_mixed_units_per_row(benchmark):
+    benchmark(_convert_rows, VELOCITIES, SPEED_UNITS)
+
+
+def bench_convert_mixed_units_batch(benchmark):
+    benchmark(convert_speed, VELOCITIES, SPEED_UNITS)
+
+
+# runway database: open a worldwide sized database (20k airports) and look one airport up, against
+# parsing the same data from CSV
+
+@pytest.fixture(scope='module')
+def runway_data(tmp_path_factory):
+    path = tmp_path_factory.mktemp('airports')
+    source = path.joinpath('runways.csv')
+    with open(airports.DEFAULT_CSV) as bundled:
+        lines = bundled.read().splitlines()
+    for i in range(20000):
+        lines.append(f'X{i:03X},,Airport {i},{rng.uniform(-60, 70):.4f},{rng.uniform(-180, 180):.4f},100,'
+                     f'{i % 18 + 1:02d}/{i % 18 + 19:02d},{(i % 18 + 1) * 10},8000,ASPH')
+    source.write_text('\n'.join(lines) + '\n')
+    database = path.joinpath('airports.sqlite')
+    airports.build_database(source, database)
+    return source, database
+
+
+def _open_and_lookup(database):
+    with airports.AirportDatabase(database) as db:
+        return db.airport('KJFK')
+
+
+def _parse_csv_and_lookup(source):
+    import csv
+    with open(source, newline='') as fileobj:
+        return [row for row in csv.DictReader(fileobj) if row['icao'] == 'KJFK']
+
+
+@pytest.mark.parametrize('fmt', ['sqlite', 'csv'])
+def bench_runway_database_open_lookup(benchmark, runway_data, fmt):
+    source, database = runway_data
+    if fmt == 'sqlite':
+        benchmark(_open_and_lookup, database)
+    else:
+        benchmark(_parse_csv_and_lookup, source)
+
+
+def bench_runway_database_nearest(benchmark, runway_data):
+    with airports.AirportDatabase(runway_data[1]) as db:
+        benchmark(db.nearest, 40.7, -74.0, 3)
+
+
+# magnetic variation: declination at a batch of positions from the memory-mapped grid, against
+# evaluating the geomagnetic model per observation
+
+POSITIONS = ([rng.uniform(-60, 70) for _ in range(BATCH_SIZE)], [rng.uniform(-180, 180) for _ in range(BATCH_SIZE)])
+
+
+def _model_per_position(lats, lons):
+    return [magvar.model_declination(lat, lon) for lat, lon in zip(lats, lons)]
+
+
+def bench_declination_model_per_position(benchmark):
+    benchmark(_model_per_position, *POSITIONS)
+
+
+def bench_declination_grid_batch(benchmark):
+    grid = magvar.default_grid()
+    benchmark(grid.declination, *POSITIONS)
+
+
+# TAF timeline: a busy 30 hour TAF (hourly FM groups, TEMPO every 3 hours) amended 12 hours in, applied to
+# the kept timeline against rebuilding the timeline from scratch
+
+def _busy_taf(issued, start, amendment=''):
+    groups = [f'TAF{amendment} KJFK {issued:02d}0000Z {issued:02d}{start:02d}/1306 24012KT']
+    for hour in range(start + 1, 30):
+        day, hh = 12 + hour // 24, hour % 24
+        groups.append(f'FM{day:02d}{hh:02d}00 {rng.randrange(0, 360, 10):03d}{rng.randrange(5, 30):02d}KT')
+        if hour % 3 == 0:
+            groups.append(f'TEMPO {day:02d}{hh:02d}/{day:02d}{hh + 2:02d} {rng.randrange(0, 360, 10):03d}'
+                          f'{rng.randrange(15, 30)}G{rng.randrange(35, 50)}KT')
+    return parse_taf(' '.join(groups), 2019, 7)
+
+
+BUSY_TAF = _busy_taf(12, 0)
+BUSY_AMENDMENT = _busy_taf(12, 12, ' AMD')
+
+
+def _kept_timeline():
+    timeline = TafTimeline(BUSY_TAF, 224, 10, 38)
+    return (timeline, BUSY_AMENDMENT), {}
+
+
+def _rebuild_timeline(timeline, amendment):
+    timeline = TafTimeline(BUSY_TAF, 224, 10, 38)
+    return timeline.amend(amendment)
+
+
+@pytest.mark.parametrize('mode', ['incremental', 'rebuild'])
+def bench_taf_amendment(benchmark, mode):
+    target = TafTimeline.amend if mode == 'incremental' else _rebuild_timeline
+    benchmark.pedantic(target, setup=_kept_timeline, rounds=200)
+
+
+# alert monitor: 10k observations from 500 stations with two runways each, against checking the worst case
+# components of every observation on every runway, and the same stream with a 120° variable sector (dddVddd)
+# on every directional wind
+
+MONITOR_STATIONS = {f'K{i:03d}': (rng.randrange(0, 180), rng.randrange(180, 360)) for i in range(500)}
+MONITOR_STREAM = [
+    MetarWind(rng.choice(list(MONITOR_STATIONS)), '121651',
+              winds.WindVector(rng.choice([None] + list(range(0, 360, 10))), rng.randrange(0, 40),
+                         gust=rng.choice([None, None, rng.randrange(25, 50)])))
+    for _ in range(BATCH_SIZE)
+]
+MONITOR_SECTOR_STREAM = [
+    MetarWind(station, time, wind if wind.direction is None else winds.WindVector(
+        wind.direction.value, wind.strength, gust=wind.gust, variable_from=(wind.direction.value - 60) % 360,
+        variable_to=(wind.direction.value + 60) % 360))
+    for station, time, wind in MONITOR_STREAM
+]
+
+
+def _monitor():
+    mon = WindMonitor(max_cross=25, max_tail=10)
+    for station, runways in MONITOR_STATIONS.items():
+        for runway in runways:
+            mon.watch(station, runway)
+    return mon
+
+
+def _worst_case_per_observation(stream):
+    alerts = 0
+    for station, _, wind in stream:
+        direction = None if wind.direction is None else wind.direction.value
+        for runway in MONITOR_STATIONS[station]:
+            x_wind, t_wind = winds.worst_case_winds(direction, wind.strength, wind.gust, runway=runway)
+            alerts += (x_wind[0] > 25) + (t_wind[0] > 10)
+    return alerts
+
+
+@pytest.mark.parametrize('mode', ['monitor', 'monitor_sectors', 'worst_case'])
+def bench_wind_monitor_stream(benchmark, mode):
+    if mode.startswith('monitor'):
+        mon = _monitor()
+        stream = MONITOR_SECTOR_STREAM if mode == 'monitor_sectors' else MONITOR_STREAM
+        benchmark(lambda: sum(1 for _ in mon.run(stream)))
+    else:
+        benchmark(_worst_case_per_observation, MONITOR_STREAM)
+    if benchmark.stats:
+        benchmark.extra_info['observations_per_second'] = len(MONITOR_STREAM) / benchmark.stats.stats.mean
+
+
+# limit solver: max speed and binding limit for 3600 directions (0.1°) under crosswind, tailwind, headwind and
+# total limits, against the scalar functions per direction
+
+SOLVER_DIRECTIONS = [i / 10 for i in range(3600)]
+SOLVER_LIMITS = WindLimits(crosswind=38, tailwind=10, headwind=50, total=60)
+
+
+def _scalar_limits(directions):
+    out = []
+    for direction in directions:
+        velocity = winds.get_max_wind_velocity(10, 38, direction, 220)
+        headwind = winds.get_max_tailwind_velocity(50, direction, 40)
+        candidates = [v for v in (velocity, headwind, 60) if v != -1]
+        out.append(min(candidates))
+    return out
+
+
+@pytest.mark.parametrize('mode', ['vectorized', 'scalar'])
+def bench_solve_max_wind(benchmark, mode):
+    if mode == 'vectorized':
+        benchmark(solve_max_wind, SOLVER_DIRECTIONS, SOLVER_LIMITS, 220)
+    else:
+        benchmark(_scalar_limits, SOLVER_DIRECTIONS)
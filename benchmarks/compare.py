@@ -0,0 +1,105 @@
+"""
+Compare a pytest-benchmark JSON run against the stored baseline and flag regressions.
+
+    python -m pytest benchmarks --benchmark-json=bench_output.json
+    python benchmarks/compare.py bench_output.json              # exit status 1 on regressions
+    python benchmarks/compare.py bench_output.json --update     # replace the baseline
+
+Timings are machine dependent, so refresh the baseline (`--update`) when switching machines.
+"""
+import argparse
+import json
+import platform
+import sys
+from pathlib import Path
+
+BASELINE_PATH = Path(__file__).resolve().parent.joinpath('baseline.json')
+STATS = ('min', 'median', 'mean')
+DEFAULT_THRESHOLD = .25
+
+
+def load_run(path):
+    """Return {benchmark name: {stat: seconds}} from a pytest-benchmark JSON file."""
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        bench['fullname'].split('::', 1)[-1]: {stat: bench['stats'][stat] for stat in STATS}
+        for bench in data['benchmarks']
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)['benchmarks']
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    data = {
+        'machine': f'{platform.machine()} {platform.python_implementation()} {platform.python_version()}',
+        'benchmarks': dict(sorted(results.items())),
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, stat='median'):
+    """
+    Return (rows, regressions): one (name, baseline, current, ratio) row per benchmark in both runs
+    and the names whose `stat` slowed down by more than `threshold` (.25 == 25%).
+    """
+    rows, regressions = [], []
+    for name in sorted(set(baseline) & set(current)):
+        base, cur = baseline[name][stat], current[name][stat]
+        ratio = cur / base if base else float('inf')
+        rows.append((name, base, cur, ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f}{unit}'
+    return f'{seconds / 1e-9:.0f}ns'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('current', help='pytest-benchmark JSON output (--benchmark-json)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline file (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown before flagging, .25 == 25%% (default: %(default)s)')
+    parser.add_argument('--stat', choices=STATS, default='median', help='statistic to compare (default: %(default)s)')
+    parser.add_argument('--update', action='store_true', help='write the current run as the new baseline')
+    args = parser.parse_args(argv)
+
+    current = load_run(args.current)
+    if args.update:
+        save_baseline(current, args.baseline)
+        print(f'Baseline updated with {len(current)} benchmarks: {args.baseline}')
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    rows, regressions = compare(baseline, current, args.threshold, args.stat)
+    width = max((len(row[0]) for row in rows), default=10)
+    print(f'{"benchmark":<{width}}  {"baseline":>10}  {"current":>10}  {"change":>8}')
+    for name, base, cur, ratio in rows:
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f'{name:<{width}}  {format_time(base):>10}  {format_time(cur):>10}  {ratio - 1:>+8.0%}{flag}')
+    for name in sorted(set(current) - set(baseline)):
+        print(f'{name:<{width}}  (new, not in baseline)')
+    for name in sorted(set(baseline) - set(current)):
+        print(f'{name:<{width}}  (missing from current run)')
+
+    if regressions:
+        print(f'\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%} '
+              f'({args.stat})')
+        return 1
+    print(f'\nNo regressions above {args.threshold:.0%} ({args.stat})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def quiet():
+    """Return a function that calls its argument with stdout discarded."""
+    def _quiet(func, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args)
+    return _quiet
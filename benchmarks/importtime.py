@@ -0,0 +1,65 @@
+"""
+Report the import time of a module using `python -X importtime`.
+
+    python benchmarks/importtime.py                      # winds.shell, top 15 imports
+    python benchmarks/importtime.py winds --top 30
+    python benchmarks/importtime.py winds.shell --budget 150
+
+Exit status is 1 if the module's cumulative import time exceeds `--budget` milliseconds.
+"""
+import argparse
+import subprocess
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ImportTime = namedtuple('ImportTime', ['module', 'self_us', 'cumulative_us', 'depth'])
+
+
+def measure(module, python=sys.executable):
+    """
+    Return a list of ImportTime for every module imported by `import module` in a fresh interpreter.
+    """
+    proc = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    results = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        results.append(ImportTime(name.strip(), int(self_us), int(cumulative_us), depth))
+    return results
+
+
+def total_ms(results, module):
+    """Return the cumulative import time of `module` in milliseconds."""
+    return next(r.cumulative_us for r in results if r.module == module) / 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('module', nargs='?', default='winds.shell')
+    parser.add_argument('--top', type=int, default=15, help='number of slowest imports to list')
+    parser.add_argument('--budget', type=float, default=None, help='fail if the import takes longer (ms)')
+    args = parser.parse_args(argv)
+
+    results = measure(args.module)
+    total = total_ms(results, args.module)
+    print(f'import {args.module}: {total:.1f} ms cumulative, {len(results)} modules\n')
+    print(f'{"self ms":>8} {"cumul ms":>9}  module')
+    for result in sorted(results, key=lambda r: r.self_us, reverse=True)[:args.top]:
+        print(f'{result.self_us / 1000:>8.1f} {result.cumulative_us / 1000:>9.1f}  {result.module}')
+
+    if args.budget is not None and total > args.budget:
+        print(f'\nOVER BUDGET: {total:.1f} ms > {args.budget:.1f} ms')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Benchmark the lookup-table trig backend against the exact math path.
+
+Run from the repo root:
+
+    python benchmarks/trig_table.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import winds
+from winds.trig import TrigTable
+
+NUMBER = 200000
+
+CASES = [
+    ('get_winds 10° wind', 'winds.get_winds(230, 20, 270)'),
+    ('get_headwind 1° wind', 'winds.get_headwind(231, 20, 270)'),
+    ('get_crosswind 1° wind', 'winds.get_crosswind(231, 20, 270)'),
+    ('get_winds 0.5° wind', 'winds.get_winds(230.5, 20, 270)'),
+    ('get_winds off-table', 'winds.get_winds(230.37, 20, 270)'),
+]
+
+
+def run_case(stmt, table):
+    winds.set_trig_table(table)
+    try:
+        return min(timeit.repeat(stmt, globals={'winds': winds}, number=NUMBER, repeat=5))
+    finally:
+        winds.set_trig_table(None)
+
+
+def main():
+    tables = {'1°': TrigTable(), '0.1°': TrigTable(resolution=10)}
+    print(f'{"case":<24}{"math":>10}' + ''.join(f'{"table " + k:>14}{"speedup":>9}' for k in tables))
+    for name, stmt in CASES:
+        exact = run_case(stmt, None)
+        row = f'{name:<24}{exact * 1e9 / NUMBER:>8.0f}ns'
+        for table in tables.values():
+            result = run_case(stmt, table)
+            row += f'{result * 1e9 / NUMBER:>12.0f}ns{exact / result:>8.2f}x'
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def numpy_toggle(request, monkeypatch):
+    """
+    Run a test once with NumPy and once with the pure Python fallbacks.
+
+    Returns a function taking the modules whose `np` the code under test uses: on the pure Python run
+    it patches each of them to None. It returns True on the NumPy run, which is skipped when NumPy is
+    not installed.
+    """
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+
+    def toggle(*modules):
+        if request.param == 'python':
+            for module in modules:
+                monkeypatch.setattr(module, 'np', None)
+        return request.param == 'numpy'
+    return toggle
@@ -0,0 +1,8 @@
+"""
+Stand-in for the Pythonista app's local `config` module imported by `winds/gui/wind_app.py`
+"""
+
+
+class Config:
+    max_tailwind_landing = 10
+    max_tailwind_takeoff = 15
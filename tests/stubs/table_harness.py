@@ -0,0 +1,30 @@
+"""
+Headless harness that scrolls a table data source the way a TableView would
+"""
+import time
+
+VISIBLE_ROWS = 15
+
+
+def scroll(source, passes=1, visible=VISIBLE_ROWS, tableview=None):
+    """
+    Scroll from the top of the table to the bottom `passes` times, one row at a time, asking
+    `source` for every row that comes into view. Return the cells rendered.
+    """
+    rows = source.tableview_number_of_rows(tableview, 0)
+    rendered = 0
+    for _ in range(passes):
+        for row in range(min(visible, rows)):
+            source.tableview_cell_for_row(tableview, 0, row)
+            rendered += 1
+        for top in range(1, max(rows - visible + 1, 1)):
+            source.tableview_cell_for_row(tableview, 0, top + visible - 1)
+            rendered += 1
+    return rendered
+
+
+def cells_per_second(source, passes=10, visible=VISIBLE_ROWS):
+    """Return the rate at which `source` renders cells while scrolling."""
+    started = time.perf_counter()
+    rendered = scroll(source, passes, visible)
+    return rendered / (time.perf_counter() - started)
@@ -0,0 +1,107 @@
+"""
+Minimal headless stand-in for Pythonista's `ui` module, enough to drive the views in tests
+"""
+_delayed = []
+
+
+class View:
+    # subclasses (like Pythonista's own views) may skip View.__init__
+    @property
+    def subviews(self):
+        return self.__dict__.setdefault('_subviews', {})
+
+    def __getitem__(self, name):
+        return self.subviews[name]
+
+    def add_subview(self, view):
+        self.subviews[view.name] = view
+
+
+class Control:
+    def __init__(self, name=None, **kwargs):
+        self.name = name
+        self.action = None
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def fire(self):
+        self.action(self)
+
+
+class Label(Control):
+    text = ''
+
+
+class Slider(Control):
+    value = .5
+    continuous = False
+
+    def move(self, value):
+        self.value = value
+        self.fire()
+
+
+class SegmentedControl(Control):
+    segments = ()
+    selected_index = 0
+
+    def select(self, index):
+        self.selected_index = index
+        self.fire()
+
+
+class Button(Control):
+    pass
+
+
+class NavigationView(Control):
+    def __init__(self, name=None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.pushed = []
+
+    def push_view(self, view):
+        self.pushed.append(view)
+
+
+class TableViewCell:
+    def __init__(self, *args):
+        self.text_label = Label()
+
+
+class TableView(Control):
+    data_source = None
+    delegate = None
+
+    def reload(self):
+        pass
+
+
+class ListDataSource:
+    def __init__(self, items):
+        self.items = items
+
+    def reload(self):
+        pass
+
+
+def delay(func, seconds):
+    _delayed.append(func)
+
+
+def cancel_delays():
+    _delayed.clear()
+
+
+def run_delayed():
+    """Run the callbacks queued with `delay`, as the next frame would."""
+    pending = list(_delayed)
+    _delayed.clear()
+    for func in pending:
+        func()
+    return len(pending)
+
+
+def load_view(name=None):
+    view = View()
+    view.add_subview(TableView('grid_table'))
+    return view
@@ -0,0 +1,110 @@
+import random
+import sqlite3
+
+import pytest
+
+import winds
+from winds import airports
+from winds.airports import AirportDatabase, build_database, default_database, distance_nm, runway_ends
+from winds.calculator import WindCalculator
+from winds.shell import WindShell
+
+CSV = '''icao,iata,name,lat,lon,elevation_ft,runway,heading,length_ft,surface
+KAAA,AAA,Alpha,40.0,-74.0,10,04/22,44,9000,ASPH
+KAAA,AAA,Alpha,40.0,-74.0,10,13L/31R,134,7000,CONC
+KBBB,,Bravo,41.0,-74.0,200,18/36,182,5000,TURF
+PCCC,CCC,Charlie,10.0,179.5,5,09/27,90,6000,ASPH
+'''
+
+
+@pytest.fixture
+def db(tmp_path):
+    source = tmp_path.joinpath('runways.csv')
+    source.write_text(CSV)
+    assert build_database(source, tmp_path.joinpath('airports.sqlite')) == 3
+    with AirportDatabase(tmp_path.joinpath('airports.sqlite')) as database:
+        yield database
+
+
+def test_runway_ends():
+    assert runway_ends('18/36', 182) == [('18', 182.0), ('36', 2.0)]
+    with pytest.raises(ValueError):
+        runway_ends('18', 182)
+
+
+def test_lookup_by_icao_and_iata(db):
+    alpha = db.airport('KAAA')
+    assert db.airport('aaa') is alpha and db['kaaa'] is alpha
+    assert (alpha.name, alpha.lat, alpha.lon, alpha.elevation_ft) == ('Alpha', 40.0, -74.0, 10)
+    assert [(r.ident, r.heading) for r in alpha.runways] == [('04', 44), ('13L', 134), ('22', 224), ('31R', 314)]
+    assert db.airport('KBBB').iata is None
+    assert len(db) == 3 and db.idents() == ['KAAA', 'KBBB', 'PCCC']
+    assert 'CCC' in db and 'KZZZ' not in db
+    with pytest.raises(KeyError):
+        db.airport('KZZZ')
+
+
+def test_runway_lookup(db):
+    assert db.runway('KAAA', '4') == airports.Runway('04', 44.0, 9000, 'ASPH')
+    assert db.runway('kaaa', '31r').length_ft == 7000
+    with pytest.raises(KeyError):
+        db.runway('KAAA', '09')
+
+
+def test_nearest(db):
+    assert [n.airport.icao for n in db.nearest(40.1, -74.0, count=3)] == ['KAAA', 'KBBB', 'PCCC']
+    nearest = db.nearest(40.9, -74.0)[0]
+    assert nearest.airport.icao == 'KBBB'
+    assert nearest.distance_nm == pytest.approx(6, abs=.1)
+    assert db.nearest(45, -74.0, max_distance_nm=100) == []
+    # across the antimeridian
+    assert db.nearest(10.0, -179.5)[0].airport.icao == 'PCCC'
+
+
+def test_nearest_matches_brute_force():
+    database = default_database()
+    everything = [database.airport(icao) for icao in database.idents()]
+    rng = random.Random(3)
+    for _ in range(50):
+        lat, lon = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        expected = sorted(everything, key=lambda a: distance_nm(lat, lon, a.lat, a.lon))[:3]
+        assert [n.airport for n in database.nearest(lat, lon, count=3)] == expected
+
+
+def test_bundled_database_matches_csv(tmp_path):
+    rebuilt = tmp_path.joinpath('airports.sqlite')
+    build_database(airports.DEFAULT_CSV, rebuilt)
+    dump = []
+    for path in (airports.DEFAULT_DATABASE, rebuilt):
+        db = sqlite3.connect(str(path))
+        dump.append([db.execute(f'SELECT * FROM {table} ORDER BY 1, 2').fetchall() for table in ('airports', 'runways')])
+        db.close()
+    assert dump[0] == dump[1]
+
+
+def test_missing_database(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        AirportDatabase(tmp_path.joinpath('nope.sqlite'))
+
+
+def test_calculator_uses_runway_database(db):
+    calc = WindCalculator()
+    assert calc.set_runway('KAAA', '22', database=db).heading == 224
+    assert calc.runway_heading == 224
+    ranks = calc.rank_airport('AAA', 310, 20, database=db)
+    assert [rank.runway.ident for rank in ranks] == ['31R', '22', '04', '13L']
+    assert ranks[0].h_wind == pytest.approx(winds.get_headwind(310, 20, 314))
+
+
+def test_shell_airport_commands(capsys):
+    shell = WindShell()
+    shell.onecmd('r KJFK 22R')
+    assert shell.wind_calc.runway_heading == 224
+    shell.onecmd('best 310 25 JFK l')
+    out, _ = capsys.readouterr()
+    lines = out.splitlines()
+    assert lines[2].startswith('RWY 31')
+    assert lines[-1].startswith('RWY 13') and lines[-1].endswith('OVER LIMITS')
+    shell.onecmd('apt 40.7 -74')
+    out, _ = capsys.readouterr()
+    assert 'KLGA/LGA' in out
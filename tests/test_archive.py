@@ -0,0 +1,113 @@
+import io
+import random
+
+import pytest
+
+from winds import archive
+from winds.archive import ArchiveWriter, WindArchive, ingest_metars, metar_timestamp, Backtest
+from winds.winds import WindVector, get_max_wind_velocity
+
+METARS = """METAR KJFK 121651Z 24015G25KT 240V300 10SM FEW250 22/12 A3001
+METAR KJFK 121751Z VRB03KT 10SM CLR 20/10 A3002
+METAR KJFK 121851Z 31012KT 10SM FEW050 23/11 A3000
+SPECI KJFK 121912Z 04020G35KT 10SM FEW050 23/11 A3000
+METAR EGLL 121650Z 23012MPS 200V260 9999 SCT030 15/08 Q1013
+"""
+
+
+@pytest.fixture
+def jfk(tmp_path):
+    ingest_metars(io.StringIO(METARS), tmp_path, 2019, 7)
+    return WindArchive(tmp_path.joinpath('KJFK'))
+
+
+@pytest.fixture
+def random_archive(tmp_path):
+    rng = random.Random(42)
+    rows = []
+    with ArchiveWriter(tmp_path.joinpath('KXXX')) as writer:
+        for i in range(5000):
+            direction = None if rng.random() < .05 else rng.randrange(0, 360, 10)
+            speed = rng.randrange(0, 45)
+            gust = rng.choice([None, speed + rng.randrange(5, 20)])
+            rows.append((1562950000 + 3600 * i, direction, speed, gust))
+            writer.append(rows[-1][0], WindVector(direction, speed, gust=gust))
+    return WindArchive(tmp_path.joinpath('KXXX')), rows
+
+
+def brute_force(rows, runway, max_tail, max_cross, gusts=True):
+    limits = [get_max_wind_velocity(max_tail, max_cross, d, runway) for d in range(360)]
+    limits = [float('inf') if val == -1 else val for val in limits]
+    out = 0
+    for _, direction, speed, gust in rows:
+        peak = max(speed, gust or 0) if gusts else speed
+        limit = min(limits) if direction is None else limits[direction]
+        out += peak > limit
+    return out
+
+
+def test_metar_timestamp():
+    assert metar_timestamp('121651', 2019, 7) == 1562950260
+
+
+def test_ingest_writes_columns(tmp_path, jfk):
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['EGLL', 'KJFK']
+    assert len(jfk) == 4
+    assert list(jfk.direction) == [240, -1, 310, 40]
+    assert list(jfk.speed) == [15, 3, 12, 20]
+    assert list(jfk.gust) == [25, 0, 0, 35]
+    assert jfk.time[0] == 1562950260
+    assert tmp_path.joinpath('KJFK', 'time.u32').stat().st_size == 16
+    assert list(WindArchive(tmp_path.joinpath('EGLL')).speed) == [23]
+
+
+def test_backtest_counts(jfk):
+    assert jfk.backtest(220, max_tail=10, max_cross=20) == Backtest(4, 1, 1, 1562950260, 1562958720)
+    assert jfk.backtest(220, max_tail=10, max_cross=8).out_of_limits == 3
+    assert jfk.backtest(220, max_tail=10, max_cross=8, gusts=False).out_of_limits == 2
+    assert jfk.backtest(220, max_cross=2).out_of_limits == 3
+
+
+def test_backtest_time_window(jfk):
+    result = jfk.backtest(220, max_tail=10, max_cross=20, start=1562953000, end=1562958720)
+    assert (result.observations, result.first_time, result.last_time) == (2, 1562953860, 1562957460)
+
+
+@pytest.mark.parametrize('runway, max_tail, max_cross', [(220, 10, 38), (90, 15, -1), (360, -1, 20)])
+def test_backtest_matches_scalar_limits(random_archive, runway, max_tail, max_cross):
+    arc, rows = random_archive
+    result = arc.backtest(runway, max_tail, max_cross, chunk_size=999)
+    assert result.observations == len(rows)
+    assert result.vrb == sum(row[1] is None for row in rows)
+    assert result.out_of_limits == brute_force(rows, runway, max_tail, max_cross)
+
+
+def test_backtest_without_numpy(random_archive, monkeypatch):
+    arc, rows = random_archive
+    monkeypatch.setattr(archive, 'np', None)
+    arc = WindArchive(arc.directory)
+    result = arc.backtest(220, 10, 38, start=rows[100][0], chunk_size=700)
+    assert result.observations == len(rows) - 100
+    assert result.out_of_limits == brute_force(rows[100:], 220, 10, 38)
+    arc.close()
+
+
+def test_writer_appends(tmp_path):
+    for _ in range(2):
+        with ArchiveWriter(tmp_path) as writer:
+            writer.append(0, WindVector(90, 300, gust=400))
+    arc = WindArchive(tmp_path)
+    assert list(arc.speed) == [255, 255]
+
+
+def test_writer_accepts_unit_aliases(tmp_path):
+    with ArchiveWriter(tmp_path) as writer:
+        writer.append(0, WindVector(90, 10, 'KT'))
+        writer.append(0, WindVector(90, 10, 'm/s', gust=15))
+    arc = WindArchive(tmp_path)
+    assert (list(arc.speed), list(arc.gust)) == ([10, 19], [archive.NO_GUST, 29])
+
+
+def test_missing_archive(tmp_path):
+    with pytest.raises(ValueError):
+        WindArchive(tmp_path)
@@ -0,0 +1,115 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from winds.cache import ObservationCache, next_issuance
+from winds.fetch import MetarFetcher
+from winds.standin import StandInServer
+
+FIXTURES = Path(__file__).parent.joinpath('fixtures')
+T0 = 1562950000  # 2019-07-12 1646:40Z
+JFK = 'METAR KJFK 121651Z 24015G25KT 240V300 10SM FEW250 22/12 A3001'
+
+
+class Clock:
+    def __init__(self, now=T0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize('kind, fetched_at, expected', [
+    ('metar', T0, T0 + 500),
+    ('metar', T0 + 500, T0 + 500 + 3600),
+    ('metar', T0 + 501, T0 + 500 + 3600),
+    ('taf', T0, 1562952000),  # 1720Z
+], ids=['metar', 'metar at issuance', 'metar after issuance', 'taf'])
+def test_next_issuance(kind, fetched_at, expected):
+    assert next_issuance(kind, fetched_at) == expected
+
+
+def test_get_put_and_counters():
+    cache = ObservationCache(clock=Clock())
+    assert cache.get('KJFK') is None
+    cache.put('kjfk', JFK)
+    assert cache.get('KJFK') == JFK
+    assert cache.get('KJFK', 'taf') is None
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 1)
+
+
+def test_entries_expire_with_metar_cycle():
+    clock = Clock()
+    cache = ObservationCache(clock=clock)
+    cache.put('KJFK', JFK)
+    clock.now = T0 + 499
+    assert cache.get('KJFK') == JFK
+    clock.now = T0 + 500
+    assert cache.get('KJFK') is None
+    assert cache.cache_info().expirations == 1
+    assert len(cache) == 0
+
+
+def test_fixed_ttl_and_purge():
+    clock = Clock()
+    cache = ObservationCache(ttl=60, clock=clock)
+    cache.put('KJFK', JFK)
+    cache.put('KBOS', 'METAR KBOS', fetched_at=T0 + 30)
+    clock.now = T0 + 60
+    assert cache.purge_expired() == 1
+    assert ('metar', 'KJFK') not in cache
+    assert ('metar', 'KBOS') in cache
+
+
+def test_lru_eviction():
+    cache = ObservationCache(maxsize=2, clock=Clock())
+    cache.put('KJFK', JFK)
+    cache.put('KBOS', 'METAR KBOS')
+    cache.get('KJFK')
+    cache.put('KLGA', 'METAR KLGA')
+    assert cache.get('KBOS') is None
+    assert cache.get('KJFK') == JFK
+    assert cache.cache_info().evictions == 1
+
+
+def test_invalid_kind():
+    with pytest.raises(ValueError):
+        ObservationCache().put('KJFK', JFK, kind='pirep')
+
+
+def test_persists_across_sessions(tmp_path):
+    path = tmp_path.joinpath('wx.sqlite')
+    clock = Clock()
+    with ObservationCache(path, maxsize=2, clock=clock) as cache:
+        cache.put('KJFK', JFK)
+        cache.put('KBOS', 'METAR KBOS')
+        cache.put('KLGA', 'METAR KLGA')
+        cache.get('KBOS')
+
+    with ObservationCache(path, maxsize=1, clock=clock) as cache:
+        assert cache.get('KBOS') == 'METAR KBOS'
+        assert len(cache) == 1
+
+    clock.now = T0 + 3600
+    with ObservationCache(path, clock=clock) as cache:
+        assert len(cache) == 0
+
+
+def test_fetcher_serves_repeats_from_cache():
+    cache = ObservationCache()
+
+    async def _run(base_url):
+        async with MetarFetcher(base_url, cache=cache) as fetcher:
+            first = await fetcher.fetch_reports(['KJFK', 'KLGA'])
+            second = await fetcher.fetch_reports(['KJFK', 'KLGA'])
+            return first, second
+
+    with StandInServer(FIXTURES) as server:
+        first, second = asyncio.run(_run(server.url))
+        assert server.requests == 4
+    assert first == second
+    assert second['KLGA'].taf is None
+    assert first['KJFK'].wind is second['KJFK'].wind
+    assert cache.cache_info().hits == 4
@@ -0,0 +1,110 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from winds.fetch import MetarFetcher, ConnectionPool, HTTPStatusError, fetch_winds
+from winds.standin import StandInServer, load_fixtures
+from winds.winds import WindVector
+
+FIXTURES = Path(__file__).parent.joinpath('fixtures')
+STATIONS = ['KJFK', 'KBOS', 'KLGA', 'KORD', 'KDEN', 'KLAX', 'KSFO', 'KMIA', 'KATL', 'EGLL']
+
+
+@pytest.fixture(scope='module')
+def server():
+    with StandInServer(FIXTURES) as server:
+        yield server
+
+
+def fetch(coro_func, base_url, **kwargs):
+    async def _run():
+        async with MetarFetcher(base_url, **kwargs) as fetcher:
+            return await coro_func(fetcher), fetcher.pool.connections_opened
+
+    return asyncio.run(_run())
+
+
+def test_load_fixtures():
+    fixtures = load_fixtures(FIXTURES)
+    assert fixtures['metar', 'KJFK'].startswith('METAR KJFK')
+    assert ('taf', 'KBOS') in fixtures
+
+
+def test_fetch_all_reuses_pooled_connections(server):
+    reports, opened = fetch(lambda f: f.fetch_all(STATIONS * 3), server.url, max_per_host=2)
+    assert len(reports) == len(STATIONS)
+    assert reports['KJFK'].startswith('METAR KJFK 121651Z')
+    assert opened <= 2
+
+
+def test_fetch_missing_station_returns_none(server):
+    report, _ = fetch(lambda f: f.fetch('ZZZZ'), server.url)
+    assert report is None
+
+
+def test_fetch_reports_parses_winds(server):
+    reports, _ = fetch(lambda f: f.fetch_reports(['kjfk', 'KBOS', 'KPHX', 'KATL']), server.url)
+    assert reports['KJFK'].wind == WindVector(240, 15, gust=25, variable_from=240, variable_to=300)
+    assert reports['KJFK'].taf.startswith('TAF KJFK')
+    assert reports['KBOS'].wind == WindVector(None, 3)
+    assert reports['KPHX'].wind is None
+    assert reports['KPHX'].taf is None
+    assert reports['KATL'].wind.to_tuple() == (0, 0)
+
+
+def test_fetch_winds_feeds_calculator(server):
+    from winds.calculator import WindCalculator
+
+    wind = fetch_winds(['EGLL'], base_url=server.url)['EGLL']
+    assert wind == WindVector(230, 12, 'mps', variable_from=200, variable_to=260)
+    calc = WindCalculator()
+    calc.runway_heading = 270
+    assert calc.winds(*wind.to_tuple()).x_wind == pytest.approx(-7.713, abs=1e-3)
+
+
+def test_fetch_retries_with_backoff():
+    with StandInServer(FIXTURES, fail_first=2) as server:
+        report, _ = fetch(lambda f: f.fetch('KJFK'), server.url, retries=2, backoff=.01)
+        assert report.startswith('METAR KJFK')
+        assert server.requests == 3
+
+
+def test_fetch_gives_up_after_retries():
+    with StandInServer(FIXTURES, fail_first=10) as server:
+        with pytest.raises(HTTPStatusError) as info:
+            fetch(lambda f: f.fetch('KJFK'), server.url, retries=1, backoff=.01)
+        assert info.value.status == 503
+        assert server.requests == 2
+
+
+def test_fetch_times_out():
+    with StandInServer(FIXTURES, delay=.5) as server:
+        with pytest.raises(TimeoutError):
+            fetch(lambda f: f.fetch('KJFK'), server.url, timeout=.05, retries=0)
+
+
+def test_pool_limits_concurrency_per_host():
+    with StandInServer(FIXTURES, delay=.05) as server:
+        _, opened = fetch(lambda f: f.fetch_all(STATIONS), server.url, max_per_host=3)
+        assert opened == 3
+        assert server.connections == 3
+
+
+def test_pool_replaces_connection_closed_by_server(server):
+    async def _run():
+        async with ConnectionPool() as pool:
+            first = await pool.get(f'{server.url}/metar?ids=KJFK')
+            for _, writer in pool._idle[next(iter(pool._idle))]:
+                writer.transport.abort()
+            second = await pool.get(f'{server.url}/metar?ids=KJFK')
+            return first, second
+
+    first, second = asyncio.run(_run())
+    assert first.status == second.status == 200
+    assert first.body == second.body
+
+
+def test_invalid_kind():
+    with pytest.raises(ValueError):
+        MetarFetcher().url('pirep', 'KJFK')
@@ -0,0 +1,144 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+import winds
+from winds.calculator import WindCalculator
+from winds.gui.viewmodel import WindCalcViewModel, slider_to_wind_dir, slider_to_runway
+
+STUBS = Path(__file__).parent.joinpath('stubs')
+GUI = Path(winds.__file__).parent.joinpath('gui')
+
+
+class FrameScheduler:
+    def __init__(self):
+        self.queue = []
+
+    def __call__(self, callback):
+        self.queue.append(callback)
+
+    def run_frame(self):
+        queue, self.queue = self.queue, []
+        for callback in queue:
+            callback()
+
+
+@pytest.fixture
+def model():
+    calc = WindCalculator()
+    calc.runway_heading = 180
+    changes = []
+    vm = WindCalcViewModel(calc, schedule=FrameScheduler())
+    vm.subscribe(changes.append)
+    return vm, changes
+
+
+@pytest.mark.parametrize('value, expected', [(0, 0), (.5, 180), (.66, 230), (.999, 350), (1, 360)])
+def test_slider_to_wind_dir(value, expected):
+    assert slider_to_wind_dir(value) == expected
+
+
+def test_slider_burst_coalesces_into_one_update(model):
+    vm, changes = model
+    for value in (.1, .2, .3, .66):
+        vm.dir_slider_moved(value)
+    vm.speed_slider_moved(.25)
+    assert len(vm.schedule.queue) == 1
+    assert changes == []
+    vm.schedule.run_frame()
+    assert (vm.events, vm.flushes) == (5, 1)
+    assert changes == [{'wind_info_text': 'Winds: 230.0° @ 25.0 kts'}]
+
+
+def test_only_changed_outputs_are_recomputed(model):
+    vm, changes = model
+    vm.dir_slider_moved(.5)
+    vm.schedule.run_frame()
+    assert changes == []
+    vm.set_mode('RWY', .5)
+    vm.dir_slider_moved(.75)
+    vm.schedule.run_frame()
+    assert changes == [{'runway_text': 'Runway HDG: 270°'}]
+    assert vm.wind_calculator.runway_heading == slider_to_runway(.75) == 270
+
+
+def test_set_mode_restores_slider_positions(model):
+    vm, _ = model
+    assert vm.set_mode('RWY', .3) == .5
+    assert vm.set_mode('WIND', .8) == .3
+    assert vm.set_mode('RWY', .3) == .8
+    with pytest.raises(ValueError):
+        vm.set_mode('GRID', .3)
+
+
+def test_grid_reuses_envelope_until_inputs_change(model):
+    vm, _ = model
+    grid = vm.grid('landing')
+    assert grid == winds.max_wind_grid(180, 7, max_tail=vm.wind_calculator.max_ldg_tailwind, runway_hdg=180)
+    assert vm.grid('landing') is grid
+    vm.dir_slider_moved(.6)
+    assert vm.grid('landing') is not grid
+    with pytest.raises(ValueError):
+        vm.grid('cruise')
+
+
+def test_without_scheduler_events_apply_immediately():
+    vm = WindCalcViewModel(WindCalculator())
+    vm.speed_slider_moved(.3)
+    assert vm.wind_speed == 30
+    assert vm.outputs['wind_info_text'] == 'Winds: 180.0° @ 30.0 kts'
+
+
+@pytest.fixture
+def ui_app(monkeypatch):
+    monkeypatch.syspath_prepend(str(GUI))
+    monkeypatch.syspath_prepend(str(STUBS))
+    for name in ('ui', 'config', 'results', 'wind_app'):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    ui = importlib.import_module('ui')
+    wind_app = importlib.import_module('wind_app')
+    yield ui, wind_app
+    ui.cancel_delays()
+    for name in ('ui', 'config', 'results', 'wind_app'):
+        sys.modules.pop(name, None)
+
+
+def make_view(ui, wind_app):
+    view = wind_app.WindCalcView()
+    for control in (ui.Label('wind_info_label'), ui.Label('runway_dir_label'), ui.Slider('wind_dir_slider'),
+                    ui.Slider('wind_speed_slider'), ui.Button('calculate_button'),
+                    ui.NavigationView('results_nav_view'),
+                    ui.SegmentedControl('runway_wind_controller', segments=('WIND', 'RWY')),
+                    ui.SegmentedControl('calculation_type_controller', segments=('GRID TO', 'GRID LDG'))):
+        view.add_subview(control)
+    view.did_load()
+    return view
+
+
+def test_wind_calc_view_headless(ui_app):
+    ui, wind_app = ui_app
+    view = make_view(ui, wind_app)
+    assert view['wind_info_label'].text == 'Winds: 180.0° @ 10.0 kts'
+    assert view['runway_dir_label'].text == 'Runway HDG: 180°'
+
+    for value in (.1, .4, .66):
+        view['wind_dir_slider'].move(value)
+    assert view['wind_info_label'].text == 'Winds: 180.0° @ 10.0 kts'
+    assert ui.run_delayed() == 1
+    assert view['wind_info_label'].text == 'Winds: 230.0° @ 10.0 kts'
+
+    view['runway_wind_controller'].select(1)
+    assert view['wind_dir_slider'].value == .5
+    view['wind_dir_slider'].move(.25)
+    ui.run_delayed()
+    assert view['runway_dir_label'].text == 'Runway HDG: 90°'
+    view['runway_wind_controller'].select(0)
+    assert view['wind_dir_slider'].value == .66
+
+    view['calculation_type_controller'].selected_index = 1
+    view['calculate_button'].fire()
+    table = view['results_nav_view'].pushed[-1]
+    expected = winds.max_wind_grid(230, 7, max_tail=10, runway_hdg=90)
+    assert list(table.data_source.results) == list(expected.items())
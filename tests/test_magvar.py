@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+import winds
+from winds import batch, magvar
+from winds.archive import ArchiveWriter, WindArchive
+from winds.calculator import WindCalculator
+from winds.magvar import DeclinationGrid, build_grid, magnetic_to_true, model_declination, true_to_magnetic
+from winds.winds import WindVector, get_max_wind_velocity
+
+# (lat, lon, declination) near published 2020 values; the degree 8 model is good to about a degree
+AIRPORTS = [
+    (40.64, -73.78, -12.9),     # KJFK
+    (39.86, -104.67, 7.9),      # KDEN
+    (37.62, -122.38, 13.3),     # KSFO
+    (51.47, -0.46, 0.2),        # EGLL
+    (-37.01, 174.79, 19.9),     # NZAA
+]
+
+
+@pytest.fixture
+def use_numpy(numpy_toggle):
+    return numpy_toggle(magvar, batch)
+
+
+@pytest.mark.parametrize('lat, lon, expected', AIRPORTS)
+def test_model_declination(lat, lon, expected):
+    assert model_declination(lat, lon) == pytest.approx(expected, abs=1)
+
+
+def test_grid_matches_model(use_numpy):
+    with DeclinationGrid() as grid:
+        lats, lons = [a[0] for a in AIRPORTS], [a[1] for a in AIRPORTS]
+        batched = grid.declination(lats, lons)
+        assert isinstance(batched, list) is not use_numpy
+        for (lat, lon, _), value in zip(AIRPORTS, batched):
+            assert value == pytest.approx(model_declination(lat, lon), abs=.5)
+            assert grid.declination(lat, lon) == pytest.approx(value)
+        # longitude wraps and latitude is clamped
+        assert grid.declination(10, 180) == pytest.approx(grid.declination(10, -180))
+        assert grid.declination(95, 0) == pytest.approx(grid.declination(90, 0))
+
+
+def test_build_grid_round_trip(tmp_path):
+    path = tmp_path.joinpath('coarse.f32')
+    assert build_grid(path, step=30) == 7 * 13
+    with DeclinationGrid(path) as grid:
+        assert (grid.rows, grid.cols, grid.step, grid.epoch) == (7, 13, 30, magvar.MODEL_EPOCH)
+        assert grid.declination(30, 60) == pytest.approx(model_declination(30, 60), abs=1e-4)
+
+
+def test_not_a_grid(tmp_path):
+    path = tmp_path.joinpath('bad.f32')
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        DeclinationGrid(path)
+
+
+def test_true_magnetic_conversion(use_numpy):
+    assert true_to_magnetic(5, 13) == 352
+    assert magnetic_to_true(true_to_magnetic(240, -12.5), -12.5) == 240
+    assert list(true_to_magnetic([240, 350], [-13, -15])) == [253, 5]
+    assert list(magnetic_to_true([253, 5], [-13, -15])) == [240, 350]
+
+
+def test_batch_declination(use_numpy):
+    dirs, speeds, declinations = [240, 350, 10], [15, 20, 25], [-13, 10, 20]
+    magnetic = [253, 340, 350]
+    assert list(batch.get_crosswind_batch(dirs, speeds, 224, declinations)) == \
+        pytest.approx(list(batch.get_crosswind_batch(magnetic, speeds, 224)))
+    assert list(batch.get_headwind_batch(dirs, speeds, 224, -13)) == \
+        pytest.approx(list(batch.get_headwind_batch([253, 3, 23], speeds, 224)))
+
+
+def test_calculator_true_north():
+    calc = WindCalculator()
+    calc.set_runway('KJFK', '22R')
+    assert calc.declination == pytest.approx(-12.9, abs=1)
+    calc.declination = -13
+    assert calc.winds(240, 15, true_north=True) == winds.get_winds(253, 15, 224)
+    assert calc.winds(240, 15) == winds.get_winds(240, 15, 224)
+    check = calc.evaluate_batch([240, 350], [15, 20], true_north=True)
+    assert list(check.x_wind) == pytest.approx(list(batch.get_crosswind_batch([253, 3], [15, 20], 224)))
+    ranked = calc.rank_airport('KJFK', 297, 20, true_north=True)
+    assert ranked[0].runway.ident == '31L'
+    assert ranked[0].h_wind == pytest.approx(winds.get_headwind(297 - magvar.declination(40.6398, -73.7789), 20, 314))
+    calc.runway_heading = 270
+    assert calc.declination == 0
+
+
+def test_archive_backtest_declination(tmp_path):
+    rng = random.Random(7)
+    rows = [(1562950000 + 3600 * i, rng.randrange(0, 360, 10), rng.randrange(0, 45)) for i in range(2000)]
+    with ArchiveWriter(tmp_path.joinpath('KXXX')) as writer:
+        for time, direction, speed in rows:
+            writer.append(time, WindVector(direction, speed))
+    # turning the magnetic runway to true is the same as turning every true wind to magnetic
+    expected = sum(speed > get_max_wind_velocity(10, 20, (direction + 13) % 360, 224) != -1
+                   for _, direction, speed in rows)
+    assert WindArchive(tmp_path.joinpath('KXXX')).backtest(224, 10, 20, declination=-13).out_of_limits == expected
+
+
+def test_lazy_declination_grid():
+    assert winds.DeclinationGrid is DeclinationGrid
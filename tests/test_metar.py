@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from winds.metar import parse_wind_group, iter_metar_winds, MetarWind
+from winds.winds import WindVector
+
+ARCHIVE = """METAR KJFK 121651Z 24015G25KT 240V300 10SM FEW250 22/12 A3001
+SPECI KBOS 121700Z AUTO VRB03KT 10SM CLR 20/10 A3002
+METAR UUEE 121700Z 18005MPS 9999 SCT030 15/08 Q1013
+KLAX 121653Z /////KT 10SM SKC 20/10 A2992
+2019-07-12 17:51 METAR KORD 121751Z COR 270110G130KT 10SM OVC010 18/17 A2970
+"""
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('24015KT', WindVector(240, 15)),
+    ('24015G25KT', WindVector(240, 15, gust=25)),
+    ('24015G25KT 240V300', WindVector(240, 15, gust=25, variable_from=240, variable_to=300)),
+    ('VRB03KT', WindVector(None, 3)),
+    ('36010MPS', WindVector(360, 10, 'mps')),
+    ('27020KMH', WindVector(270, 20, 'kmh')),
+    ('270P49MPS', WindVector(270, 49, 'mps')),
+    ('270110G130KT', WindVector(270, 110, gust=130)),
+    ('TAF KJFK 121130Z 1212/1318 31012KT P6SM', WindVector(310, 12)),
+], ids=['steady', 'gust', 'variable sector', 'VRB', 'MPS', 'KMH', 'P prefix', '3 digit speed', 'TAF'])
+def test_parse_wind_group(text, expected):
+    assert parse_wind_group(text) == expected
+
+
+@pytest.mark.parametrize('text', ['/////KT', 'KJFK 121651Z 10SM', '1240V300', 'A24015KT'])
+def test_parse_wind_group_returns_none_without_wind(text):
+    assert parse_wind_group(text) is None
+
+
+def test_variable_winds_are_flagged():
+    assert parse_wind_group('VRB03KT').is_variable
+    assert parse_wind_group('24015KT 240V300').is_variable
+    assert not parse_wind_group('24015KT').is_variable
+
+
+@pytest.mark.parametrize('read_size', [1, 40, 1 << 20])
+def test_iter_metar_winds_streams_reports(read_size):
+    winds = list(iter_metar_winds(io.StringIO(ARCHIVE), read_size=read_size))
+    assert winds == [
+        MetarWind('KJFK', '121651', WindVector(240, 15, gust=25, variable_from=240, variable_to=300)),
+        MetarWind('KBOS', '121700', WindVector(None, 3)),
+        MetarWind('UUEE', '121700', WindVector(180, 5, 'mps')),
+        MetarWind('KORD', '121751', WindVector(270, 110, gust=130)),
+    ]
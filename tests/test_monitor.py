@@ -0,0 +1,154 @@
+import io
+import random
+
+import pytest
+
+import winds
+from winds import gusts, monitor
+from winds.calculator import WindCalculator
+from winds.metar import MetarWind, iter_metar_winds
+from winds.monitor import WindMonitor, follow_metar_winds, format_event
+from winds.winds import WindVector
+
+METARS = """METAR KJFK 121651Z 31015G25KT 10SM FEW250
+METAR KJFK 121751Z 31019KT 10SM FEW250
+METAR KJFK 121851Z 31017KT 10SM FEW250
+METAR KJFK 121951Z 04015KT 10SM FEW250
+METAR KLGA 121951Z VRB15KT 10SM FEW250
+METAR KXXX 121951Z 36015KT 10SM FEW250
+"""
+
+
+def events(mon, text=METARS):
+    return [(e.station, e.time, e.runway, e.component, e.alert) for e in mon.run(iter_metar_winds(io.StringIO(text)))]
+
+
+def test_alerts_with_hysteresis():
+    mon = WindMonitor(max_cross=20, max_tail=10, hysteresis=2)
+    mon.watch('KJFK', 220)
+    mon.watch('KLGA', 40)
+    assert events(mon) == [
+        ('KJFK', '121651', 220, 'crosswind', True),
+        # 19 kts is under the limit but inside the hysteresis band, 17 kts clears
+        ('KJFK', '121851', 220, 'crosswind', False),
+        ('KJFK', '121951', 220, 'tailwind', True),
+        ('KLGA', '121951', 40, 'tailwind', True),
+    ]
+    assert (mon.observations, mon.ignored) == (6, 1)
+    assert mon.alerts() == [('KJFK', 220, 'tailwind'), ('KLGA', 40, 'tailwind')]
+    mon.reset()
+    assert mon.alerts() == []
+
+
+def test_event_values():
+    mon = WindMonitor(max_cross=20, max_tail=10)
+    mon.watch('KJFK', 270)
+    (event,) = mon.process('KJFK', '121651', WindVector(240, 30, gust=45))
+    assert (event.component, event.value, event.limit) == ('crosswind', pytest.approx(22.5), 20)
+    # the worst case over the variable sector
+    mon.reset()
+    (event,) = mon.process('KJFK', '121751', WindVector(270, 25, variable_from=170, variable_to=270))
+    assert (event.component, event.value) == ('crosswind', pytest.approx(25))
+
+
+def test_matches_worst_case_winds():
+    rng = random.Random(5)
+    mon = WindMonitor(max_cross=25, max_tail=10, hysteresis=0)
+    mon.watch('KXXX', 224)
+    for _ in range(2000):
+        direction = rng.choice([None] + list(range(0, 360, 10)))
+        wind = WindVector(direction, rng.randrange(0, 40), gust=rng.choice([None, rng.randrange(20, 50)]))
+        mon.process('KXXX', None, wind)
+        worst = gusts.worst_case_winds(direction, wind.strength, wind.gust, runway=224)
+        over = (float(worst.x_wind[0]) > 25 + 1e-9, float(worst.t_wind[0]) > 10 + 1e-9)
+        assert tuple(bool(c) for c in mon._state[:2]) == over
+
+
+def test_hysteresis_is_fixed_when_watching():
+    mon = WindMonitor(max_cross=20, max_tail=-1, hysteresis=2)
+    mon.watch('KJFK', 270)
+    mon.hysteresis = 10
+    assert mon.process('KJFK', '121651', WindVector(180, 30))[0].alert
+    # cleared against the 18 kt limit the runway was watched with, not 10
+    (event,) = mon.process('KJFK', '121751', WindVector(180, 17))
+    assert (event.alert, event.value) == (False, pytest.approx(17))
+
+
+def test_station_case():
+    mon = WindMonitor(max_cross=20, max_tail=10)
+    mon.watch('kjfk', 270)
+    (event,) = mon.process('Kjfk', '121651', WindVector(180, 30))
+    assert (event.station, mon.ignored) == ('KJFK', 0)
+
+
+def test_sector_limit_matches_scan():
+    rng = random.Random(3)
+    for _ in range(500):
+        profile = (rng.randrange(360), rng.choice([-1, 5, 10]), rng.choice([-1, 15, 25]))
+        table, levels = monitor._limit_table(*profile), monitor._sector_table(*profile)
+        variable_from, variable_to = rng.randrange(360), rng.randrange(360)
+        width = (variable_to - variable_from) % 360
+        expected = min(table[(variable_from + i) % 360] for i in range(width + 1))
+        assert monitor._sector_limit(levels, variable_from, variable_to) == expected
+
+
+def test_units_and_calculator():
+    calc = WindCalculator(units='mps')
+    mon = WindMonitor.from_calculator(calc, landing=True, hysteresis=1)
+    assert (mon.max_cross, mon.max_tail, mon.units) == (calc.max_crosswind, calc.max_ldg_tailwind, 'mps')
+    mon.watch('EGLL', 270)
+    # 12 m/s tailwind against a 10 kt (5.1 m/s) landing limit
+    (event,) = mon.process('EGLL', '121650', WindVector(90, 12, 'mps'))
+    assert (event.component, event.value) == ('tailwind', pytest.approx(12))
+    assert mon.process('EGLL', '121720', WindVector(90, 9, 'kts')) == []
+    assert mon.process('EGLL', '121750', WindVector(90, 7, 'kts'))[0].alert is False
+
+
+def test_watch_airport_uses_declination():
+    mon = WindMonitor(max_cross=10, max_tail=-1)
+    airport = mon.watch_airport('KJFK')
+    assert len(mon.alerts()) == 0 and repr(mon) == f'WindMonitor(stations=1, runways={len(airport.runways)})'
+    # a true 211° wind is straight down the 224° magnetic runways 04L/R and 22L/R
+    found = {e.runway.ident for e in mon.process('KJFK', '121651', WindVector(211, 30))}
+    assert found == {'13L', '13R', '31L', '31R'}
+
+
+def test_follow_metar_winds():
+    stream = io.StringIO()
+    stream.write(METARS.splitlines(keepends=True)[0])
+    stream.write('METAR KJFK 121751Z 310')
+    stream.seek(0)
+    follower = follow_metar_winds(stream, poll_interval=0, stop=lambda: True)
+    assert next(follower) == MetarWind('KJFK', '121651', WindVector(310, 15, gust=25))
+    position = stream.tell()
+    stream.seek(0, io.SEEK_END)
+    stream.write('19KT 10SM\n')
+    stream.seek(position)
+    assert list(follower) == [MetarWind('KJFK', '121751', WindVector(310, 19))]
+
+
+def test_follow_metar_winds_waits_for_partial_lines():
+    chunks = ['METAR KJFK 121651Z 2401', '', '5G25KT 10SM\n', 'METAR KJFK 121751Z 25010KT']
+
+    class Reader:
+        def readline(self):
+            return chunks.pop(0) if chunks else ''
+
+    follower = follow_metar_winds(Reader(), poll_interval=0, stop=lambda: not chunks)
+    # the unterminated last line is parsed once the reader stops
+    assert list(follower) == [MetarWind('KJFK', '121651', WindVector(240, 15, gust=25)),
+                              MetarWind('KJFK', '121751', WindVector(250, 10))]
+
+
+def test_format_event_and_cli(tmp_path, capsys):
+    source = tmp_path.joinpath('metars.txt')
+    source.write_text(METARS)
+    assert monitor.main([str(source), '--airports', 'KJFK', '--max-cross', '15', '--max-tail', '-1']) == 0
+    out, _ = capsys.readouterr()
+    assert out.splitlines()[0].startswith('KJFK 121651Z RWY ') and 'CROSSWIND' in out
+    event = monitor.MonitorEvent('KJFK', '121751', 220, 'tailwind', False, 7.96, 10)
+    assert format_event(event) == 'KJFK 121751Z RWY 220 TAILWIND 8.0 BACK WITHIN LIMIT 10'
+
+
+def test_lazy_wind_monitor():
+    assert winds.WindMonitor is WindMonitor
@@ -0,0 +1,96 @@
+import os
+import random
+
+import pytest
+
+import winds
+from winds import parallel
+from winds.archive import ArchiveWriter, WindArchive
+from winds.parallel import backtest_airports, format_throughput
+from winds.usability import WindStats
+from winds.winds import WindVector
+
+PROFILES = [(40, 10, 20), (220, 10, 20)]
+
+
+def observations(seed, size):
+    rng = random.Random(seed)
+    directions = [float('nan') if rng.random() < .05 else rng.randrange(0, 360, 10) for _ in range(size)]
+    speeds = [rng.randrange(0, 40) for _ in range(size)]
+    gusts = [rng.choice([0, s + 10]) for s in speeds]
+    return directions, speeds, gusts
+
+
+SOURCES = {'KAAA': observations(1, 5000), 'KBBB': observations(2, 3000), 'KCCC': observations(3, 0)}
+
+
+def expected_stats(source, gusts=False):
+    directions, speeds, gust_speeds = source
+    stats = WindStats()
+    stats.add_batch(directions, [max(s, g) for s, g in zip(speeds, gust_speeds)] if gusts else speeds)
+    return stats
+
+
+def counts(table):
+    """usability_table without the fractions, which are NaN (never equal) for empty stations"""
+    return {profile: usability[:2] for profile, usability in table.items()}
+
+
+def shm_blocks():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+@pytest.mark.parametrize('workers, shard_size', [(0, 700), (2, 700), (2, 100000)])
+def test_backtest_matches_single_process(workers, shard_size):
+    before = shm_blocks()
+    result = backtest_airports(SOURCES, PROFILES, workers=workers, shard_size=shard_size)
+    assert list(result.stats) == list(SOURCES)
+    for station, source in SOURCES.items():
+        expected = expected_stats(source)
+        assert result.stats[station].total == expected.total
+        assert (result.stats[station].counts == expected.counts).all()
+        assert counts(result.usability[station]) == counts(expected.usability_table(PROFILES))
+    assert sum(w.observations for w in result.workers) == 8000
+    assert sum(w.shards for w in result.workers) == sum(-(-len(s[0]) // shard_size) for s in SOURCES.values())
+    assert shm_blocks() == before
+
+
+def test_backtest_with_gusts_and_per_station_profiles():
+    profiles = {'KAAA': PROFILES, 'KBBB': PROFILES[:1], 'KCCC': PROFILES[1:]}
+    result = backtest_airports(SOURCES, profiles, workers=2, shard_size=1000, gusts=True)
+    assert list(result.usability['KBBB']) == [PROFILES[0], 'combined']
+    expected = expected_stats(SOURCES['KAAA'], gusts=True)
+    assert result.usability['KAAA'] == expected.usability_table(PROFILES)
+
+
+def test_backtest_archives(tmp_path):
+    with ArchiveWriter(tmp_path.joinpath('KJFK')) as writer:
+        writer.append(0, WindVector(240, 15, gust=25))
+        writer.append(3600, WindVector(None, 3))
+        writer.append(7200, WindVector(40, 20))
+    result = backtest_airports({'KJFK': WindArchive(tmp_path.joinpath('KJFK'))}, PROFILES, workers=0,
+                               shard_size=2)
+    assert result.stats['KJFK'].total == 3
+    assert result.usability['KJFK'][PROFILES[1]].usable == 2
+
+
+def test_backtest_without_numpy(monkeypatch):
+    expected = backtest_airports(SOURCES, PROFILES, workers=0)
+    monkeypatch.setattr(parallel, 'np', None)
+    import winds.usability
+    monkeypatch.setattr(winds.usability, 'np', None)
+    result = backtest_airports(SOURCES, PROFILES)
+    for station in SOURCES:
+        assert counts(result.usability[station]) == counts(expected.usability[station])
+    assert len(result.workers) == 1
+
+
+def test_format_throughput():
+    result = backtest_airports(SOURCES, PROFILES, workers=0)
+    lines = format_throughput(result.workers).splitlines()
+    assert lines[0].split() == ['pid', 'shards', 'observations', 'busy', 's', 'obs/s']
+    assert lines[1].split()[2] == '8000'
+
+
+def test_lazy_parallel():
+    assert winds.parallel is parallel and 'parallel' in dir(winds)
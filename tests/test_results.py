@@ -0,0 +1,93 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+import winds
+from winds.envelope import WindEnvelope
+from winds.gui import results_model
+from winds.gui.results_model import GridResults, format_results_text_line
+
+STUBS = Path(__file__).parent.joinpath('stubs')
+
+
+@pytest.fixture
+def results(monkeypatch):
+    monkeypatch.syspath_prepend(str(STUBS))
+    for name in ('ui', 'winds.gui.results'):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    yield importlib.import_module('winds.gui.results')
+    sys.modules.pop('ui', None)
+    sys.modules.pop('winds.gui.results', None)
+
+
+@pytest.fixture
+def harness(monkeypatch):
+    monkeypatch.syspath_prepend(str(STUBS))
+    return importlib.import_module('table_harness')
+
+
+GRID = winds.max_wind_grid(200, 180, 10, 38, 1, 90)
+
+
+def test_format_results_text_line():
+    assert format_results_text_line(5, 12.345) == 'MAX FROM 005° -> 12.3kts'
+    assert format_results_text_line(5, 12.345, -1) == 'MAX FROM 005° -> 12.34500kts'
+    assert format_results_text_line(5, -1) == 'MAX FROM 005° -> NO MAX'
+
+
+def test_grid_results_from_grid():
+    rows = GridResults.from_grid(GRID)
+    assert len(rows) == len(GRID) == 360
+    assert list(rows) == list(GRID.items())
+    assert rows[-1] == list(GRID.items())[-1]
+    assert rows.lines() == [format_results_text_line(d, s) for d, s in GRID.items()]
+
+
+def test_grid_results_from_envelope_matches_window():
+    envelope = WindEnvelope(90, 10, 38)
+    rows = GridResults.from_envelope(envelope, 200, 180, 1)
+    assert list(rows) == list(envelope.window(200, 180, 1).items()) == list(GRID.items())
+
+
+def test_lines_are_formatted_once(monkeypatch):
+    calls = []
+    real = results_model.format_results_text_line
+    monkeypatch.setattr(results_model, 'format_results_text_line', lambda *args: calls.append(args) or real(*args))
+    rows = GridResults.from_grid(GRID)
+    assert calls == []
+    rows.line(10)
+    rows.line(10)
+    rows.lines()
+    assert len(calls) == len(rows)
+
+
+def test_table_source_reuses_cells(results, harness):
+    source = results.GridResultsTableSource()
+    source.load_from_results_dict(GRID)
+    assert source.tableview_number_of_rows(None, 0) == 360
+    assert harness.scroll(source, passes=3) == 3 * 360
+    assert source.cells_created == results.CELL_POOL_SIZE
+    cell = source.tableview_cell_for_row(None, 0, 200)
+    assert cell.text_label.text == format_results_text_line(*list(GRID.items())[200])
+
+
+def test_visible_rows_get_distinct_cells(results):
+    source = results.GridResultsTableSource()
+    source.load_results(GridResults.from_grid(GRID))
+    cells = [source.tableview_cell_for_row(None, 0, row) for row in range(100, 100 + results.CELL_POOL_SIZE)]
+    assert len(set(map(id, cells))) == len(cells)
+    assert [c.text_label.text for c in cells] == [source.results.line(r) for r in range(100, 164)]
+
+
+def test_make_grid_view(results):
+    table = results.make_grid_view(GRID)
+    assert list(table.data_source.results) == list(GRID.items())
+    assert table.delegate is table.data_source
+
+
+def test_cells_per_second(results, harness):
+    source = results.GridResultsTableSource()
+    source.load_results(GridResults.from_envelope(WindEnvelope(90, 10, 38), 200, 180, 1))
+    assert harness.cells_per_second(source, passes=2) > 0
@@ -0,0 +1,84 @@
+import math
+
+import pytest
+
+import winds
+from winds import solver
+from winds.calculator import WindCalculator
+from winds.solver import WindLimits, solve_envelope, solve_max_wind, to_sentinel
+from winds.winds import get_max_wind_velocity
+
+DIRECTIONS = list(range(0, 360, 5))
+
+
+@pytest.fixture
+def use_numpy(numpy_toggle):
+    return numpy_toggle(solver)
+
+
+@pytest.mark.parametrize('max_tail, max_cross', [(10, 38), (-1, 20), (15, -1)])
+def test_matches_max_wind_velocity(use_numpy, max_tail, max_cross):
+    solution = solve_max_wind(DIRECTIONS, WindLimits(crosswind=max_cross, tailwind=max_tail), runway_hdg=220)
+    expected = [get_max_wind_velocity(max_tail, max_cross, d, 220) for d in DIRECTIONS]
+    for direction, velocity, old in zip(DIRECTIONS, list(to_sentinel(solution.velocities)), expected):
+        if old == -1 or old > 1e12:
+            # exactly along or across the runway the old functions give -1 or a huge number
+            assert velocity == -1, direction
+        else:
+            assert velocity == pytest.approx(old), direction
+
+
+def test_binding_constraints(use_numpy):
+    limits = WindLimits(crosswind=30, tailwind=10, headwind=40, total=35)
+    solution = solve_max_wind([270, 300, 0, 90, 180], limits, runway_hdg=270)
+    assert list(solution.velocities) == pytest.approx([35, 35, 30, 10, 30])
+    assert list(solution.binding) == ['total', 'total', 'crosswind', 'tailwind', 'crosswind']
+    headwind = solve_max_wind(270, WindLimits(headwind=40), runway_hdg=270)
+    assert headwind == (40, 'headwind')
+
+
+def test_unlimited_directions_are_inf(use_numpy):
+    solution = solve_max_wind([270, 90, 0], WindLimits(tailwind=0), runway_hdg=270)
+    assert list(solution.velocities) == [math.inf, 0, math.inf]
+    assert list(solution.binding) == [None, 'tailwind', None]
+    assert not any(v != v for v in solution.velocities)
+
+
+def test_gusts(use_numpy):
+    limits = WindLimits(crosswind=20, gust=35)
+    solution = solve_max_wind([0, 90], limits, runway_hdg=90, gust_factor=10)
+    assert list(solution.velocities) == pytest.approx([10, 25])
+    assert list(solution.binding) == ['crosswind', 'gust']
+    # the gust factor alone uses up the limit
+    assert solve_max_wind(0, limits, runway_hdg=90, gust_factor=25).velocities == 0
+
+
+def test_vrb_is_worst_case(use_numpy):
+    limits = WindLimits(crosswind=38, tailwind=10, headwind=50)
+    assert solve_max_wind(math.nan, limits) == (10, 'tailwind')
+    directions, everything = solve_envelope(limits, runway_hdg=123)
+    assert len(directions) == 360
+    assert solve_max_wind(math.nan, limits).velocities <= min(everything.velocities)
+
+
+def test_numpy_and_python_agree(monkeypatch):
+    pytest.importorskip('numpy')
+    limits = WindLimits(crosswind=25, tailwind=7, headwind=45, total=40, gust=48)
+    directions = [d / 2 for d in range(720)] + [math.nan]
+    vectorized = solve_max_wind(directions, limits, runway_hdg=44, gust_factor=8)
+    monkeypatch.setattr(solver, 'np', None)
+    python = solve_max_wind(directions, limits, runway_hdg=44, gust_factor=8)
+    assert vectorized.velocities.tolist() == pytest.approx(python.velocities)
+    assert vectorized.binding.tolist() == python.binding
+
+
+def test_calculator_solve_limits():
+    calc = WindCalculator()
+    calc.runway_heading = 270
+    solution = calc.solve_limits([90, 0, 270], landing=True, max_total=45)
+    assert list(solution.velocities) == pytest.approx([calc.max_ldg_tailwind, calc.max_crosswind, 45])
+    assert list(solution.binding) == ['tailwind', 'crosswind', 'total']
+
+
+def test_lazy_solver():
+    assert winds.solve_max_wind is solve_max_wind and winds.WindLimits is WindLimits
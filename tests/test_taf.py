@@ -0,0 +1,138 @@
+import calendar
+from pathlib import Path
+
+import pytest
+
+import winds
+from winds import gusts, taf as taf_module
+from winds.calculator import WindCalculator
+from winds.taf import BASE, BECMG, FM, PROB, TEMPO, TafTimeline, format_timeline, parse_taf, taf_periods
+from winds.winds import WindVector
+
+FIXTURES = Path(__file__).parent.joinpath('fixtures', 'taf')
+
+
+def at(day, hour, minute=0):
+    return calendar.timegm((2019, 7, day, hour, minute, 0))
+
+
+def fixture(station):
+    return parse_taf(FIXTURES.joinpath(f'{station}.txt').read_text(), 2019, 7)
+
+
+@pytest.fixture
+def use_numpy(numpy_toggle):
+    return numpy_toggle(gusts)
+
+
+def test_parse_taf_groups():
+    taf = parse_taf('TAF AMD KORD 121400Z 1214/1318 26018G28KT P6SM FM121800 27015KT '
+                    'TEMPO 1218/1222 27025G35KT PROB30 1222/1302 TSRA BECMG 1304/1306 VRB05KT '
+                    'PROB40 TEMPO 1306/1310 18010KT=', 2019, 7)
+    assert (taf.station, taf.amendment, taf.issued) == ('KORD', 'AMD', at(12, 14))
+    assert (taf.valid_from, taf.valid_to) == (at(12, 14), at(13, 18))
+    assert [(g.kind, g.start, g.end, g.probability) for g in taf.groups] == [
+        (BASE, at(12, 14), at(13, 18), None),
+        (FM, at(12, 18), at(13, 18), None),
+        (TEMPO, at(12, 18), at(12, 22), None),
+        (PROB, at(12, 22), at(13, 2), 30),
+        (BECMG, at(13, 4), at(13, 6), None),
+        (PROB, at(13, 6), at(13, 10), 40),
+    ]
+    assert taf.groups[3].wind is None
+    assert taf.groups[4].wind == WindVector(None, 5)
+
+
+def test_parse_taf_month_end_and_hour_24():
+    taf = parse_taf('TAF KJFK 311730Z 3118/0124 24012KT FM010600 30015KT', 2019, 7)
+    assert (taf.valid_from, taf.valid_to) == (at(31, 18), calendar.timegm((2019, 8, 2, 0, 0, 0)))
+    assert taf.groups[1].start == calendar.timegm((2019, 8, 1, 6, 0, 0))
+
+
+def test_parse_taf_errors():
+    with pytest.raises(ValueError):
+        parse_taf('METAR KJFK 121651Z 24015KT', 2019, 7)
+    with pytest.raises(ValueError):
+        parse_taf('TAF KJFK 121130Z 1212/1318 P6SM', 2019, 7)
+
+
+def test_taf_periods():
+    periods = taf_periods(fixture('EGLL'))
+    before, becoming = WindVector(230, 12), WindVector(250, 8)
+    assert periods == [
+        taf_module.TafPeriod(at(12, 12), at(13, 0), (before,)),
+        taf_module.TafPeriod(at(13, 0), at(13, 3), (before, becoming)),
+        taf_module.TafPeriod(at(13, 3), at(13, 18), (becoming,)),
+    ]
+    tempo = taf_periods(fixture('KORD'))
+    assert [len(period.winds) for period in tempo] == [1, 2, 1]
+
+
+def test_timeline_matches_worst_case(use_numpy):
+    timeline = TafTimeline(fixture('KORD'), 224, 10, 20)
+    expected = [gusts.worst_case_winds(270, 25, 35, runway=224), gusts.worst_case_winds(260, 18, 28, runway=224)]
+    assert timeline.intervals[1].x_wind == pytest.approx(max(float(e.x_wind[0]) for e in expected))
+    assert timeline.intervals[0].x_wind == pytest.approx(float(expected[1].x_wind[0]))
+    assert [m.within_limits for m in timeline.margins()] == [True, False, True]
+    assert timeline.within_limits(at(12, 12), at(12, 16))
+    assert not timeline.within_limits(at(12, 15), at(12, 17))
+    assert timeline.within_limits(at(12, 20))
+    timeline.max_cross = -1
+    assert timeline.within_limits() and timeline.margins()[1].x_margin == float('inf')
+
+
+def test_timeline_vrb_and_declination():
+    bos = TafTimeline(fixture('KBOS'), 90, max_tail=2)
+    assert (bos.intervals[0].x_wind, bos.intervals[0].t_wind) == (3, 3)
+    assert not bos.within_limits(at(12, 12), at(12, 13)) and bos.within_limits(at(12, 16))
+    true_runway = TafTimeline(fixture('KJFK'), 211)
+    magnetic = TafTimeline(fixture('KJFK'), 224, declination=-13)
+    assert [i.x_wind for i in magnetic.intervals] == pytest.approx([i.x_wind for i in true_runway.intervals])
+
+
+def test_timeline_units():
+    kts, mps = TafTimeline(fixture('KJFK'), 224), TafTimeline(fixture('KJFK'), 224, units='mps')
+    assert [i.x_wind for i in mps.intervals] == pytest.approx([i.x_wind * 1852 / 3600 for i in kts.intervals])
+
+
+def test_amend_recomputes_only_new_winds():
+    timeline = TafTimeline(fixture('KJFK'), 224, 10, 20)
+    amendment = parse_taf('TAF AMD KJFK 121500Z 1215/1318 24012KT TEMPO 1216/1219 20025G35KT '
+                          'FM121800 24018G28KT FM130200 28010KT', 2019, 7)
+    assert timeline.amend(amendment) == 1
+    assert timeline.amendments == 1
+    assert [(i.start, i.end) for i in timeline.intervals] == [
+        (at(12, 12), at(12, 16)), (at(12, 16), at(12, 18)), (at(12, 18), at(12, 19)), (at(12, 19), at(13, 2)),
+        (at(13, 2), at(13, 18))]
+    # the same as a timeline built from the amendment, for the amended period
+    fresh = TafTimeline(amendment, 224, 10, 20)
+    assert timeline.window(at(12, 15)) == [fresh.intervals[0]._replace(start=at(12, 12))] + fresh.intervals[1:]
+    with pytest.raises(ValueError):
+        timeline.amend(fixture('KBOS'))
+
+
+def test_calculator_taf_timeline():
+    calc = WindCalculator(units='mps')
+    calc.runway_heading = 224
+    calc.declination = -13
+    timeline = calc.taf_timeline(fixture('KORD'), landing=True)
+    assert (timeline.max_tail, timeline.max_cross) == (calc.max_ldg_tailwind, calc.max_crosswind)
+    assert (timeline.units, timeline.declination) == ('mps', -13)
+
+
+def test_format_timeline():
+    lines = format_timeline(TafTimeline(fixture('KORD'), 224, 10, 20)).splitlines()
+    assert lines[1].startswith('121600Z-122000Z  XW  25.2 (-5.2)') and lines[1].endswith('OVER LIMITS')
+
+
+def test_cli(tmp_path, capsys):
+    amendment = tmp_path.joinpath('amd.txt')
+    amendment.write_text('TAF AMD KORD 121700Z 1217/1318 26010KT')
+    assert taf_module.main([str(FIXTURES.joinpath('KORD.txt')), str(amendment), '--runway', '224',
+                            '--max-cross', '20', '--year', '2019', '--month', '7']) == 1
+    out, _ = capsys.readouterr()
+    assert out.splitlines()[-1].startswith('121700Z-131800Z')
+
+
+def test_lazy_taf():
+    assert winds.parse_taf is parse_taf and winds.TafTimeline is TafTimeline
@@ -0,0 +1,170 @@
+import io
+import math
+
+import pytest
+
+import winds
+from winds import _compat, batch, pipeline, units
+from winds.arrays import WindVectorArray
+from winds.calculator import WindCalculator
+from winds.pipeline import run_batch
+from winds.shell import WindShell
+from winds.units import conversion_factor, convert_grid, convert_speed, normalize_unit
+from winds.winds import WindVector, max_wind_grid
+
+MIXED_SPEEDS = [10, 10, 10, 10, 36]
+MIXED_UNITS = ['KT', 'mps', 'kmh', 'mph', 'KMH']
+MIXED_KNOTS = [10, 19.438445, 5.399568, 8.689762, 19.438445]
+
+
+@pytest.fixture
+def use_numpy(numpy_toggle):
+    return numpy_toggle(_compat, pipeline, batch)
+
+
+@pytest.mark.parametrize('spelling, expected', [('KT', 'kts'), ('knots', 'kts'), ('MPS', 'mps'), ('m/s', 'mps'),
+                                                ('KMH', 'kmh'), ('kph', 'kmh'), (' mph ', 'mph')])
+def test_normalize_unit(spelling, expected):
+    assert normalize_unit(spelling) == expected
+
+
+def test_unknown_unit_raises():
+    with pytest.raises(ValueError):
+        normalize_unit('furlongs')
+    with pytest.raises(ValueError):
+        convert_speed(10, 'kts', 'beaufort')
+
+
+@pytest.mark.parametrize('unit', units.UNITS)
+def test_conversion_round_trips(unit):
+    assert conversion_factor(unit, unit) == 1.0
+    assert convert_speed(convert_speed(17.5, 'kts', unit), unit, 'kts') == pytest.approx(17.5)
+    assert conversion_factor('kts', unit) * units.KNOTS_PER_UNIT[unit] == pytest.approx(1)
+
+
+def test_convert_speed_batches(use_numpy):
+    same = convert_speed([10, 20], 'mps', 'kts')
+    assert list(same) == pytest.approx([19.438445, 38.87689])
+    mixed = convert_speed(MIXED_SPEEDS, MIXED_UNITS, 'kts')
+    assert list(mixed) == pytest.approx(MIXED_KNOTS)
+    assert isinstance(mixed, list) is not use_numpy
+    with pytest.raises(ValueError):
+        convert_speed([10, 20], ['kts'])
+    with pytest.raises(ValueError):
+        convert_speed(10, ['kts'])
+
+
+def test_convert_grid_keeps_no_max():
+    grid = max_wind_grid(200, 3, 10, 38, runway_hdg=90)
+    converted = convert_grid(grid, 'kts', 'mps')
+    assert list(converted) == list(grid)
+    for hdg, speed in grid.items():
+        assert converted[hdg] == (-1 if speed == -1 else pytest.approx(speed * 1852 / 3600))
+
+
+def test_max_wind_grid_units():
+    kts = max_wind_grid(200, 3, 10, 38, runway_hdg=90)
+    assert max_wind_grid(200, 3, 10, 38, runway_hdg=90, to_unit='kmh') == convert_grid(kts, 'kts', 'kmh')
+    # limits given in m/s give the same grid, in m/s
+    mps = max_wind_grid(200, 3, 10 * 1852 / 3600, 38 * 1852 / 3600, runway_hdg=90, unit='mps')
+    assert list(mps.values()) == pytest.approx(list(convert_grid(kts, 'kts', 'mps').values()))
+    # RCAM limits are looked up in knots and converted
+    by_rcam = max_wind_grid(200, 3, runway_hdg=90, rcam=4, unit='mps', to_unit='kts')
+    assert list(by_rcam.values()) == pytest.approx(list(max_wind_grid(200, 3, runway_hdg=90, rcam=4).values()))
+
+
+def test_wind_vector_to_unit():
+    wind = WindVector(240, 10, 'mps', gust=15, variable_from=220, variable_to=260)
+    converted = wind.to_unit('KT')
+    assert converted.strength_unit == 'kts'
+    assert (converted.strength, converted.gust) == pytest.approx((19.438445, 29.157667))
+    assert (converted.direction, converted.variable_from, converted.variable_to) == (240, 220, 260)
+    assert WindVector(None, 3).to_unit('kts') == WindVector(None, 3.0)
+
+
+def test_wind_vector_array_units(use_numpy):
+    vectors = [WindVector(240, speed, unit) for speed, unit in zip(MIXED_SPEEDS, MIXED_UNITS)]
+    array = WindVectorArray.from_vectors(vectors)
+    assert array.strength_unit == 'kts'
+    assert list(array.strengths) == pytest.approx(MIXED_KNOTS)
+    back = array.to_unit('mps')
+    assert back.strength_unit == 'mps'
+    assert list(back.strengths) == pytest.approx([k * 1852 / 3600 for k in MIXED_KNOTS])
+
+
+def test_wind_vector_array_vrb(use_numpy):
+    array = WindVectorArray.from_vectors([WindVector(None, 3), WindVector(240, 5, 'mps')])
+    assert math.isnan(array.directions._values[0])
+    assert [vector.direction for vector in array] == [None, 240]
+    assert array[0] == WindVector(None, 3.0) and array[1].strength == pytest.approx(9.719222)
+
+
+def test_calculator_converts_limits():
+    calc = WindCalculator(units='mps')
+    assert calc.max_crosswind == pytest.approx(38 * 1852 / 3600)
+    assert calc.max_ldg_tailwind == pytest.approx(10 * 1852 / 3600)
+    calc.max_crosswind = 10
+    calc.units = 'kts'
+    assert calc.max_crosswind == pytest.approx(19.438445)
+    calc.max_to_tailwind = -1
+    calc.units = 'kmh'
+    assert calc.max_to_tailwind == -1
+    calc.rcam = 4
+    assert calc.max_crosswind == pytest.approx(29 * 1.852)
+    with pytest.raises(ValueError):
+        calc.units = 'furlongs'
+
+
+def test_calculator_results_follow_units():
+    kts, mps = WindCalculator(), WindCalculator(units='mps')
+    for calc in (kts, mps):
+        calc.runway_heading = 90
+    to_mps = conversion_factor('kts', 'mps')
+    assert mps.calculate_max_tailwind_velocity(250) == pytest.approx(kts.calculate_max_tailwind_velocity(250) * to_mps)
+    assert list(mps.envelope().window(200, 3).values()) == pytest.approx(
+        list(convert_grid(kts.envelope().window(200, 3), 'kts', 'mps').values()))
+    assert [r.runway for r in mps.rank_runways([90, 270], 250, 15 * to_mps)] == \
+        [r.runway for r in kts.rank_runways([90, 270], 250, 15)]
+
+
+def test_evaluate_batch_mixed_units(use_numpy):
+    calc = WindCalculator(units='mps')
+    calc.runway_heading = 270
+    dirs = [270, 180, 180, 90]
+    check = calc.evaluate_batch(dirs, [30, 30, 20, 10], velocity_units=['kts', 'kts', 'mps', 'mps'])
+    assert [abs(x) for x in check.x_wind] == pytest.approx([0, 30 * 1852 / 3600, 20, 0], abs=1e-9)
+    assert list(check.within_limits) == [True, True, False, False]
+    by_rcam = calc.evaluate_batch(dirs, [30, 30, 20, 20], rcams=[1, 6, 6, 6], velocity_units='kts')
+    assert list(by_rcam.max_crosswind) == pytest.approx([15 * 1852 / 3600] + [38 * 1852 / 3600] * 3)
+    assert list(by_rcam.within_limits) == [True, True, True, False]
+
+
+def test_run_batch_unit_column(use_numpy):
+    source = 'wind_dir,speed,unit,runway\n180,10,MPS,270\n180,36,KMH,270\n180,20,KT,270\n'
+    out = io.StringIO()
+    assert run_batch(io.StringIO(source), out, WindCalculator(), 'csv', 'csv') == 3
+    rows = [row.split(',') for row in out.getvalue().splitlines()[1:]]
+    assert [row[5] for row in rows] == ['-19.4', '-19.4', '-20.0']
+
+
+def test_run_batch_blank_unit_uses_calculator_units(use_numpy):
+    source = 'wind_dir,speed,unit\n180,10,MPS\n180,10,\n180,10\n'
+    out = io.StringIO()
+    assert run_batch(io.StringIO(source), out, WindCalculator(units='mps'), 'csv', 'csv') == 3
+    rows = [row.split(',') for row in out.getvalue().splitlines()[1:]]
+    assert [row[3] for row in rows] == ['-10.0', '-10.0', '-10.0']
+
+
+def test_shell_units(capsys):
+    shell = WindShell()
+    shell.onecmd('set u m/s')
+    assert shell.wind_calc.units == 'mps'
+    out, _ = capsys.readouterr()
+    assert 'MAX XWIND [set x]:      19.5 mps' in out
+    shell.onecmd('grid 200 l')
+    out, _ = capsys.readouterr()
+    assert 'Landing (5.1 mps)' in out and 'kts' not in out
+
+
+def test_lazy_convert_speed():
+    assert winds.convert_speed is convert_speed
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from winds import usability
+from winds.archive import ArchiveWriter, WindArchive
+from winds.calculator import WindCalculator
+from winds.usability import WindStats, Usability
+from winds.winds import WindVector, get_max_wind_velocity
+
+rng = random.Random(7)
+OBSERVATIONS = [(None if rng.random() < .05 else rng.randrange(0, 360, 10), rng.randrange(0, 40))
+                for _ in range(3000)]
+PROFILES = [(220, 10, 20), (40, 10, 20), (130, -1, 15), (310, 5, -1)]
+
+
+def brute_force(observations, *profiles):
+    tables = []
+    for runway, max_tail, max_cross in profiles:
+        limits = [get_max_wind_velocity(max_tail, max_cross, d, runway) for d in range(360)]
+        tables.append([float('inf') if val == -1 else val for val in limits])
+    return sum(
+        any(speed <= (min(limits) if direction is None else limits[direction]) for limits in tables)
+        for direction, speed in observations
+    )
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def stats(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(usability, 'np', None)
+    stats = WindStats()
+    for direction, speed in OBSERVATIONS[:1000]:
+        stats.add(direction, speed)
+    stats.add_batch([d for d, _ in OBSERVATIONS[1000:]], [s for _, s in OBSERVATIONS[1000:]])
+    return stats
+
+
+@pytest.mark.parametrize('profile', PROFILES)
+def test_usability_matches_scalar_limits(stats, profile):
+    result = stats.usability(*profile)
+    assert result == Usability(brute_force(OBSERVATIONS, profile), 3000, result.usable / 3000)
+
+
+def test_usability_table_combines_runways(stats):
+    table = stats.usability_table(PROFILES[:2])
+    assert list(table) == [PROFILES[0], PROFILES[1], 'combined']
+    assert table['combined'].usable == brute_force(OBSERVATIONS, *PROFILES[:2])
+    assert table['combined'].usable >= max(table[p].usable for p in PROFILES[:2])
+
+
+def test_meets_criterion(stats):
+    fraction = stats.usability_table([(220, -1, 20), (40, -1, 20)])['combined'].fraction
+    assert stats.meets_criterion([220, 40], 'C') == (fraction >= .95)
+    assert stats.meets_criterion([220, 40], 'C', criterion=fraction)
+    assert not stats.meets_criterion([220], 'A', criterion=1)
+
+
+def test_wind_rose(stats):
+    rose = stats.wind_rose(sectors=8, speeds=(0, 10, 20))
+    assert rose.sectors == [0.0, 45.0, 90.0, 135.0, 180.0, 225.0, 270.0, 315.0]
+    assert sum(map(sum, rose.counts)) + rose.calm + rose.variable == rose.total == 3000
+    assert rose.calm == sum(s <= 3 for _, s in OBSERVATIONS)
+    assert rose.variable == sum(d is None and s > 3 for d, s in OBSERVATIONS)
+    north_strong = sum(d is not None and (d >= 340 or d <= 20) and s >= 20 for d, s in OBSERVATIONS)
+    assert rose.counts[0][2] == north_strong
+
+
+def test_merge_is_incremental():
+    first, second, everything = WindStats(), WindStats(), WindStats()
+    first.add_batch([220, 240], [10, 20])
+    second.add_batch([None, 90], [3, 30])
+    everything.add_batch([220, 240, None, 90], [10, 20, 3, 30])
+    first += second
+    assert first.total == 4
+    assert first.usability(220, 10, 20) == everything.usability(220, 10, 20)
+
+
+def test_add_batch_wraps_directions_like_add(numpy_toggle):
+    numpy_toggle(usability)
+    directions, speeds = [-10, 370, 725, -360, None, float('nan')], [5, 6, 7, 8, 9, 10]
+    one, batched = WindStats(), WindStats()
+    for direction, speed in zip(directions, speeds):
+        one.add(direction, speed)
+    batched.add_batch(directions, speeds)
+    assert [list(row) for row in batched.counts] == [list(row) for row in one.counts]
+    assert (one.counts[350][5], one.counts[10][6], one.counts[5][7], one.counts[0][8]) == (1, 1, 1, 1)
+    assert one.counts[usability.VRB_BIN][9] == one.counts[usability.VRB_BIN][10] == 1
+
+
+def test_add_wind_and_archive(tmp_path):
+    stats = WindStats()
+    stats.add_wind(WindVector(240, 15, gust=25), gusts=True)
+    stats.add_wind(WindVector(240, 10, 'mps'))
+    assert stats.counts[240][19] == 1
+    with pytest.raises(ValueError):
+        stats.add_wind(WindVector(240, 15, 'furlongs'))
+    with ArchiveWriter(tmp_path) as writer:
+        writer.append(0, WindVector(240, 15, gust=25))
+        writer.append(0, WindVector(None, 3))
+    stats.add_archive(WindArchive(tmp_path), gusts=True)
+    assert stats.total == 4
+    assert stats.counts[240][25] == 2
+    assert stats.counts[usability.VRB_BIN][3] == 1
+
+
+def test_calculator_usability(stats):
+    calc = WindCalculator()
+    calc.runway_heading = 220
+    calc.max_crosswind = 20
+    calc.max_ldg_tailwind = 10
+    assert calc.usability(stats, landing=True) == stats.usability(220, 10, 20)
@@ -1,17 +1,41 @@
 from unittest.mock import Mock
 from unittest import mock
+import io
+import json
+import subprocess
+import sys
 
 import pytest
 
 from winds import (get_headwind, get_crosswind, get_winds, Wind, get_max_crosswind_velocity, Direction,
-                   get_max_tailwind_velocity, max_wind_grid
+                   get_max_tailwind_velocity, max_wind_grid, get_winds_batch, get_headwind_batch,
+                   get_crosswind_batch
                    )
+from winds import batch, set_trig_table
+from winds.trig import TrigTable
+from winds import grid
+from winds.grid import wind_grid, full_wind_grid, cached_wind_grid
+from winds import envelope
+from winds.envelope import WindEnvelope, get_envelope
+from winds import selector
+from winds.selector import rank_runways, select_runways
+from winds import pipeline
+from winds.pipeline import run_batch, read_chunks, guess_format
+from winds import arrays
+from winds.arrays import DirectionArray, WindVectorArray
+from winds.winds import WindVector
+import pickle
+from winds import gusts
+from winds.gusts import worst_case_winds, gust_wind_grid
+from winds import _compat
+from winds.config import Config
+from winds.batch import evaluate_limits_batch
 from winds.calculator import WindCalculator
 from winds.shell import WindShell, catch_and_log_error
    
 
 
-@pytest.fixture('class')
+@pytest.fixture(scope='class')
 def mock_wind_calc_shell():
     mock_calculator = Mock()
 
@@ -187,6 +211,313 @@ def test_max_wind_grid_returns_when_only_one_max_wind_specified(ref_hdg, num, ma
     assert list(expected.keys()) == list(results.keys())
 
 
+BATCH_WINDS = [-725.5, -10, 0, 7, 30, 89.9, 90, 150, 180, 210, 270, 359.9, 360, 725]
+BATCH_RUNWAYS = [-40, 0, 90, 180.5, 360]
+
+
+def test_get_winds_batch_matches_scalar_exactly(numpy_toggle):
+    numpy_toggle(batch)
+    for runway in BATCH_RUNWAYS:
+        result = get_winds_batch(BATCH_WINDS, 20, runway)
+        expected = [get_winds(wind, 20, runway) for wind in BATCH_WINDS]
+        assert list(result.h_wind) == [w.h_wind for w in expected]
+        assert list(result.x_wind) == [w.x_wind for w in expected]
+        assert list(get_headwind_batch(BATCH_WINDS, 20, runway)) == [get_headwind(w, 20, runway) for w in BATCH_WINDS]
+        assert list(get_crosswind_batch(BATCH_WINDS, 20, runway)) == [get_crosswind(w, 20, runway) for w in BATCH_WINDS]
+
+
+def test_get_winds_batch_broadcasts_all_arguments(numpy_toggle):
+    numpy_toggle(batch)
+    result = get_winds_batch(30, [10, 20], [360, 90])
+    assert list(result.h_wind) == [get_headwind(30, 10, 360), get_headwind(30, 20, 90)]
+    assert list(result.x_wind) == [get_crosswind(30, 10, 360), get_crosswind(30, 20, 90)]
+
+
+def test_get_winds_batch_pure_python_rejects_mismatched_lengths(monkeypatch):
+    monkeypatch.setattr(batch, 'np', None)
+    with pytest.raises(ValueError):
+        get_winds_batch([10, 20, 30], [10, 20], 360)
+
+
+@pytest.mark.parametrize('resolution', [1, 10])
+def test_trig_table_backend_matches_exact_math(resolution):
+    wind_dirs = [0, 10, 45, 90, 135.5, 180, 233.3, 270, 359.9, -20]
+    expected = [(get_winds(w, 25, 90), get_headwind(w, 25, 90), get_crosswind(w, 25, 90)) for w in wind_dirs]
+    set_trig_table(TrigTable(resolution))
+    try:
+        result = [(get_winds(w, 25, 90), get_headwind(w, 25, 90), get_crosswind(w, 25, 90)) for w in wind_dirs]
+    finally:
+        set_trig_table(None)
+    assert result == expected
+
+
+def test_trig_table_only_holds_table_points():
+    table = TrigTable(resolution=10)
+    assert len(table) == 3600
+    assert table.cos_sin(12.5) is not None
+    assert table.cos_sin(12.55) is None
+    with pytest.raises(ValueError):
+        TrigTable(resolution=.5)
+
+
+GRID_CASES = [
+    (360, 2, 10, 10, 10, 360),
+    (90, 3, 10, -1, 10, 360),
+    (90, 2, -1, 10, 10, 90),
+    (180, 2, 5, 500, 10, 90),
+    (135, 1, 10, 10, 45, 360),
+    (10, 4, 15, 38, 7, 270),
+    (225.5, 5, 10, 29, .1, 233),
+]
+
+
+@pytest.mark.parametrize('wind_hdg, num, max_tail, max_cross, increment, runway_hdg', GRID_CASES)
+def test_wind_grid_matches_max_wind_grid(wind_hdg, num, max_tail, max_cross, increment, runway_hdg, numpy_toggle):
+    numpy_toggle(grid)
+    expected = max_wind_grid(wind_hdg, num, max_tail, max_cross, increment, runway_hdg)
+    result = wind_grid(wind_hdg, num, max_tail, max_cross, increment, runway_hdg)
+    assert list(result.items()) == list(expected.items())
+
+
+@pytest.mark.parametrize('increment, expected_hdgs', [
+    (7, [346, 353, 0, 7, 14]),
+    (.1, [359.8, 359.9, 0.0, 0.1, 0.2]),
+    (2.5, [355.0, 357.5, 0.0, 2.5, 5.0]),
+])
+def test_max_wind_grid_terminates_for_uneven_increments(increment, expected_hdgs):
+    assert list(max_wind_grid(0, 2, max_cross=10, increment=increment).keys()) == expected_hdgs
+
+
+@pytest.mark.parametrize('increment, size', [(1, 360), (.1, 3600), (7, 52)])
+def test_full_wind_grid_covers_all_directions(increment, size):
+    result = full_wind_grid(10, 38, increment, 90)
+    assert len(result) == size
+    assert next(iter(result)) == 0
+    assert list(result.values())[1] == max_wind_grid(increment, 0, 10, 38, 1, 90)[increment]
+
+
+def test_cached_wind_grid_reuses_results():
+    cached_wind_grid.cache_clear()
+    first = cached_wind_grid(200, 2, 10, 38, 10, 90)
+    second = cached_wind_grid(200, 2, 10, 38, 10, 90)
+    assert first == second
+    assert first is not second
+    assert cached_wind_grid.cache_info().hits == 1
+    assert cached_wind_grid.cache_info().misses == 1
+
+
+class TestWindEnvelope:
+    @pytest.mark.parametrize('wind_hdg, num, max_tail, max_cross, increment, runway_hdg', GRID_CASES)
+    def test_window_matches_max_wind_grid(self, wind_hdg, num, max_tail, max_cross, increment, runway_hdg,
+                                          numpy_toggle):
+        numpy_toggle(envelope, grid)
+        env = WindEnvelope(runway_hdg, max_tail, max_cross, increment=.1)
+        expected = max_wind_grid(wind_hdg, num, max_tail, max_cross, increment, runway_hdg)
+        assert list(env.window(wind_hdg, num, increment).items()) == list(expected.items())
+
+    def test_velocity_at_off_table_direction_is_exact(self):
+        env = WindEnvelope(90, 10, 38)
+        assert env.velocity_at(200) == max_wind_grid(200, 0, 10, 38, 1, 90)[200]
+        assert env.velocity_at(200.25) == max_wind_grid(200.25, 0, 10, 38, 1, 90)[200.25]
+
+    def test_increment_must_divide_circle(self):
+        with pytest.raises(ValueError):
+            WindEnvelope(90, 10, 38, increment=7)
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        env = WindEnvelope(270, 15, 29, increment=.5)
+        path = tmp_path.joinpath('env.bin')
+        env.save(path)
+        loaded = WindEnvelope.load(path)
+        assert loaded.profile == env.profile
+        assert list(loaded.velocities) == list(env.velocities)
+
+    def test_get_envelope_uses_cache_dir(self, tmp_path):
+        get_envelope.cache_clear()
+        built = get_envelope(90, 10, 38, 1, tmp_path)
+        get_envelope.cache_clear()
+        with mock.patch('winds.envelope.full_wind_grid') as full_grid:
+            loaded = get_envelope(90, 10, 38, 1, tmp_path)
+            full_grid.assert_not_called()
+        assert list(loaded.velocities) == list(built.velocities)
+
+
+def test_select_runways_ranks_every_wind(numpy_toggle):
+    numpy_toggle(selector, batch)
+    runways = [90, 270, 180, 360]
+    selection = select_runways(runways, [250, 100, 190], [15, 40, 30], 38, 10)
+    assert [runways[i] for i in selection.order[0]] == [270, 180, 360, 90]
+    assert [runways[i] for i in selection.order[1]] == [90, 180, 360, 270]
+    assert [runways[i] for i in selection.order[2]] == [180, 270, 90, 360]
+    assert list(selection.within_limits[1]) == [True, False, False, False]
+    assert selection.h_wind[0][1] == get_headwind(250, 15, 270)
+    assert selection.x_wind[2][0] == get_crosswind(190, 30, 90)
+
+
+def test_rank_runways_reports_components_and_limits():
+    ranks = rank_runways([90, 270], 250, 15, 38, 10)
+    assert [rank.runway for rank in ranks] == [270, 90]
+    assert ranks[0].h_wind == get_headwind(250, 15, 270)
+    assert ranks[0].crosswind_margin == pytest.approx(38 - abs(get_crosswind(250, 15, 270)))
+    assert ranks[0].within_limits
+    assert not ranks[1].within_limits
+
+
+BATCH_CSV = '''wind_dir,speed,runway,phase
+250,15,270,takeoff
+100,12,270,landing
+190,30,180,
+'''
+
+
+@pytest.mark.parametrize('out_fmt', ['csv', 'jsonl'])
+def test_run_batch_evaluates_every_record(out_fmt, numpy_toggle):
+    numpy_toggle(pipeline, batch)
+    out = io.StringIO()
+    count = run_batch(io.StringIO(BATCH_CSV), out, WindCalculator(), 'csv', out_fmt, chunk_size=2)
+    assert count == 3
+    if out_fmt == 'csv':
+        rows = out.getvalue().splitlines()
+        assert rows[0] == 'wind_dir,speed,runway,phase,h_wind,x_wind,max_crosswind,max_tailwind,within_limits'
+        assert rows[1:] == [
+            '250,15,270,takeoff,14.1,-5.1,38.0,15.0,True',
+            '100,12,270,landing,-11.8,-2.1,38.0,10.0,False',
+            '190,30,180,,29.5,5.2,38.0,15.0,True',
+        ]
+    else:
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [r['within_limits'] for r in records] == [True, False, True]
+        assert records[1]['max_tailwind'] == 10.0
+
+
+def test_read_chunks_bounds_chunk_size():
+    lines = ''.join(json.dumps({'wind_dir': i, 'speed': 10}) + '\n' for i in range(5))
+    chunks = list(read_chunks(io.StringIO(lines), 'jsonl', chunk_size=2))
+    assert [len(chunk['wind_dir']) for chunk in chunks] == [2, 2, 1]
+
+
+def test_run_batch_pads_short_rows_and_blank_runways(numpy_toggle):
+    numpy_toggle(pipeline, batch)
+    calc = WindCalculator()
+    calc.runway_heading = 90
+    source = 'wind_dir,speed,runway,phase\n250,15,270,takeoff\n100,12\n190,30,,landing\n'
+    out = io.StringIO()
+    assert run_batch(io.StringIO(source), out, calc, 'csv', 'csv') == 3
+    rows = [row.split(',') for row in out.getvalue().splitlines()[1:]]
+    assert [row[2:4] for row in rows] == [['270', 'takeoff'], ['', ''], ['', 'landing']]
+    expected = [get_headwind(250, 15, 270), get_headwind(100, 12, 90), get_headwind(190, 30, 90)]
+    assert [float(row[4]) for row in rows] == [round(h_wind, 1) for h_wind in expected]
+
+
+def test_read_chunks_rejects_long_rows():
+    with pytest.raises(ValueError, match='line 3'):
+        list(read_chunks(io.StringIO('wind_dir,speed\n250,15\n100,12,270\n')))
+
+
+def test_run_batch_jsonl_keys_from_every_record():
+    source = '{"wind_dir": 250, "speed": 15}\n{"wind_dir": 250, "speed": 15, "runway": 270}\n' \
+             '{"wind_dir": 250, "speed": 15, "runway": null}\n'
+    out = io.StringIO()
+    assert run_batch(io.StringIO(source), out, WindCalculator(), 'jsonl', 'jsonl') == 3
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r['runway'] for r in records] == [None, 270, None]
+    expected = [get_headwind(250, 15, 360), get_headwind(250, 15, 270), get_headwind(250, 15, 360)]
+    assert [r['h_wind'] for r in records] == [round(h_wind, 1) for h_wind in expected]
+
+
+@pytest.mark.parametrize('path, expected', [('-', 'csv'), ('obs.jsonl', 'jsonl'), ('obs.CSV', 'csv')])
+def test_guess_format(path, expected):
+    assert guess_format(path) == expected
+
+
+@pytest.mark.parametrize('args, expected', [
+    ((240, 15, None, None, None, 270), (7.5, 0)),
+    ((240, 15, 25, None, None, 270), (12.5, 0)),
+    ((240, 15, 25, 240, 300, 270), (12.5, 0)),
+    ((240, 15, None, 170, 300, 270), (15, 2.6)),
+    ((60, 10, 20, None, None, 270), (10, 17.32)),
+    ((None, 10, None, None, None, 270), (10, 10)),
+    ((340, 10, None, 340, 20, 180), (3.42, 10)),
+    ((0, 10, None, 350, 10, 90), (10, 1.74)),
+], ids=['steady', 'gust', 'sector inside quadrant', 'sector spans beam', 'gusting tailwind', 'VRB',
+        'sector spans tail', 'sector wraps north'])
+def test_worst_case_winds(args, expected, numpy_toggle):
+    numpy_toggle(gusts)
+    result = worst_case_winds(*args)
+    assert result.x_wind[0] == pytest.approx(expected[0], abs=.01)
+    assert result.t_wind[0] == pytest.approx(expected[1], abs=.01)
+
+
+def test_worst_case_winds_evaluates_arrays():
+    result = worst_case_winds([240, 60, None], 10, [20, None, None], runway=270)
+    assert list(result.t_wind) == pytest.approx([0, 8.66, 10], abs=.01)
+
+
+def test_gust_wind_grid_subtracts_gust_factor():
+    base = max_wind_grid(360, 2, 10, 10, 10, 360)
+    result = gust_wind_grid(360, 2, 10, 10, 10, 360, gust_factor=15)
+    assert result.keys() == base.keys()
+    assert result[0] == -1
+    assert result[20] == pytest.approx(base[20] - 15)
+    assert gust_wind_grid(90, 0, max_cross=10, gust_factor=15)[90] == 0
+
+
+class TestConfig:
+    def test_get_max_crosswinds_matches_scalar_lookup(self, numpy_toggle):
+        numpy_toggle(_compat)
+        rcams = [6, 5, 4, 3, 2, 1, 3]
+        assert list(Config().get_max_crosswinds(rcams)) == [Config().get_max_crosswind(r) for r in rcams]
+
+    @pytest.mark.parametrize('bad_rcam', [0, 7, -1])
+    def test_get_max_crosswinds_rejects_invalid_codes(self, bad_rcam, numpy_toggle):
+        numpy_toggle(_compat)
+        with pytest.raises(KeyError):
+            Config().get_max_crosswinds([5, bad_rcam])
+
+    def test_get_max_crosswind_error_lists_valid_codes(self):
+        with pytest.raises(KeyError, match='available values'):
+            Config().get_max_crosswind(9)
+
+
+def test_evaluate_limits_batch_uses_rcam_per_wind(numpy_toggle):
+    numpy_toggle(_compat, batch)
+    result = evaluate_limits_batch([90, 90, 270], [20, 20, 20], 360, max_tail=10, rcam=[5, 1, 3])
+    assert list(result.max_crosswind) == [38, 15, 25]
+    assert list(result.within_limits) == [True, False, True]
+
+
+def test_max_wind_grid_uses_rcam_crosswind_limit():
+    assert max_wind_grid(90, 1, rcam=2) == max_wind_grid(90, 1, max_cross=20)
+    assert wind_grid(90, 1, rcam=2) == max_wind_grid(90, 1, max_cross=20)
+    assert wind_grid(90, 1, rcam=2, unit='mps') == max_wind_grid(90, 1, rcam=2, unit='mps')
+
+
+def test_rcam_table_is_built_once():
+    cfg = Config()
+    assert cfg.rcam_crosswind_table is cfg.rcam_crosswind_table
+
+
+def _run_python(*args):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+
+def test_importing_shell_is_lazy():
+    out = _run_python('-c', 'import sys, winds.shell; '
+                            'print(sorted(m for m in ("numpy", "argparse", "winds.grid", "winds.batch") '
+                            'if m in sys.modules))').stdout
+    assert out.strip() == '[]'
+
+
+def test_lazy_attributes_resolve():
+    import winds
+    assert winds.wind_grid is wind_grid
+    assert winds.WindCalculator is WindCalculator
+    assert winds.shell.WindShell is WindShell
+    assert 'get_envelope' in dir(winds)
+    with pytest.raises(AttributeError):
+        winds.not_a_name
+
+
 class TestWindCalculator:
     @pytest.mark.parametrize('property, setter_val, expected_on_call', [
         ('max_ldg_tailwind', '50', 50.0),
@@ -212,6 +543,29 @@ class TestWindCalculator:
             assert getattr(wind_calc, attr) == new_val
             wind_calc.reset_all()
             assert val == getattr(wind_calc, attr)
+
+    def test_rcam_sets_crosswind_limit_until_overridden(self):
+        wind_calc = WindCalculator()
+        wind_calc.rcam = 3
+        assert wind_calc.max_crosswind == 25
+        assert wind_calc.rcam == 3
+        wind_calc.max_crosswind = 30
+        assert wind_calc.rcam is None
+        wind_calc.rcam = 4
+        wind_calc.reset_all()
+        assert wind_calc.rcam is None
+
+    def test_evaluate_batch_with_rcams(self):
+        wind_calc = WindCalculator()
+        result = wind_calc.evaluate_batch([90, 90], [20, 20], rcams=[5, 1])
+        assert list(result.within_limits) == [True, False]
+
+    @pytest.mark.parametrize('landing, max_tail', [(False, 15), (True, 10)])
+    def test_envelope_uses_phase_tailwind_limit(self, landing, max_tail):
+        wind_calc = WindCalculator()
+        wind_calc.runway_heading = 90
+        env = wind_calc.envelope(landing=landing)
+        assert env.profile == (90, max_tail, wind_calc.max_crosswind, 1)
             
             
         
@@ -264,6 +618,69 @@ class TestDirection:
         assert d != 90.0
         assert d == 90.06
         assert d == 90.14
+
+    def test_is_immutable_and_hashable(self):
+        d = Direction(90.04)
+        with pytest.raises(AttributeError):
+            d._value = 10
+        with pytest.raises(AttributeError):
+            d.other = 10
+        assert hash(d) == hash(Direction(90))
+        assert len({Direction(90), Direction(450), Direction(90.01)}) == 1
+        assert pickle.loads(pickle.dumps(d)) == d
+
+    def test_compares_unequal_to_other_types(self):
+        assert Direction(90) != '90'
+
+    def test_compares_equal_to_numpy_scalars(self):
+        np = pytest.importorskip('numpy')
+        assert Direction(90) == np.int64(450) and Direction(90.5) == np.float32(90.5)
+        assert Direction(90) != np.float64(91)
+
+
+class TestDirectionArray:
+    @pytest.fixture
+    def use_numpy(self, numpy_toggle):
+        return numpy_toggle(arrays, batch)
+
+    def test_arithmetic_matches_direction(self, use_numpy):
+        values = [0, 90.04, 359.9, -540, 725.5]
+        directions = DirectionArray(values)
+        assert list((directions + 20).values) == [(Direction(v) + 20).value for v in values]
+        assert list((directions - Direction(90)).values) == [(Direction(v) - 90).value for v in values]
+        assert list(directions.theta(45).values) == [Direction(v).theta(45).value for v in values]
+        assert list(directions.equals(DirectionArray([0, 90, 0, 180, 5.5]))) == [True, True, False, True, True]
+
+    def test_indexing_returns_scalar_types(self, use_numpy):
+        directions = DirectionArray([10, 20, 30])
+        assert directions[1] == Direction(20)
+        assert list(directions[1:].values) == [20, 30]
+        assert list(directions) == [Direction(10), Direction(20), Direction(30)]
+
+    def test_wind_vector_array_round_trips_vectors(self, use_numpy):
+        vectors = [WindVector(250, 15), WindVector(100, 12.5)]
+        winds_array = WindVectorArray.from_vectors(vectors)
+        assert list(winds_array) == vectors
+        assert winds_array[1] == vectors[1]
+        components = winds_array.components(270)
+        assert list(components.h_wind) == [get_headwind(250, 15, 270), get_headwind(100, 12.5, 270)]
+
+    def test_wind_vector_array_round_trips_gusts_and_sectors(self, use_numpy):
+        vectors = [WindVector(250, 15, gust=25, variable_from=220, variable_to=280), WindVector(None, 3),
+                   WindVector(100, 10, 'mps', gust=15)]
+        winds_array = WindVectorArray.from_vectors(vectors, 'mps')
+        assert list(winds_array) == [vector.to_unit('mps') for vector in vectors]
+        assert list(winds_array[1:]) == [vector.to_unit('mps') for vector in vectors[1:]]
+        in_knots = winds_array.to_unit('kts')[2]
+        assert (in_knots.strength, in_knots.gust) == pytest.approx((19.438445, 29.157667))
+        plain = WindVectorArray.from_vectors([WindVector(250, 15)])
+        assert plain.gusts is plain.variable_from is plain.variable_to is None
+
+    def test_wind_vector_array_requires_equal_lengths(self, use_numpy):
+        with pytest.raises(ValueError):
+            WindVectorArray([10, 20], [5])
+        with pytest.raises(ValueError):
+            WindVectorArray([10, 20], [5, 6], gusts=[10])
         
         
         
@@ -271,7 +688,13 @@ class TestDirection:
             
             
 class TestWindVector:
-    pass
+    def test_is_immutable_and_hashable(self):
+        vector = WindVector(250, 15)
+        with pytest.raises(AttributeError):
+            vector.strength = 20
+        assert vector == WindVector(Direction(610), 15)
+        assert hash(vector) == hash(WindVector(250.01, 15))
+        assert pickle.loads(pickle.dumps(vector)) == vector
 
 
 class TestWindShell:
@@ -300,6 +723,33 @@ class TestWindShell:
         shell.onecmd('reset')
         shell.wind_calc.reset_all.assert_called_with()
         
+    def test_do_best_lists_best_runway_first(self, capsys):
+        shell = WindShell()
+        shell.do_best('250 15 90 270 180 l')
+        out, err = capsys.readouterr()
+        lines = out.splitlines()
+        assert lines[0].startswith('RWY 270')
+        assert lines[-1].startswith('RWY 090') and lines[-1].endswith('OVER LIMITS')
+
+    def test_do_best_shows_runway_360(self, capsys):
+        shell = WindShell()
+        shell.do_best('350 15 360 180')
+        out, err = capsys.readouterr()
+        assert out.splitlines()[0].startswith('RWY 360')
+
+    def test_do_winds_with_gust_shows_worst_case(self, capsys):
+        shell = WindShell()
+        shell.do_r('270')
+        shell.do_winds('240 15 25')
+        out, err = capsys.readouterr()
+        assert 'worst case -> Crosswind: 12.5 Tailwind: 0.0' in out
+
+    def test_do_grid_with_gust_factor(self, capsys):
+        shell = WindShell()
+        shell.do_grid('200 l g10')
+        out, err = capsys.readouterr()
+        assert 'gusts +10.0 kts' in out
+
     def test_do_winds(self, capsys):
         shell = WindShell()
         
@@ -1,3 +1,62 @@
+"""
+Wind calculation package
+
+Only the core scalar functions in `winds.winds` are imported up front. Everything else (the
+vectorized engines, the calculator and the shell) is imported on first attribute access
+(PEP 562), so short-lived processes only pay for what they use.
+"""
+from importlib import import_module
+
 from .winds import *
-from . import shell
-from . import calculator
+
+_LAZY_ATTRS = {
+    'get_winds_batch': 'batch',
+    'get_headwind_batch': 'batch',
+    'get_crosswind_batch': 'batch',
+    'evaluate_limits_batch': 'batch',
+    'wind_grid': 'grid',
+    'full_wind_grid': 'grid',
+    'cached_wind_grid': 'grid',
+    'WindEnvelope': 'envelope',
+    'get_envelope': 'envelope',
+    'rank_runways': 'selector',
+    'select_runways': 'selector',
+    'DirectionArray': 'arrays',
+    'WindVectorArray': 'arrays',
+    'worst_case_winds': 'gusts',
+    'gust_wind_grid': 'gusts',
+    'WindCalculator': 'calculator',
+    'MetarFetcher': 'fetch',
+    'fetch_winds': 'fetch',
+    'ObservationCache': 'cache',
+    'WindArchive': 'archive',
+    'WindStats': 'usability',
+    'convert_speed': 'units',
+    'AirportDatabase': 'airports',
+    'DeclinationGrid': 'magvar',
+    'parse_taf': 'taf',
+    'TafTimeline': 'taf',
+    'WindMonitor': 'monitor',
+    'WindLimits': 'solver',
+    'solve_max_wind': 'solver',
+}
+
+_LAZY_SUBMODULES = {
+    'airports', 'archive', 'arrays', 'batch', 'cache', 'calculator', 'config', 'envelope', 'fetch', 'grid', 'gusts',
+    'magvar', 'metar', 'monitor', 'parallel', 'pipeline', 'selector', 'shell', 'solver', 'standin', 'taf', 'trig',
+    'units', 'usability',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(import_module(f'.{_LAZY_ATTRS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    if name in _LAZY_SUBMODULES:
+        return import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS) | _LAZY_SUBMODULES)
@@ -0,0 +1,39 @@
+"""
+Module containing optional dependency handling shared by the vectorized modules
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def broadcast_lists(*args):
+    """
+    Return a list of equal length lists from a mix of scalars and sequences.
+
+    Scalars (and length 1 sequences) are repeated to the length of the longest
+    sequence. Used by the pure python fallbacks when NumPy is not installed.
+
+    Example:
+
+        >>> broadcast_lists(1, [2, 3])
+        [[1, 1], [2, 3]]
+    """
+    lists = [list(arg) if _is_sequence(arg) else [arg] for arg in args]
+    size = max(len(lst) for lst in lists)
+    out = []
+    for lst in lists:
+        if len(lst) == size:
+            out.append(lst)
+        elif len(lst) == 1:
+            out.append(lst * size)
+        else:
+            raise ValueError(f'cannot broadcast sequence of length {len(lst)} to length {size}')
+    return out
+
+
+def _is_sequence(obj):
+    return hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes))
@@ -0,0 +1,296 @@
+"""
+Module containing the runway database: airports and their runways, looked up by ident or position
+
+The database is a small sqlite file built once from a CSV with one line per runway:
+
+    icao,iata,name,lat,lon,elevation_ft,runway,heading,length_ft,surface
+    KJFK,JFK,John F Kennedy Intl,40.6398,-73.7789,13,04L/22R,44,12079,ASPH
+
+`heading` is the magnetic heading of the first runway end; each end is stored as its own runway
+(04L at 044°, 22R at 224°). Airports are indexed by ICAO and IATA ident and by position, so
+opening the database and answering a lookup takes milliseconds instead of a CSV parse.
+
+    python -m winds.airports build runways.csv airports.sqlite
+    python -m winds.airports lookup KJFK
+    python -m winds.airports nearest 40.7 -74.0 --count 3
+"""
+import argparse
+import csv
+import math
+import sqlite3
+import sys
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent.joinpath('data')
+DEFAULT_CSV = DATA_DIR.joinpath('runways.csv')
+DEFAULT_DATABASE = DATA_DIR.joinpath('airports.sqlite')
+
+EARTH_RADIUS_NM = 3440.065
+# nearest() searches boxes of this half width first and widens them until enough airports are found
+SEARCH_RADIUS_NM = 60
+MAX_SEARCH_RADIUS_NM = math.pi * EARTH_RADIUS_NM
+
+Runway = namedtuple('Runway', ['ident', 'heading', 'length_ft', 'surface'])
+Airport = namedtuple('Airport', ['icao', 'iata', 'name', 'lat', 'lon', 'elevation_ft', 'runways'])
+NearbyAirport = namedtuple('NearbyAirport', ['airport', 'distance_nm'])
+
+_SCHEMA = """
+CREATE TABLE airports (
+    icao TEXT PRIMARY KEY,
+    iata TEXT,
+    name TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    elevation_ft INTEGER
+) WITHOUT ROWID;
+CREATE INDEX airports_iata ON airports (iata);
+CREATE INDEX airports_position ON airports (lat, lon);
+CREATE TABLE runways (
+    icao TEXT NOT NULL,
+    ident TEXT NOT NULL,
+    heading REAL NOT NULL,
+    length_ft INTEGER,
+    surface TEXT,
+    PRIMARY KEY (icao, ident)
+) WITHOUT ROWID;
+"""
+
+
+def runway_ends(designator, heading):
+    """
+    Return the (ident, magnetic heading) of both ends of a runway.
+
+    Example:
+
+        >>> runway_ends('04L/22R', 44)
+        [('04L', 44.0), ('22R', 224.0)]
+    """
+    idents = designator.split('/')
+    if len(idents) != 2:
+        raise ValueError(f'runway designator must look like 04L/22R, not {designator!r}')
+    heading = float(heading) % 360
+    return [(idents[0], heading), (idents[1], (heading + 180) % 360)]
+
+
+def distance_nm(lat1, lon1, lat2, lon2):
+    """
+    Return the great circle distance in nautical miles between two positions in degrees.
+
+    Example:
+
+        >>> round(distance_nm(40.6398, -73.7789, 42.3643, -71.0052))
+        162
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def build_database(csv_path=DEFAULT_CSV, db_path=DEFAULT_DATABASE):
+    """
+    Build the sqlite runway database at `db_path` from a runway CSV and return the airport count.
+
+    An existing database at `db_path` is replaced.
+    """
+    airports, runways = {}, []
+    with open(csv_path, newline='', encoding='utf-8') as fileobj:
+        for record in csv.DictReader(fileobj):
+            icao = record['icao'].strip().upper()
+            airports.setdefault(icao, (
+                icao, record['iata'].strip().upper() or None, record['name'].strip(), float(record['lat']),
+                float(record['lon']), int(record['elevation_ft']) if record['elevation_ft'] else None,
+            ))
+            for ident, heading in runway_ends(record['runway'].strip(), record['heading']):
+                runways.append((icao, ident, heading, int(record['length_ft']) if record['length_ft'] else None,
+                                record['surface'].strip() or None))
+    db_path = Path(db_path)
+    tmp_path = db_path.with_name(db_path.name + '.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+    db = sqlite3.connect(str(tmp_path))
+    try:
+        db.executescript(_SCHEMA)
+        db.executemany('INSERT INTO airports VALUES (?, ?, ?, ?, ?, ?)', airports.values())
+        db.executemany('INSERT INTO runways VALUES (?, ?, ?, ?, ?)', runways)
+        db.commit()
+        db.execute('VACUUM')
+    finally:
+        db.close()
+    tmp_path.replace(db_path)
+    return len(airports)
+
+
+class AirportDatabase:
+    """
+    Read only view of a runway database built by `build_database`.
+
+    `airport('KJFK')` (or the IATA 'JFK') returns an `Airport` with its `Runway` ends,
+    `runway('KJFK', '22R')` a single runway end and `nearest(lat, lon)` the closest airports.
+    Unknown idents raise KeyError. Airports are cached once read, so repeat lookups do not touch
+    the database.
+    """
+
+    def __init__(self, path=DEFAULT_DATABASE):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f'no runway database at {self.path}; build one with build_database()')
+        self._db = sqlite3.connect(f'{self.path.resolve().as_uri()}?mode=ro', uri=True, check_same_thread=False)
+        self._airports = {}
+
+    def __repr__(self):
+        return f'AirportDatabase({str(self.path)!r})'
+
+    def __len__(self):
+        return self._db.execute('SELECT count(*) FROM airports').fetchone()[0]
+
+    def __contains__(self, ident):
+        try:
+            self.airport(ident)
+        except KeyError:
+            return False
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def idents(self):
+        """Return every ICAO ident in the database, sorted."""
+        return [row[0] for row in self._db.execute('SELECT icao FROM airports ORDER BY icao')]
+
+    def airport(self, ident):
+        """
+        Return the `Airport` for an ICAO or IATA ident (any case).
+        """
+        key = str(ident).strip().upper()
+        airport = self._airports.get(key)
+        if airport is not None:
+            return airport
+        column = 'iata' if len(key) == 3 else 'icao'
+        row = self._db.execute(f'SELECT * FROM airports WHERE {column} = ?', (key,)).fetchone()
+        if row is None:
+            raise KeyError(f'{ident} is not in the runway database')
+        return self._make_airport(row)
+
+    __getitem__ = airport
+
+    def runway(self, ident, runway_ident):
+        """
+        Return the `Runway` end `runway_ident` (e.g. '22R', or '4L' for '04L') at airport `ident`.
+        """
+        key = str(runway_ident).strip().upper()
+        if key[:1].isdigit() and not key[1:2].isdigit():
+            key = '0' + key
+        for runway in self.airport(ident).runways:
+            if runway.ident == key:
+                return runway
+        raise KeyError(f'{ident} has no runway {runway_ident}')
+
+    def nearest(self, lat, lon, count=1, max_distance_nm=None):
+        """
+        Return a list of up to `count` NearbyAirport(airport, distance_nm), nearest first.
+
+        Only airports inside a lat/lon box around the position are read (through the position
+        index); the box starts `SEARCH_RADIUS_NM` wide and is widened until `count` airports are
+        found within it, or it reaches `max_distance_nm`.
+        """
+        limit = MAX_SEARCH_RADIUS_NM if max_distance_nm is None else max_distance_nm
+        radius = min(SEARCH_RADIUS_NM, limit)
+        while True:
+            found = sorted(
+                (distance, icao) for icao, distance in self._within(lat, lon, radius) if distance <= radius
+            )
+            if len(found) >= count or radius >= limit:
+                return [NearbyAirport(self.airport(icao), distance) for distance, icao in found[:count]]
+            radius = min(radius * 4, limit)
+
+    def _within(self, lat, lon, radius):
+        dlat = radius / 60
+        cos_lat = math.cos(math.radians(min(abs(lat) + dlat, 90)))
+        dlon = 180 if cos_lat < 1e-6 else min(radius / (60 * cos_lat), 180)
+        lat_range = (lat - dlat, lat + dlat)
+        west, east = lon - dlon, lon + dlon
+        if dlon >= 180:
+            lon_ranges = [(-180, 180)]
+        elif west < -180:
+            lon_ranges = [(west + 360, 180), (-180, east)]
+        elif east > 180:
+            lon_ranges = [(west, 180), (-180, east - 360)]
+        else:
+            lon_ranges = [(west, east)]
+        for lon_range in lon_ranges:
+            rows = self._db.execute(
+                'SELECT icao, lat, lon FROM airports WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?',
+                lat_range + lon_range)
+            for icao, row_lat, row_lon in rows:
+                yield icao, distance_nm(lat, lon, row_lat, row_lon)
+
+    def _make_airport(self, row):
+        runways = tuple(Runway(*r) for r in self._db.execute(
+            'SELECT ident, heading, length_ft, surface FROM runways WHERE icao = ? ORDER BY ident', (row[0],)))
+        airport = Airport(*row, runways=runways)
+        self._airports[airport.icao] = airport
+        if airport.iata:
+            self._airports[airport.iata] = airport
+        return airport
+
+
+@lru_cache(maxsize=None)
+def default_database():
+    """
+    Return the `AirportDatabase` bundled with the package, building it from the CSV if it is missing.
+    """
+    if not DEFAULT_DATABASE.exists():
+        build_database(DEFAULT_CSV, DEFAULT_DATABASE)
+    return AirportDatabase(DEFAULT_DATABASE)
+
+
+def format_airport(airport):
+    """
+    Return a printable summary of an airport and its runway ends.
+    """
+    iata = f'/{airport.iata}' if airport.iata else ''
+    lines = [f'{airport.icao}{iata} {airport.name} ({airport.lat:.4f}, {airport.lon:.4f}) '
+             f'elev {airport.elevation_ft} ft']
+    for runway in airport.runways:
+        lines.append(f'  RWY {runway.ident:<4} {runway.heading:05.1f}°  {runway.length_ft} ft {runway.surface}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m winds.airports', description=__doc__.splitlines()[1])
+    parser.add_argument('--database', default=str(DEFAULT_DATABASE), help='runway database (sqlite)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='build the database from a runway CSV')
+    build.add_argument('csv', nargs='?', default=str(DEFAULT_CSV))
+    lookup = commands.add_parser('lookup', help='show airports by ICAO or IATA ident')
+    lookup.add_argument('idents', nargs='+')
+    nearest = commands.add_parser('nearest', help='show the airports nearest a position')
+    nearest.add_argument('lat', type=float)
+    nearest.add_argument('lon', type=float)
+    nearest.add_argument('--count', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        count = build_database(args.csv, args.database)
+        print(f'{count} airports written to {args.database}')
+        return 0
+    with AirportDatabase(args.database) as db:
+        if args.command == 'lookup':
+            for ident in args.idents:
+                print(format_airport(db.airport(ident)))
+        else:
+            for nearby in db.nearest(args.lat, args.lon, args.count):
+                print(f'{nearby.distance_nm:7.1f} nm  {format_airport(nearby.airport)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
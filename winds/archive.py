@@ -0,0 +1,290 @@
+"""
+Module containing the columnar wind archive used for runway limit backtesting
+
+An archive is a directory per station holding one raw little endian file per column:
+
+    time.u32        observation time, seconds since the epoch (uint32)
+    direction.i16   wind direction in degrees, -1 for VRB (int16)
+    speed.u8        wind speed in knots (uint8)
+    gust.u8         gust speed in knots, 0 without a gust (uint8)
+
+Five bytes of winds plus four of time per observation, so ten years of hourly METARs for one
+station is well under 1 MB. Columns are memory-mapped when read, and backtests walk them in
+fixed size chunks, so archives of any size are queried without loading them into RAM.
+
+    python -m winds.archive ingest metars.txt archive/ --year 2019 --month 7
+    python -m winds.archive backtest archive/KJFK --runway 220 --max-cross 38 --max-tail 10
+"""
+import calendar
+import mmap
+import sys
+from array import array
+from collections import namedtuple
+from pathlib import Path
+
+from ._compat import np
+from .envelope import get_envelope
+from .metar import iter_metar_winds
+from .units import conversion_factor
+
+# column name: (file suffix, numpy dtype, array typecode)
+COLUMNS = {
+    'time': ('u32', '<u4', 'I'),
+    'direction': ('i16', '<i2', 'h'),
+    'speed': ('u8', 'u1', 'B'),
+    'gust': ('u8', 'u1', 'B'),
+}
+VRB = -1
+NO_GUST = 0
+MAX_SPEED = 255
+CHUNK_SIZE = 1 << 20
+WRITE_BUFFER = 1 << 14
+
+Backtest = namedtuple('Backtest', ['observations', 'out_of_limits', 'vrb', 'first_time', 'last_time'])
+
+
+def _column_path(directory, name):
+    return Path(directory).joinpath(f'{name}.{COLUMNS[name][0]}')
+
+
+def _knots(value, unit):
+    return min(max(round(value * conversion_factor(unit, 'kts')), 0), MAX_SPEED)
+
+
+class ArchiveWriter:
+    """
+    Append observations to the station archive in `directory`, creating it if needed.
+
+    Rows are buffered and appended to the column files `WRITE_BUFFER` at a time; use as a
+    context manager (or call `close`) so the last rows are flushed.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._buffers = {name: array(typecode) for name, (_, _, typecode) in COLUMNS.items()}
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, timestamp, wind):
+        """
+        Add one observation: epoch seconds and a WindVector. Speeds are stored in whole knots.
+        """
+        buffers = self._buffers
+        buffers['time'].append(int(timestamp))
+        buffers['direction'].append(VRB if wind.direction is None else round(wind.direction.value) % 360)
+        buffers['speed'].append(_knots(wind.strength, wind.strength_unit))
+        buffers['gust'].append(NO_GUST if wind.gust is None else _knots(wind.gust, wind.strength_unit))
+        self.count += 1
+        if len(buffers['time']) >= WRITE_BUFFER:
+            self.flush()
+
+    def flush(self):
+        for name, buffer in self._buffers.items():
+            if sys.byteorder != 'little':
+                buffer.byteswap()
+            with open(_column_path(self.directory, name), 'ab') as f:
+                buffer.tofile(f)
+            del buffer[:]
+
+    def close(self):
+        self.flush()
+
+
+class WindArchive:
+    """
+    Read only, memory-mapped view of one station archive written by `ArchiveWriter`.
+
+    `time`, `direction`, `speed` and `gust` are the full columns (numpy memmaps, or memoryviews
+    without NumPy); nothing is read from disk until it is used.
+
+    Example:
+
+        >>> archive = WindArchive('archive/KJFK')  # doctest: +SKIP
+        >>> archive.backtest(220, max_tail=10, max_cross=38)  # doctest: +SKIP
+        Backtest(observations=87600, out_of_limits=1042, vrb=3310, first_time=..., last_time=...)
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._maps = []
+        sizes = set()
+        for name, (_, dtype, typecode) in COLUMNS.items():
+            path = _column_path(self.directory, name)
+            if not path.exists():
+                raise ValueError(f'{self.directory} is not a wind archive (missing {path.name})')
+            column = self._map(path, dtype, typecode)
+            setattr(self, name, column)
+            sizes.add(len(column))
+        if len(sizes) != 1:
+            raise ValueError(f'{self.directory} has columns of different lengths')
+
+    def _map(self, path, dtype, typecode):
+        if path.stat().st_size == 0:
+            return np.zeros(0, dtype=dtype) if np is not None else memoryview(array(typecode))
+        if np is not None:
+            return np.memmap(path, dtype=dtype, mode='r')
+        if sys.byteorder != 'little':
+            raise ValueError('reading archives without NumPy requires a little endian machine')
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(typecode)
+
+    def __len__(self):
+        return len(self.time)
+
+    def __repr__(self):
+        return f'WindArchive({str(self.directory)!r}, observations={len(self)})'
+
+    def chunks(self, chunk_size=CHUNK_SIZE):
+        """
+        Yield (time, direction, speed, gust) column slices of at most `chunk_size` observations.
+        """
+        for start in range(0, len(self), chunk_size):
+            end = start + chunk_size
+            yield self.time[start:end], self.direction[start:end], self.speed[start:end], self.gust[start:end]
+
+    def backtest(self, runway_hdg, max_tail=-1, max_cross=-1, start=None, end=None, gusts=True,
+                 chunk_size=CHUNK_SIZE, declination=0):
+        """
+        Return Backtest(observations, out_of_limits, vrb, first_time, last_time) for a runway.
+
+        An observation is out of limits when its speed (the gust, if `gusts` and one was
+        reported) is above the max velocity for its direction from `get_max_wind_velocity`.
+        VRB winds may blow from any direction, so they are held to the lowest limit around the
+        compass. `start`/`end` restrict the run to epoch times in [start, end).
+
+        Archived directions are true (as reported). For a magnetic `runway_hdg` pass the station's
+        `declination`: the runway is turned to true once instead of turning every observation.
+        """
+        if declination:
+            runway_hdg = (runway_hdg + declination) % 360
+        limits = get_envelope(runway_hdg, max_tail, max_cross).velocities
+        if np is None:
+            return self._backtest_python(list(limits), start, end, gusts, chunk_size)
+
+        limits = np.where(limits == -1, np.inf, limits)
+        limits = np.append(limits, limits.min())  # index -1 (VRB) reads the all-round limit
+        observations = out_of_limits = vrb = 0
+        first_time = last_time = None
+        for time, direction, speed, gust in self.chunks(chunk_size):
+            if start is not None or end is not None:
+                mask = np.ones(len(time), dtype=bool)
+                if start is not None:
+                    mask &= time >= start
+                if end is not None:
+                    mask &= time < end
+                time, direction, speed, gust = time[mask], direction[mask], speed[mask], gust[mask]
+            if not len(time):
+                continue
+            peak = np.maximum(speed, gust) if gusts else speed
+            out_of_limits += int(np.count_nonzero(peak > limits[direction]))
+            vrb += int(np.count_nonzero(direction == VRB))
+            observations += len(time)
+            chunk_first, chunk_last = int(time.min()), int(time.max())
+            first_time = chunk_first if first_time is None else min(first_time, chunk_first)
+            last_time = chunk_last if last_time is None else max(last_time, chunk_last)
+        return Backtest(observations, out_of_limits, vrb, first_time, last_time)
+
+    def _backtest_python(self, limits, start, end, gusts, chunk_size):
+        limits = [float('inf') if val == -1 else val for val in limits]
+        vrb_limit = min(limits)
+        observations = out_of_limits = vrb = 0
+        first_time = last_time = None
+        for times, directions, speeds, gust_speeds in self.chunks(chunk_size):
+            for time, direction, speed, gust in zip(times, directions, speeds, gust_speeds):
+                if (start is not None and time < start) or (end is not None and time >= end):
+                    continue
+                peak = max(speed, gust) if gusts else speed
+                if direction == VRB:
+                    vrb += 1
+                    out_of_limits += peak > vrb_limit
+                else:
+                    out_of_limits += peak > limits[direction]
+                observations += 1
+                first_time = time if first_time is None else min(first_time, time)
+                last_time = time if last_time is None else max(last_time, time)
+        return Backtest(observations, out_of_limits, vrb, first_time, last_time)
+
+    def close(self):
+        for name in COLUMNS:
+            setattr(self, name, None)
+        for mapped in self._maps:
+            mapped.close()
+        self._maps.clear()
+
+
+def metar_timestamp(ddhhmm, year, month):
+    """
+    Return epoch seconds for a METAR 'DDHHMM' time in `year`/`month` (UTC).
+
+    Example:
+
+        >>> metar_timestamp('121651', 2019, 7)
+        1562950260
+    """
+    day, hour, minute = int(ddhhmm[:2]), int(ddhhmm[2:4]), int(ddhhmm[4:])
+    return calendar.timegm((year, month, day, hour, minute, 0))
+
+
+def ingest_metars(fileobj, root, year, month):
+    """
+    Decode every METAR in `fileobj` and append its wind to `root/<STATION>`.
+
+    Report times only carry day/hour/minute, so the archive file's `year` and `month` are
+    needed. Returns {station: observations written}.
+    """
+    writers = {}
+    try:
+        for station, time, wind in iter_metar_winds(fileobj):
+            writer = writers.get(station)
+            if writer is None:
+                writer = writers[station] = ArchiveWriter(Path(root).joinpath(station))
+            writer.append(metar_timestamp(time, year, month), wind)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return {station: writer.count for station, writer in writers.items()}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build and query columnar wind archives')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='append the winds from a METAR file to an archive')
+    ingest.add_argument('metars', help='METAR text file, one report per line')
+    ingest.add_argument('root', help='archive directory (one subdirectory per station)')
+    ingest.add_argument('--year', type=int, required=True)
+    ingest.add_argument('--month', type=int, required=True)
+    backtest = commands.add_parser('backtest', help='count observations outside runway limits')
+    backtest.add_argument('station', help='station archive directory, e.g. archive/KJFK')
+    backtest.add_argument('--runway', type=float, required=True, help='runway heading')
+    backtest.add_argument('--max-cross', type=float, default=-1)
+    backtest.add_argument('--max-tail', type=float, default=-1)
+    backtest.add_argument('--no-gusts', action='store_true', help='use the steady speed only')
+    args = parser.parse_args(argv)
+
+    if args.command == 'ingest':
+        with open(args.metars) as f:
+            counts = ingest_metars(f, args.root, args.year, args.month)
+        for station, count in sorted(counts.items()):
+            print(f'{station}: {count} observations')
+        return 0
+
+    result = WindArchive(args.station).backtest(args.runway, args.max_tail, args.max_cross,
+                                                gusts=not args.no_gusts)
+    share = result.out_of_limits / result.observations if result.observations else 0
+    print(f'{result.out_of_limits} of {result.observations} observations out of limits ({share:.2%}), '
+          f'{result.vrb} VRB')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Module containing struct-of-arrays containers for many directions and wind vectors
+"""
+import math
+from array import array
+
+from ._compat import np, broadcast_lists
+from .batch import get_winds_batch
+from .units import convert_speed, normalize_unit
+from .winds import Direction, WindVector
+
+
+def _float_array(values):
+    """Return `values` as a float64 ndarray, or an array('d') when NumPy is not installed."""
+    if np is not None:
+        return np.array(values, dtype=float)
+    if not hasattr(values, '__iter__'):
+        values = [values]
+    return array('d', values)
+
+
+def _nan_for_none(value):
+    return math.nan if value is None else value
+
+
+def _none_for_nan(value):
+    """Return a float, or None for the NaN of a missing value (e.g. the direction of a VRB wind)."""
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class DirectionArray:
+    """
+    Many directions held in one float array, with the same arithmetic as `Direction`.
+
+    Indexing with an int returns a `Direction`, slicing returns a DirectionArray.
+
+    Example:
+
+        >>> (DirectionArray([90, 180, 350]) + 20).values
+        array([110., 200.,  10.])
+    """
+    __slots__ = ('_values',)
+
+    def __init__(self, values):
+        if isinstance(values, DirectionArray):
+            values = values._values
+        self._values = _float_array(values)
+
+    @classmethod
+    def from_directions(cls, directions):
+        return cls([d._value if isinstance(d, Direction) else d for d in directions])
+
+    def __repr__(self):
+        return f'DirectionArray({list(self.values)})'
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return (Direction(float(val)) for val in self._values)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return DirectionArray(self._values[idx])
+        return Direction(float(self._values[idx]))
+
+    __hash__ = None
+
+    @property
+    def values(self):
+        """Return the directions normalized to [0, 360) and rounded to `Direction.PRECISION`."""
+        if np is not None:
+            return np.round(np.mod(self._values, 360), Direction.PRECISION)
+        return [round(val % 360, Direction.PRECISION) for val in self._values]
+
+    def _operand(self, other):
+        if isinstance(other, DirectionArray):
+            return other._values
+        if isinstance(other, Direction):
+            return other._value
+        return other
+
+    def _apply(self, func, other):
+        other = self._operand(other)
+        if np is not None:
+            return DirectionArray(func(self._values, np.asarray(other, dtype=float)))
+        return DirectionArray([func(a, b) for a, b in zip(*broadcast_lists(self._values, other))])
+
+    def __add__(self, other):
+        return self._apply(lambda a, b: a + b, other)
+
+    def __sub__(self, other):
+        return self._apply(lambda a, b: a - b, other)
+
+    def theta(self, other):
+        """Return a DirectionArray of degrees clockwise from each direction to `other`. See `Direction.theta`."""
+        return self._apply(lambda a, b: (b - a) % 360, other)
+
+    def equals(self, other):
+        """
+        Return an elementwise mask of equality with `other` within `Direction.PRECISION`.
+        """
+        other = DirectionArray(self._operand(other)).values
+        if np is not None:
+            return self.values == other
+        return [a == b for a, b in zip(*broadcast_lists(self.values, other))]
+
+
+class WindVectorArray:
+    """
+    Many wind vectors held as a `DirectionArray` plus float arrays of strengths and, when any
+    vector has them, gusts and variable sectors (`variable_from`/`variable_to`).
+
+    Indexing with an int returns a `WindVector`, slicing returns a WindVectorArray. Variable (VRB)
+    winds have a NaN direction, and a NaN gust or sector bound is one the vector does not have.
+    """
+    __slots__ = ('directions', 'strengths', 'strength_unit', 'gusts', 'variable_from', 'variable_to')
+
+    def __init__(self, directions, strengths, strength_unit='kts', gusts=None, variable_from=None,
+                 variable_to=None):
+        self.directions = DirectionArray(directions)
+        self.strengths = _float_array(strengths)
+        self.strength_unit = strength_unit
+        self.gusts = None if gusts is None else _float_array(gusts)
+        self.variable_from = None if variable_from is None else _float_array(variable_from)
+        self.variable_to = None if variable_to is None else _float_array(variable_to)
+        if len(self.directions) != len(self.strengths):
+            raise ValueError('directions and strengths must be the same length')
+        if any(column is not None and len(column) != len(self.strengths) for column in self._optional_columns()):
+            raise ValueError('gusts and variable sectors must be the same length as the strengths')
+
+    @classmethod
+    def from_vectors(cls, vectors, strength_unit='kts'):
+        """
+        Return a WindVectorArray from an iterable of `WindVector`.
+
+        Vectors in other units are converted to `strength_unit`, all in one pass.
+        """
+        directions, strengths, units, gusts, variable_from, variable_to = [], [], [], [], [], []
+        for vector in vectors:
+            directions.append(_nan_for_none(None if vector.direction is None else vector.direction._value))
+            strengths.append(vector.strength)
+            units.append(vector.strength_unit)
+            gusts.append(_nan_for_none(vector.gust))
+            variable_from.append(_nan_for_none(vector.variable_from))
+            variable_to.append(_nan_for_none(vector.variable_to))
+        strength_unit = normalize_unit(strength_unit)
+        if any(unit != strength_unit for unit in units):
+            strengths = convert_speed(strengths, units, strength_unit)
+            gusts = convert_speed(gusts, units, strength_unit)
+        columns = [column if any(val == val for val in column) else None
+                   for column in (gusts, variable_from, variable_to)]
+        return cls(directions, strengths, strength_unit, *columns)
+
+    def __repr__(self):
+        return f'WindVectorArray({len(self)} winds, {self.strength_unit})'
+
+    def __len__(self):
+        return len(self.strengths)
+
+    def __iter__(self):
+        return (self[idx] for idx in range(len(self)))
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return WindVectorArray(self.directions._values[idx], self.strengths[idx], self.strength_unit,
+                                   *(None if column is None else column[idx] for column in self._optional_columns()))
+        gust, variable_from, variable_to = (None if column is None else _none_for_nan(column[idx])
+                                            for column in self._optional_columns())
+        return WindVector(_none_for_nan(self.directions._values[idx]), float(self.strengths[idx]), self.strength_unit,
+                          gust, variable_from, variable_to)
+
+    __hash__ = None
+
+    def _optional_columns(self):
+        return self.gusts, self.variable_from, self.variable_to
+
+    def to_unit(self, unit):
+        """Return a WindVectorArray of the same winds with the strengths and gusts converted to `unit`."""
+        unit = normalize_unit(unit)
+        gusts = None if self.gusts is None else convert_speed(self.gusts, self.strength_unit, unit)
+        return WindVectorArray(self.directions._values, convert_speed(self.strengths, self.strength_unit, unit), unit,
+                               gusts, self.variable_from, self.variable_to)
+
+    def components(self, runway=360):
+        """Return Wind(h_wind, x_wind) arrays for every wind relative to `runway`."""
+        return get_winds_batch(self.directions._values, self.strengths, runway)
@@ -0,0 +1,104 @@
+"""
+Module containing batch (vectorized) versions of the wind component functions
+"""
+import math
+from collections import namedtuple
+from math import radians
+
+from ._compat import np, broadcast_lists
+from .config import Config
+from .winds import Wind, MAX_XWIND, MAX_TO_TAILWIND
+
+LimitCheck = namedtuple('LimitCheck', ['h_wind', 'x_wind', 'max_crosswind', 'within_limits'])
+
+
+def get_winds_batch(wind, velocity, runway=360, declination=None):
+    """
+    Return Wind(h_wind, x_wind) with the components for many winds at once.
+
+    `wind`, `velocity` and `runway` may each be a scalar or a sequence/array and are
+    broadcast against each other. With NumPy installed the components are ndarrays
+    computed in one vectorized pass, otherwise they are lists computed with `math`.
+    Either way every element is identical to the result of `get_winds`.
+
+    Pass `declination` (degrees east, a scalar or one per wind, see `magvar`) when the winds
+    are true (METAR/TAF) and the runways magnetic; the winds are turned to magnetic first.
+
+    Example:
+
+        >>> get_winds_batch([30, 150], 20, 360)
+        Wind(h_wind=array([ 17.32050808, -17.32050808]), x_wind=array([10., 10.]))
+    """
+    wind = _magnetic(wind, declination)
+    if np is None:
+        return _get_winds_python(wind, velocity, runway)
+    theta = _theta_array(wind, runway)
+    velocity = np.asarray(velocity, dtype=float)
+    h_wind = np.cos(theta) * velocity
+    x_wind = np.sin(theta) * velocity * -1
+    return Wind(h_wind, x_wind)
+
+
+def get_headwind_batch(wind, velocity, runway=360, declination=None):
+    """Return headwind components for many winds. See `get_winds_batch`."""
+    wind = _magnetic(wind, declination)
+    if np is None:
+        return _get_winds_python(wind, velocity, runway).h_wind
+    return np.cos(_theta_array(wind, runway)) * np.asarray(velocity, dtype=float)
+
+
+def get_crosswind_batch(wind, velocity, runway=360, declination=None):
+    """Return crosswind components for many winds. See `get_winds_batch`."""
+    wind = _magnetic(wind, declination)
+    if np is None:
+        return _get_winds_python(wind, velocity, runway).x_wind
+    return np.sin(_theta_array(wind, runway)) * np.asarray(velocity, dtype=float) * -1
+
+
+def evaluate_limits_batch(wind, velocity, runway=360, max_cross=MAX_XWIND, max_tail=MAX_TO_TAILWIND, rcam=None,
+                          config=None, declination=None):
+    """
+    Return LimitCheck(h_wind, x_wind, max_crosswind, within_limits) for many winds at once.
+
+    If `rcam` (a code or a sequence of codes) is given, the crosswind limit for each wind comes
+    from `config.get_max_crosswinds` instead of `max_cross`. A wind is within limits when its
+    crosswind does not exceed the crosswind limit and its tailwind does not exceed `max_tail`.
+    `declination` turns true winds to magnetic as in `get_winds_batch`.
+    """
+    if rcam is not None:
+        config = Config() if config is None else config
+        rcam = [rcam] if isinstance(rcam, (int, float)) else rcam
+        max_cross = config.get_max_crosswinds(rcam)
+    h_wind, x_wind = get_winds_batch(wind, velocity, runway, declination)
+    if np is not None:
+        max_cross = np.broadcast_to(np.asarray(max_cross, dtype=float), np.shape(h_wind))
+        within = (np.abs(x_wind) <= max_cross) & (h_wind >= -np.asarray(max_tail, dtype=float))
+        return LimitCheck(h_wind, x_wind, max_cross, within)
+    max_cross, max_tail = broadcast_lists(max_cross, max_tail, h_wind)[:2]
+    within = [abs(x) <= xc and h >= -t for h, x, xc, t in zip(h_wind, x_wind, max_cross, max_tail)]
+    return LimitCheck(h_wind, x_wind, max_cross, within)
+
+
+def _magnetic(wind, declination):
+    """Return true `wind` directions turned to magnetic by `declination` (None leaves them alone)."""
+    if declination is None:
+        return wind
+    if np is not None:
+        return np.asarray(wind, dtype=float) - np.asarray(declination, dtype=float)
+    return [w - d for w, d in zip(*broadcast_lists(wind, declination))]
+
+
+def _theta_array(wind, runway):
+    """Return the runway relative wind angle in radians, reduced the same way as `get_winds`."""
+    wind = np.mod(np.asarray(wind, dtype=float), 360)
+    runway = np.mod(np.asarray(runway, dtype=float), 360)
+    return np.radians(np.mod(runway - wind, 360))
+
+
+def _get_winds_python(wind, velocity, runway):
+    h_winds, x_winds = [], []
+    for w, v, r in zip(*broadcast_lists(wind, velocity, runway)):
+        theta = radians((r % 360 - w % 360) % 360)
+        h_winds.append(math.cos(theta) * v)
+        x_winds.append(math.sin(theta) * v * -1)
+    return Wind(h_winds, x_winds)
@@ -0,0 +1,184 @@
+"""
+Module containing the ObservationCache, a TTL + LRU cache of METAR/TAF reports persisted to sqlite
+"""
+import sqlite3
+import time
+from collections import OrderedDict, namedtuple
+
+OBSERVATION_CACHE_SIZE = 256
+
+# (period, offset) in seconds after 0000Z: routine METARs are issued hourly around HH55Z and TAFs
+# every six hours, ahead of the 00/06/12/18Z validity start (2320Z, 0520Z, 1120Z, 1720Z)
+ISSUE_CYCLES = {
+    'metar': (3600, 55 * 60),
+    'taf': (6 * 3600, 5 * 3600 + 20 * 60),
+}
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'expirations', 'maxsize', 'currsize'])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    kind TEXT NOT NULL,
+    station TEXT NOT NULL,
+    report TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (kind, station)
+)
+"""
+
+
+def next_issuance(kind, fetched_at):
+    """
+    Return the epoch time of the next scheduled `kind` report after `fetched_at`.
+
+    Example:
+
+        >>> next_issuance('metar', 1562950000)  # 1646:40Z
+        1562950500
+    """
+    period, offset = ISSUE_CYCLES[kind]
+    return fetched_at + ((offset - fetched_at) % period or period)
+
+
+class ObservationCache:
+    """
+    Cache of raw reports keyed by (kind, station).
+
+    Entries expire at the next scheduled issuance of their kind (or `ttl` seconds after they were
+    stored, if given) and the least recently used entry is evicted once `maxsize` is exceeded.
+    Every entry is written through to the sqlite database at `path`, so a restarted app starts
+    warm; pass ':memory:' for a process-local cache. `cache_info()` reports hit/miss counters.
+
+    Pass the cache to `MetarFetcher(cache=...)` to serve repeat requests without the network.
+    """
+
+    def __init__(self, path=':memory:', maxsize=OBSERVATION_CACHE_SIZE, ttl=None, clock=time.time):
+        self.path = str(path)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self._entries = OrderedDict()
+        self._db = sqlite3.connect(self.path)
+        self._db.execute(_SCHEMA)
+        self._load()
+
+    def __repr__(self):
+        return f'ObservationCache({self.path!r}, maxsize={self.maxsize}, ttl={self.ttl})'
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and entry[1] > self.clock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _load(self):
+        rows = self._db.execute(
+            'SELECT kind, station, report, expires_at FROM observations WHERE expires_at > ? '
+            'ORDER BY last_used DESC LIMIT ?', (self.clock(), self.maxsize)).fetchall()
+        for kind, station, report, expires_at in reversed(rows):
+            self._entries[kind, station] = (report, expires_at)
+        self._prune_db()
+
+    def _prune_db(self):
+        with self._db:
+            self._db.execute('DELETE FROM observations WHERE expires_at <= ?', (self.clock(),))
+            self._db.execute(
+                'DELETE FROM observations WHERE rowid NOT IN '
+                '(SELECT rowid FROM observations ORDER BY last_used DESC LIMIT ?)', (self.maxsize,))
+
+    def expires_at(self, kind, fetched_at):
+        if self.ttl is not None:
+            return fetched_at + self.ttl
+        return next_issuance(kind, fetched_at)
+
+    def get(self, station, kind='metar'):
+        """
+        Return the cached `kind` report for `station`, or None if it is missing or expired.
+        """
+        key = (kind, station.upper())
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        report, expires_at = entry
+        if expires_at <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return report
+
+    def put(self, station, report, kind='metar', fetched_at=None):
+        """
+        Store `report` for `station`, evicting the least recently used entry if the cache is full.
+
+        An empty `report` records that the station has no current report, so it is not requested
+        again before the next issuance either.
+        """
+        if kind not in ISSUE_CYCLES:
+            raise ValueError(f'kind must be one of {tuple(ISSUE_CYCLES)}, not {kind!r}')
+        key = (kind, station.upper())
+        now = self.clock()
+        fetched_at = now if fetched_at is None else fetched_at
+        expires_at = self.expires_at(kind, fetched_at)
+        self._entries[key] = (report, expires_at)
+        self._entries.move_to_end(key)
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?, ?)',
+                             (*key, report, fetched_at, expires_at, now))
+            while len(self._entries) > self.maxsize:
+                old_key, _ = self._entries.popitem(last=False)
+                self._db.execute('DELETE FROM observations WHERE kind = ? AND station = ?', old_key)
+                self.evictions += 1
+
+    def _remove(self, key):
+        del self._entries[key]
+        with self._db:
+            self._db.execute('DELETE FROM observations WHERE kind = ? AND station = ?', key)
+
+    def purge_expired(self):
+        """
+        Drop every expired entry and return how many were removed.
+        """
+        now = self.clock()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        with self._db:
+            self._db.execute('DELETE FROM observations WHERE expires_at <= ?', (now,))
+        self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self):
+        self._entries.clear()
+        with self._db:
+            self._db.execute('DELETE FROM observations')
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.expirations, self.maxsize,
+                         len(self._entries))
+
+    def sync(self):
+        """
+        Write the in-memory recency order to disk so the next session evicts the same entries.
+        """
+        now = self.clock()
+        order = [(now - i * 1e-6, *key) for i, key in enumerate(reversed(self._entries))]
+        with self._db:
+            self._db.executemany('UPDATE observations SET last_used = ? WHERE kind = ? AND station = ?', order)
+
+    def close(self):
+        self.sync()
+        self._db.close()
@@ -2,16 +2,32 @@
 Module containing the WindCalculator class
 """
 import winds
+from .config import Config
+from .units import DEFAULT_UNIT, conversion_factor, convert_speed, normalize_unit
 
 
 # TODO: make headings Direction instances with property access methods
 class WindCalculator:
+    """
+    Wind calculations against a runway heading and crosswind/tailwind limits.
 
-    def __init__(self):
+    Velocities (inputs, limits and results) are in `units` ('kts', 'mps', 'kmh' or 'mph'). The
+    limits are kept in knots, so changing `units` converts them rather than reinterpreting them.
+
+    Runway headings are magnetic. Methods taking `true_north=True` first turn the wind directions
+    (e.g. from a METAR) to magnetic with `declination` (degrees east), which `set_runway` sets
+    from the airport's position. Setting `runway_heading` by hand resets `declination` to 0.
+    """
+
+    def __init__(self, config=None, units=DEFAULT_UNIT):
+        self.config = Config() if config is None else config
+        self.units = units
+        self.declination = 0.0
         self._runway_heading = 000
         self._max_ldg_tailwind = 0
         self._max_to_tailwind = 0
         self._max_crosswind = 0
+        self._rcam = None
         self.reset_all()
 
     @property
@@ -21,30 +37,63 @@ class WindCalculator:
     @runway_heading.setter
     def runway_heading(self, val):
         self._runway_heading = float(val)
+        # the declination belongs to the airport of the previous runway
+        self.declination = 0.0
+
+    @property
+    def units(self):
+        return self._units
+
+    @units.setter
+    def units(self, val):
+        self._units = normalize_unit(val)
+        self._to_knots = conversion_factor(self._units, 'kts')
+
+    def _from_knots(self, val):
+        # negative limits mean "no limit" and are kept as they are
+        return val if val < 0 else val / self._to_knots
+
+    def _knots(self, val):
+        val = float(val)
+        return val if val < 0 else val * self._to_knots
 
     @property
     def max_crosswind(self):
-        return self._max_crosswind
+        return self._from_knots(self._max_crosswind)
 
     @max_crosswind.setter
     def max_crosswind(self, val):
-        self._max_crosswind = float(val)
+        self._max_crosswind = self._knots(val)
+        self._rcam = None
+
+    @property
+    def rcam(self):
+        """RCAM code driving `max_crosswind`, or None if the crosswind limit was set directly"""
+        return self._rcam
+
+    @rcam.setter
+    def rcam(self, val):
+        if val is None:
+            self._rcam = None
+            return
+        self._max_crosswind = float(self.config.get_max_crosswind(val))
+        self._rcam = int(val)
 
     @property
     def max_to_tailwind(self):
-        return self._max_to_tailwind
+        return self._from_knots(self._max_to_tailwind)
 
     @max_to_tailwind.setter
     def max_to_tailwind(self, val):
-        self._max_to_tailwind = float(val)
+        self._max_to_tailwind = self._knots(val)
 
     @property
     def max_ldg_tailwind(self):
-        return self._max_ldg_tailwind
+        return self._from_knots(self._max_ldg_tailwind)
 
     @max_ldg_tailwind.setter
     def max_ldg_tailwind(self, val):
-        self._max_ldg_tailwind = float(val)
+        self._max_ldg_tailwind = self._knots(val)
 
     def calculate_crosswind(self, wind_dir, velocity):
         result = winds.get_crosswind(wind_dir, velocity, self.runway_heading)
@@ -60,8 +109,121 @@ class WindCalculator:
         return winds.get_max_tailwind_velocity(self.max_to_tailwind, wind_dir,
                                          self.runway_heading)
 
-    def winds(self, wind_dir, velocity):
-        return winds.get_winds(wind_dir, velocity, self.runway_heading)
+    def _magnetic(self, wind_dir, true_north, declination=None):
+        declination = self.declination if declination is None else declination
+        if not true_north or not declination:
+            return wind_dir
+        from .magvar import true_to_magnetic
+        return true_to_magnetic(wind_dir, declination)
+
+    def winds(self, wind_dir, velocity, true_north=False):
+        return winds.get_winds(self._magnetic(wind_dir, true_north), velocity, self.runway_heading)
+
+    def worst_case_winds(self, wind_dir, velocity, gust=None, variable_from=None, variable_to=None):
+        """
+        Return the `WorstCaseWind` crosswind/tailwind for a gusting and/or variable wind on the
+        current runway
+        """
+        return winds.worst_case_winds(wind_dir, velocity, gust, variable_from, variable_to,
+                                      self.runway_heading)
+
+    def evaluate_batch(self, wind_dirs, velocities, rcams=None, landing=False, velocity_units=None,
+                       true_north=False):
+        """
+        Return a `LimitCheck` for many winds on the current runway. If `rcams` is given each wind
+        is checked against the crosswind limit for its own RCAM code, otherwise against
+        `max_crosswind`.
+
+        `velocity_units` is the unit of `velocities` (one unit, or one per wind for mixed unit
+        batches); they are converted to `units` in one pass. By default they are already in `units`.
+        """
+        wind_dirs = self._magnetic(wind_dirs, true_north)
+        if velocity_units is not None:
+            velocities = convert_speed(velocities, velocity_units, self.units)
+        max_tail = self.max_ldg_tailwind if landing else self.max_to_tailwind
+        if rcams is not None and self.units != 'kts':
+            # the RCAM table is in knots
+            rcams = [rcams] if isinstance(rcams, (int, float)) else rcams
+            max_cross = convert_speed(self.config.get_max_crosswinds(rcams), 'kts', self.units)
+            return winds.evaluate_limits_batch(wind_dirs, velocities, self.runway_heading, max_cross, max_tail)
+        return winds.evaluate_limits_batch(wind_dirs, velocities, self.runway_heading, self.max_crosswind,
+                                           max_tail, rcam=rcams, config=self.config)
+
+    def rank_runways(self, runways, wind_dir, velocity, landing=False, true_north=False, declination=None):
+        """
+        Return a list of `RunwayRank` for `runways`, best first, against the current crosswind
+        and takeoff/landing tailwind limits
+        """
+        max_tail = self.max_ldg_tailwind if landing else self.max_to_tailwind
+        wind_dir = self._magnetic(wind_dir, true_north, declination)
+        return winds.rank_runways(runways, wind_dir, velocity, self.max_crosswind, max_tail)
+
+    def set_runway(self, airport, runway_ident, database=None):
+        """
+        Set `runway_heading` to a runway end from the runway database (the bundled
+        `airports.default_database()` unless `database` is given), and `declination` to the
+        magnetic variation at the airport. Return the `airports.Runway`
+        """
+        from .airports import default_database
+        from .magvar import declination
+        database = database or default_database()
+        runway = database.runway(airport, runway_ident)
+        airport = database.airport(airport)
+        self.runway_heading = runway.heading
+        self.declination = declination(airport.lat, airport.lon)
+        return runway
+
+    def rank_airport(self, airport, wind_dir, velocity, landing=False, database=None, true_north=False):
+        """
+        Return `rank_runways` for every runway end at `airport` (an ident or an `airports.Airport`);
+        each rank's `runway` is the `airports.Runway`. With `true_north` the wind is turned to
+        magnetic with the declination at the airport.
+        """
+        if isinstance(airport, str):
+            from .airports import default_database
+            airport = (database or default_database()).airport(airport)
+        declination = None
+        if true_north:
+            from .magvar import declination as declination_at
+            declination = declination_at(airport.lat, airport.lon)
+        return self.rank_runways(airport.runways, wind_dir, velocity, landing, true_north, declination)
+
+    def envelope(self, landing=False):
+        """
+        Return the cached `WindEnvelope` for the current runway, crosswind and takeoff/landing
+        tailwind limits
+        """
+        max_tail = self.max_ldg_tailwind if landing else self.max_to_tailwind
+        return winds.get_envelope(self.runway_heading, max_tail, self.max_crosswind)
+
+    def usability(self, stats, landing=False):
+        """
+        Return the `Usability` of the current runway and limits over the observations in a
+        `usability.WindStats`
+        """
+        max_tail = self._max_ldg_tailwind if landing else self._max_to_tailwind
+        return stats.usability(self.runway_heading, max_tail, self._max_crosswind)
+
+    def solve_limits(self, wind_dirs, landing=False, max_headwind=None, max_total=None, max_gust=None,
+                     gust_factor=0):
+        """
+        Return the `solver.LimitSolution` (max speed and binding limit per direction) for the current
+        runway, crosswind and takeoff/landing tailwind limits, plus optional headwind, total wind
+        and gust limits
+        """
+        from .solver import WindLimits, solve_max_wind
+        max_tail = self.max_ldg_tailwind if landing else self.max_to_tailwind
+        limits = WindLimits(self.max_crosswind, max_tail, max_headwind, max_total, max_gust)
+        return solve_max_wind(wind_dirs, limits, self.runway_heading, gust_factor)
+
+    def taf_timeline(self, taf, landing=False):
+        """
+        Return a `taf.TafTimeline` of a decoded TAF (`taf.parse_taf`) on the current runway, limits,
+        units and declination (TAF winds are true)
+        """
+        from .taf import TafTimeline
+        max_tail = self.max_ldg_tailwind if landing else self.max_to_tailwind
+        return TafTimeline(taf, self.runway_heading, max_tail, self.max_crosswind, self.units, self.declination)
 
 # TODO: max wind components should be passed in
     def reset_all(self):
@@ -71,5 +233,7 @@ class WindCalculator:
             'max_ldg_tailwind': winds.MAX_LAND_TAILWIND
         }
         for attr, val in DEFAULTABLE.items():
-            setattr(self, attr, val)
+            # the defaults are in knots whatever `units` is
+            setattr(self, f'_{attr}', float(val))
+        self._rcam = None
 
@@ -28,7 +28,54 @@ class Config:
             return self._RCAM_CROSSWINDS[int(rcam)]
         except KeyError:
             raise KeyError(f'{rcam} is not a valid RCAM value... available values are '
-            f'{self.RCAM_CROSSWINDS.keys()}')
+            f'{list(self._RCAM_CROSSWINDS.keys())}')
+
+    def get_max_crosswinds(self, rcams):
+        """
+        Return the maximum crosswinds allowed for a sequence/array of RCAM values
+
+        The lookup indexes a table by RCAM code, so a whole batch is converted in one pass (an
+        ndarray with NumPy installed, a list otherwise).
+
+        params
+        ------
+        rcams (sequence of int): RCAM lookup values
+        """
+        # imported here rather than at the top so the shell starts without loading NumPy
+        from ._compat import np
+        table = self.rcam_crosswind_table
+        if np is not None:
+            codes = np.asarray(rcams, dtype=int)
+            valid = (codes >= 0) & (codes < len(table))
+            limits = np.asarray(table)[np.where(valid, codes, 0)]
+            invalid = ~valid | np.isnan(limits)
+            if invalid.any():
+                self.get_max_crosswind(codes[invalid].flat[0])
+            return limits
+        limits = []
+        for rcam in rcams:
+            code = int(rcam)
+            limit = table[code] if 0 <= code < len(table) else float('nan')
+            if limit != limit:
+                self.get_max_crosswind(code)
+            limits.append(limit)
+        return limits
+
+    @property
+    def rcam_crosswind_table(self):
+        """
+        Return a tuple of crosswind limits indexed by RCAM code, NaN for codes without a limit.
+        Built on first use and kept for the life of the Config.
+        """
+        try:
+            return self._rcam_table
+        except AttributeError:
+            pass
+        table = [float('nan')] * (max(self._RCAM_CROSSWINDS) + 1)
+        for rcam, limit in self._RCAM_CROSSWINDS.items():
+            table[rcam] = float(limit)
+        self._rcam_table = tuple(table)
+        return self._rcam_table
             
     @property
     def max_tailwind_takeoff(self):
@@ -37,4 +84,3 @@ class Config:
     @property
     def max_tailwind_landing(self):
         return self._MAX_TAILWIND_LDG
-
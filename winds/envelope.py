@@ -0,0 +1,143 @@
+"""
+Module containing the WindEnvelope class, a precomputed 360° max wind table for one runway/limit profile
+"""
+import json
+import sys
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+from ._compat import np
+from .grid import full_wind_grid
+from .winds import grid_headings, get_max_wind_velocity, GRID_PRECISION
+
+ENVELOPE_CACHE_SIZE = 32
+ENVELOPE_FILE_VERSION = 1
+
+
+class WindEnvelope:
+    """
+    Max acceptable wind velocity for every direction around the compass, `increment` degrees apart.
+
+    The envelope is built once per (runway heading, max tailwind, max crosswind) profile. Lookups
+    for a single direction or a window of directions are index arithmetic into the table, and the
+    values are identical to `max_wind_grid` (-1 for incalculable velocities).
+
+    Example:
+
+        >>> env = WindEnvelope(90, max_tail=10, max_cross=38)
+        >>> env.window(200, 2) == max_wind_grid(200, 2, 10, 38, 10, 90)
+        True
+    """
+
+    def __init__(self, runway_hdg, max_tail=-1, max_cross=-1, increment=1, velocities=None):
+        steps = round(360 / increment, GRID_PRECISION)
+        if steps != int(steps):
+            raise ValueError('increment must divide 360 evenly')
+        self.runway_hdg = runway_hdg
+        self.max_tail = max_tail
+        self.max_cross = max_cross
+        self.increment = increment
+        if velocities is None:
+            velocities = list(full_wind_grid(max_tail, max_cross, increment, runway_hdg).values())
+        if len(velocities) != int(steps):
+            raise ValueError(f'expected {int(steps)} velocities, got {len(velocities)}')
+        self.velocities = np.asarray(velocities, dtype=float) if np is not None else array('d', velocities)
+
+    def __repr__(self):
+        return (f'WindEnvelope(runway_hdg={self.runway_hdg}, max_tail={self.max_tail}, '
+                f'max_cross={self.max_cross}, increment={self.increment})')
+
+    def __len__(self):
+        return len(self.velocities)
+
+    @property
+    def profile(self):
+        return (self.runway_hdg, self.max_tail, self.max_cross, self.increment)
+
+    def velocity_at(self, wind_dir):
+        """
+        Return the max velocity for `wind_dir`. Directions between table points are calculated exactly.
+        """
+        idx = self._index(wind_dir)
+        if idx is None:
+            return get_max_wind_velocity(self.max_tail, self.max_cross, wind_dir, self.runway_hdg)
+        return float(self.velocities[idx])
+
+    def window(self, wind_hdg, num, increment=10):
+        """
+        Return the same OrderedDict as `max_wind_grid(wind_hdg, num, ...)` for this profile.
+
+        When `wind_hdg` and `increment` line up with the table the values are read straight from
+        it, otherwise each direction is calculated exactly.
+        """
+        headings = grid_headings(wind_hdg, num, increment)
+        start = self._index(headings[0])
+        step = round(increment / self.increment, GRID_PRECISION)
+        if start is None or step != int(step):
+            return OrderedDict((hdg, self.velocity_at(hdg)) for hdg in headings)
+        step = int(step)
+        size = len(self.velocities)
+        if np is not None:
+            idx = np.mod(start + step * np.arange(len(headings)), size)
+            return OrderedDict(zip(headings, self.velocities[idx].tolist()))
+        return OrderedDict((hdg, self.velocities[(start + step * i) % size]) for i, hdg in enumerate(headings))
+
+    def save(self, path):
+        """
+        Write the envelope to `path`: one JSON header line followed by the raw float64 table.
+        """
+        header = {
+            'version': ENVELOPE_FILE_VERSION,
+            'runway_hdg': self.runway_hdg,
+            'max_tail': self.max_tail,
+            'max_cross': self.max_cross,
+            'increment': self.increment,
+            'byteorder': sys.byteorder,
+        }
+        with open(path, 'wb') as f:
+            f.write(json.dumps(header).encode() + b'\n')
+            f.write(array('d', self.velocities).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Return a WindEnvelope read from a file written by `save` without recalculating it.
+        """
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            if header.get('version') != ENVELOPE_FILE_VERSION:
+                raise ValueError(f'{path} is not a version {ENVELOPE_FILE_VERSION} envelope file')
+            velocities = array('d')
+            velocities.frombytes(f.read())
+        if header['byteorder'] != sys.byteorder:
+            velocities.byteswap()
+        return cls(header['runway_hdg'], header['max_tail'], header['max_cross'], header['increment'],
+                   velocities=velocities)
+
+    def _index(self, wind_dir):
+        """Return the table index for `wind_dir`, or None if it falls between table points."""
+        idx = round((wind_dir % 360) / self.increment)
+        if round(idx * self.increment, GRID_PRECISION) != round(wind_dir % 360, GRID_PRECISION):
+            return None
+        return idx % len(self.velocities)
+
+
+@lru_cache(maxsize=ENVELOPE_CACHE_SIZE)
+def get_envelope(runway_hdg, max_tail=-1, max_cross=-1, increment=1, cache_dir=None):
+    """
+    Return the WindEnvelope for a runway/limit profile, building it only once per process.
+
+    If `cache_dir` is given the envelope is also read from (or written to) a file in that
+    directory, so a cold start can skip the calculation.
+    """
+    if cache_dir is None:
+        return WindEnvelope(runway_hdg, max_tail, max_cross, increment)
+    path = Path(cache_dir).joinpath(f'envelope_{runway_hdg}_{max_tail}_{max_cross}_{increment}.env')
+    if path.exists():
+        return WindEnvelope.load(path)
+    envelope = WindEnvelope(runway_hdg, max_tail, max_cross, increment)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    envelope.save(path)
+    return envelope
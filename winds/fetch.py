@@ -0,0 +1,281 @@
+"""
+Module containing the asyncio METAR/TAF fetcher
+
+Reports are fetched over a small pooled HTTP/1.1 client built on `asyncio.open_connection`, so
+no third party HTTP library is needed (Pythonista ships only the standard library). Connections
+are kept alive and reused per host, concurrency per host is capped, and every request has a
+timeout and is retried with exponential backoff on connection errors and 5xx responses.
+"""
+import asyncio
+import logging
+from collections import namedtuple
+from functools import lru_cache
+from urllib.parse import urlsplit, urlencode
+
+from .metar import parse_wind_group
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = 'https://aviationweather.gov/api/data'
+KINDS = ('metar', 'taf')
+MAX_PER_HOST = 4
+TIMEOUT = 10.0
+RETRIES = 3
+BACKOFF = .5
+USER_AGENT = 'PythonistaWorkApp'
+WIND_PARSE_CACHE_SIZE = 1024
+
+Response = namedtuple('Response', ['status', 'headers', 'body'])
+StationReport = namedtuple('StationReport', ['station', 'metar', 'taf', 'wind'])
+
+
+# WindVectors are immutable, so a cached report parses once and the result is shared
+parse_wind = lru_cache(maxsize=WIND_PARSE_CACHE_SIZE)(parse_wind_group)
+
+
+class HTTPStatusError(OSError):
+    """Raised for a response with a status other than 200 once retries are exhausted"""
+
+    def __init__(self, url, status):
+        super().__init__(f'{url} returned HTTP {status}')
+        self.url = url
+        self.status = status
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP/1.1 connections grouped by (scheme, host, port).
+
+    At most `max_per_host` requests run against one host at a time; idle connections are parked
+    and handed to the next request for the same host. Use as an async context manager, or call
+    `close` when done.
+    """
+
+    def __init__(self, max_per_host=MAX_PER_HOST):
+        self.max_per_host = max_per_host
+        self._idle = {}
+        self._limits = {}
+        self.connections_opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _limit(self, key):
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(self.max_per_host)
+        return self._limits[key]
+
+    async def _connect(self, key):
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(host, port, ssl=scheme == 'https' or None)
+        self.connections_opened += 1
+        return reader, writer, False
+
+    async def get(self, url, headers=None):
+        """
+        Return a Response(status, headers, body) for a GET of `url`.
+
+        A reused connection that turns out to have been closed by the server is replaced once
+        with a fresh one.
+        """
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        lines = [f'GET {target} HTTP/1.1', f'Host: {parts.netloc}', f'User-Agent: {USER_AGENT}',
+                 'Accept-Encoding: identity', 'Connection: keep-alive']
+        lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        async with self._limit(key):
+            while True:
+                reader, writer, reused = await self._connect(key)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    response, keep_alive = await _read_response(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.setdefault(key, []).append((reader, writer))
+                else:
+                    writer.close()
+                return response
+
+    async def close(self):
+        writers = [writer for idle in self._idle.values() for _, writer in idle]
+        self._idle.clear()
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError('connection closed before response')
+    version, status = status_line.decode('latin-1').split(None, 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+        keep_alive = True
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+        keep_alive = True
+    else:
+        body = await reader.read()
+        keep_alive = False
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = keep_alive and connection != 'close' and (version != 'HTTP/1.0' or connection == 'keep-alive')
+    return Response(int(status), headers, body), keep_alive
+
+
+class MetarFetcher:
+    """
+    Fetch raw METAR/TAF reports for many stations concurrently.
+
+    `base_url` points at an aviationweather.gov style data API (`{base_url}/metar?ids=KJFK`);
+    tests and benchmarks point it at `winds.standin.StandInServer`. Each request is limited to
+    `timeout` seconds and retried up to `retries` times, sleeping `backoff`, 2 * `backoff`, ...
+    between attempts, on connection errors, timeouts and 5xx responses. With a
+    `cache.ObservationCache` as `cache`, reports still current in the cache are returned without
+    a request.
+
+    Example:
+
+        >>> async def brief(stations):
+        ...     async with MetarFetcher() as fetcher:
+        ...         return await fetcher.fetch_reports(stations)
+        >>> reports = asyncio.run(brief(['KJFK', 'KBOS']))  # doctest: +SKIP
+        >>> calc.winds(*reports['KJFK'].wind.to_tuple())  # doctest: +SKIP
+    """
+
+    def __init__(self, base_url=BASE_URL, max_per_host=MAX_PER_HOST, timeout=TIMEOUT, retries=RETRIES,
+                 backoff=BACKOFF, pool=None, cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool = ConnectionPool(max_per_host) if pool is None else pool
+        self.cache = cache
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.pool.close()
+
+    def url(self, kind, station):
+        if kind not in KINDS:
+            raise ValueError(f'kind must be one of {KINDS}, not {kind!r}')
+        return f'{self.base_url}/{kind}?{urlencode({"ids": station, "format": "raw"})}'
+
+    async def fetch(self, station, kind='metar'):
+        """
+        Return the raw `kind` report text for `station`, or None if the server has no report.
+        """
+        station = station.upper()
+        url = self.url(kind, station)
+        if self.cache is not None:
+            report = self.cache.get(station, kind)
+            if report is not None:
+                return report or None
+        for attempt in range(self.retries + 1):
+            try:
+                response = await asyncio.wait_for(self.pool.get(url), self.timeout)
+                if response.status < 500:
+                    break
+                error = HTTPStatusError(url, response.status)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                error = e
+            if attempt == self.retries:
+                raise error
+            delay = self.backoff * 2 ** attempt
+            logger.debug(f'{url} failed ({error!r}), retrying in {delay}s')
+            await asyncio.sleep(delay)
+
+        if response.status in (204, 404):
+            text = None
+        elif response.status == 200:
+            text = response.body.decode('utf-8', 'replace').strip() or None
+        else:
+            raise HTTPStatusError(url, response.status)
+        if self.cache is not None:
+            self.cache.put(station, text or '', kind)
+        return text
+
+    async def fetch_all(self, stations, kind='metar'):
+        """
+        Return {station: report text or None} for every station, fetched concurrently.
+        """
+        stations = [station.upper() for station in stations]
+        reports = await asyncio.gather(*(self.fetch(station, kind) for station in stations))
+        return dict(zip(stations, reports))
+
+    async def fetch_reports(self, stations, taf=True):
+        """
+        Return {station: StationReport(station, metar, taf, wind)}.
+
+        `wind` is the METAR's WindVector (None without a METAR or wind group), ready for
+        `WindCalculator.winds(*wind.to_tuple())` or `WindCalculator.worst_case_winds`.
+        """
+        stations = [station.upper() for station in stations]
+        kinds = KINDS if taf else KINDS[:1]
+        texts = await asyncio.gather(*(self.fetch(station, kind) for kind in kinds for station in stations))
+        metars = texts[:len(stations)]
+        tafs = texts[len(stations):] or [None] * len(stations)
+        return {
+            station: StationReport(station, metar, taf_text, None if metar is None else parse_wind(metar))
+            for station, metar, taf_text in zip(stations, metars, tafs)
+        }
+
+
+def fetch_winds(stations, **fetcher_kwargs):
+    """
+    Return {station: WindVector or None} from the current METARs, for callers outside an event loop.
+    """
+    async def _fetch():
+        async with MetarFetcher(**fetcher_kwargs) as fetcher:
+            return await fetcher.fetch_reports(stations, taf=False)
+
+    return {station: report.wind for station, report in asyncio.run(_fetch()).items()}
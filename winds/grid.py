@@ -0,0 +1,96 @@
+"""
+Module containing the vectorized, cached max wind grid engine
+"""
+import math
+from collections import OrderedDict
+from functools import lru_cache
+
+from ._compat import np
+from .config import Config
+from .winds import grid_headings, get_max_wind_velocity, GRID_PRECISION
+
+GRID_CACHE_SIZE = 128
+
+
+def max_wind_velocities(directions, max_tail=-1, max_cross=-1, runway_hdg=360):
+    """
+    Return the max acceptable wind velocity for every wind direction in `directions`.
+
+    Values follow `max_wind_grid` exactly, including -1 for incalculable velocities, but
+    all directions are computed in one array pass when NumPy is installed. Returns a list.
+    """
+    find_xwind = max_cross >= 0
+    find_twind = max_tail >= 0
+    if not (find_xwind or find_twind):
+        raise ValueError('must provide either max_tail or max_cross')
+    directions = list(directions)
+    if np is None:
+        return [get_max_wind_velocity(max_tail, max_cross, wind_dir, runway_hdg) for wind_dir in directions]
+
+    wind_dir = np.asarray(directions, dtype=float)
+    with np.errstate(divide='ignore'):
+        if find_xwind:
+            sin = np.sin(np.radians(np.mod(np.abs(runway_hdg - wind_dir), 360)))
+            x_vel = np.where(sin == 0, -1.0, np.abs(max_cross / sin))
+        if find_twind:
+            theta = np.abs(np.mod(runway_hdg - wind_dir, 360))
+            cos = np.cos(np.radians(runway_hdg - wind_dir))
+            t_vel = np.where((theta > 90) & (theta < 270) & (cos != 0), np.abs(max_tail / cos), -1.0)
+
+    if not find_twind:
+        return x_vel.tolist()
+    if not find_xwind:
+        return t_vel.tolist()
+    both = (x_vel != -1) & (t_vel != -1)
+    return np.where(both, np.minimum(x_vel, t_vel), np.maximum(x_vel, t_vel)).tolist()
+
+
+def wind_grid(wind_hdg, num, max_tail=-1, max_cross=-1, increment=10, runway_hdg=360, rcam=None, unit='kts'):
+    """
+    Return the same OrderedDict as `max_wind_grid`, computed in one vectorized pass.
+
+    Supports float increments (e.g. .1) and any `num`, including full 360° sweeps. As with
+    `max_wind_grid`, `max_tail`, `max_cross` and the velocities are in `unit`, and an RCAM
+    crosswind limit is converted to it.
+    """
+    if rcam is not None:
+        max_cross = Config().get_max_crosswind(rcam)
+        if unit != 'kts':
+            from .units import convert_speed
+            max_cross = convert_speed(max_cross, 'kts', unit)
+    headings = grid_headings(wind_hdg, num, increment)
+    velocities = max_wind_velocities(headings, max_tail, max_cross, runway_hdg)
+    return OrderedDict(zip(headings, velocities))
+
+
+def full_wind_grid(max_tail=-1, max_cross=-1, increment=1, runway_hdg=360):
+    """
+    Return an OrderedDict of max wind velocities for a full 360° sweep starting at 0°.
+    """
+    count = math.ceil(round(360 / increment, GRID_PRECISION))
+    headings = [round(i * increment, GRID_PRECISION) for i in range(count)]
+    if isinstance(increment, int):
+        headings = [int(hdg) for hdg in headings]
+    velocities = max_wind_velocities(headings, max_tail, max_cross, runway_hdg)
+    return OrderedDict(zip(headings, velocities))
+
+
+def cached_wind_grid(wind_hdg, num, max_tail=-1, max_cross=-1, increment=10, runway_hdg=360):
+    """
+    Return `wind_grid` results, memoized on (heading, num, limits, increment, runway).
+
+    The most recent `GRID_CACHE_SIZE` grids are kept, least recently used first out, so
+    redrawing the same grid does not recompute it. A fresh OrderedDict is returned on each
+    call so callers may modify it freely.
+    """
+    return OrderedDict(_cached_grid_items(wind_hdg, num, max_tail, max_cross, increment, runway_hdg))
+
+
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def _cached_grid_items(wind_hdg, num, max_tail, max_cross, increment, runway_hdg):
+    return tuple(wind_grid(wind_hdg, num, max_tail, max_cross, increment, runway_hdg).items())
+
+
+cached_wind_grid.cache_info = _cached_grid_items.cache_info
+cached_wind_grid.cache_clear = _cached_grid_items.cache_clear
+
@@ -1,54 +1,65 @@
 import ui
 
-MAX_WIND_TEMPLATE = 'MAX FROM {direction:03.0f}° -> {strength:.{precision}f}{units}'
-NO_MAX_WIND_TEMPLATE = 'MAX FROM {direction:03.0f}° -> NO MAX'
-PRECISION = 1
+from winds.gui.results_model import (GridResults, format_results_text_line, MAX_WIND_TEMPLATE,
+                                     NO_MAX_WIND_TEMPLATE, PRECISION)
+
+# Rows are assigned to pooled cells by `row % CELL_POOL_SIZE`, so the pool must be larger than
+# the number of rows that can be on screen at once.
+CELL_POOL_SIZE = 64
 
 
 class GridResultsTableSource(ui.ListDataSource):
     """
     DataSource and delegate for the grid results tableview
+
+    Rows come from a `GridResults` model (nothing is copied into `items`), their text is
+    formatted once per result set, and cells are reused from a fixed pool while scrolling.
     """
-    def load_from_results_dict(self, results_dict):
-        self.items = [(direction, speed)
-                      for direction, speed in results_dict.items()]
+    def __init__(self, items=()):
+        super().__init__([])
+        self.results = GridResults([], None)
+        self._cells = [None] * CELL_POOL_SIZE
+        self.cells_created = 0
+        if items:
+            self.load_from_results_dict(dict(items))
+
+    def load_results(self, results):
+        self.results = results
         self.reload()
 
+    def load_from_results_dict(self, results_dict):
+        self.load_results(GridResults.from_grid(results_dict, PRECISION))
+
+    def tableview_number_of_sections(self, tableview):
+        return 1
+
+    def tableview_number_of_rows(self, tableview, section):
+        return len(self.results)
+
     def tableview_cell_for_row(self, tableview, section, row):
-        cell = ui.TableViewCell()
-        data = self.items[row]
-        cell.text_label.text = self.format_results_text_line(
-            data[0], data[1], PRECISION)
+        slot = row % CELL_POOL_SIZE
+        cell = self._cells[slot]
+        if cell is None:
+            cell = self._cells[slot] = ui.TableViewCell()
+            self.cells_created += 1
+        text = self.results.line(row)
+        if cell.text_label.text != text:
+            cell.text_label.text = text
         return cell
 
-    @staticmethod
-    def format_results_text_line(direction, speed, precision=1):
-        """
-        Return a formatted grid results line from a direction, speed, and precision.
-        If an exception occurs, return the error string.
-        """
-        precision = precision if precision >= 0 else 5
-        try:
-            if speed != -1:
-                return MAX_WIND_TEMPLATE.format(
-                    direction=direction,
-                    strength=speed,
-                    precision=precision,
-                    units='kts')
-            else:
-                return NO_MAX_WIND_TEMPLATE.format(direction=direction)
-        except Exception as e:
-            return str(e)
-            
+    format_results_text_line = staticmethod(format_results_text_line)
+
+
 # TODO: name view with the winds and phase
 def make_grid_view(results):
     """
-    Return a TableView populate with the results of a grid 
-    calculation.
+    Return a TableView populate with the results of a grid
+    calculation. `results` is a grid dict or a `GridResults`.
     """
     grid_table = ui.load_view('results')['grid_table']
-    grid_table.data_source = GridResultsTableSource([])
+    grid_table.data_source = GridResultsTableSource()
     grid_table.delegate = grid_table.data_source
-    grid_table.data_source.load_from_results_dict(results)
+    if not isinstance(results, GridResults):
+        results = GridResults.from_grid(results, PRECISION)
+    grid_table.data_source.load_results(results)
     return grid_table
-
@@ -0,0 +1,89 @@
+"""
+Module containing GridResults, the `ui` free row model behind the grid results table
+"""
+from collections.abc import Sequence
+
+from winds.winds import grid_headings
+
+MAX_WIND_TEMPLATE = 'MAX FROM {direction:03.0f}° -> {strength:.{precision}f}{units}'
+NO_MAX_WIND_TEMPLATE = 'MAX FROM {direction:03.0f}° -> NO MAX'
+PRECISION = 1
+UNITS = 'kts'
+
+
+def format_results_text_line(direction, speed, precision=PRECISION, units=UNITS):
+    """
+    Return a formatted grid results line from a direction, speed, and precision.
+    If an exception occurs, return the error string.
+
+    Example:
+
+        >>> format_results_text_line(240, 32.456)
+        'MAX FROM 240° -> 32.5kts'
+    """
+    precision = precision if precision >= 0 else 5
+    try:
+        if speed != -1:
+            return MAX_WIND_TEMPLATE.format(direction=direction, strength=speed, precision=precision, units=units)
+        return NO_MAX_WIND_TEMPLATE.format(direction=direction)
+    except Exception as e:
+        return str(e)
+
+
+class GridResults(Sequence):
+    """
+    Read only rows of a max wind grid: `results[i]` is the (direction, speed) of row i.
+
+    The rows are not copied out of their source. `headings` and `velocity` describe the grid:
+    row i is `(headings[i], velocity(i))`. Build one with `from_grid` (an existing grid dict) or
+    `from_envelope` (rows read straight out of a `WindEnvelope`, so a 360 row grid at 1° costs
+    nothing until rows are displayed). Each row's text is formatted the first time it is asked
+    for and then kept for the life of the result set.
+    """
+
+    def __init__(self, headings, velocity, precision=PRECISION, units=UNITS):
+        self.headings = headings
+        self.velocity = velocity
+        self.precision = precision
+        self.units = units
+        self._lines = [None] * len(headings)
+
+    @classmethod
+    def from_grid(cls, grid, precision=PRECISION, units=UNITS):
+        """
+        Return GridResults over a {direction: speed} grid such as `max_wind_grid` returns.
+
+        Only the directions are listed (to index the rows); speeds are read from `grid` on demand.
+        """
+        headings = list(grid)
+        return cls(headings, lambda i: grid[headings[i]], precision, units)
+
+    @classmethod
+    def from_envelope(cls, envelope, wind_hdg, num, increment=10, precision=PRECISION, units=UNITS):
+        """
+        Return GridResults for `envelope.window(wind_hdg, num, increment)` without building the window.
+
+        Like the window dict, a heading that wraps back onto an earlier one is listed once.
+        """
+        headings = list(dict.fromkeys(grid_headings(wind_hdg, num, increment)))
+        return cls(headings, lambda i: envelope.velocity_at(headings[i]), precision, units)
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        return (self.headings[row], self.velocity(row if row >= 0 else row + len(self)))
+
+    def line(self, row):
+        """Return the display text for `row`, formatting it only once."""
+        text = self._lines[row]
+        if text is None:
+            direction, speed = self[row]
+            text = self._lines[row] = format_results_text_line(direction, speed, self.precision, self.units)
+        return text
+
+    def lines(self):
+        """Return every row's text, formatting any rows not formatted yet."""
+        return [self.line(row) for row in range(len(self))]
@@ -0,0 +1,188 @@
+"""
+Module containing the WindCalcViewModel, the `ui` free state behind WindCalcView
+
+The view forwards raw slider/segment events here and renders whatever the model reports as
+changed. Bursts of continuous slider events are coalesced: each event only records the latest
+value, and one scheduled `flush` per frame applies it. Derived values (label text, the max wind
+grid) are recomputed only when the inputs they depend on actually changed.
+"""
+import winds
+from winds.gui.results_model import GridResults
+
+FRAME_INTERVAL = 1 / 60
+WIND_DIR_INCREMENT = 10
+MAX_WIND_SPEED = 100
+GRID_NUM = 7
+PHASES = ('takeoff', 'landing')
+
+
+def slider_to_wind_dir(value, increment=WIND_DIR_INCREMENT):
+    """
+    Return the wind direction for a slider value in [0, 1], snapped to `increment` degrees.
+
+    Example:
+
+        >>> slider_to_wind_dir(.5)
+        180
+    """
+    return int((value * (360 / increment)) % 360) * increment
+
+
+def slider_to_runway(value):
+    return int((value * 360) % 360)
+
+
+def slider_to_wind_speed(value, max_speed=MAX_WIND_SPEED):
+    return int(value * max_speed)
+
+
+def wind_info_text(wind_dir, wind_speed, units='kts'):
+    return f'Winds: {wind_dir:.1f}° @ {wind_speed:.1f} {units}'
+
+
+def runway_text(runway_heading):
+    return f'Runway HDG: {runway_heading:.0f}°'
+
+
+class WindCalcViewModel:
+    """
+    State and derived outputs for the wind calculator view.
+
+    `schedule(callback)` must run `callback` once, later (on the next frame); the Pythonista view
+    passes `ui.delay` with `FRAME_INTERVAL`. Without a scheduler every event is applied
+    immediately. Listeners added with `subscribe` get a dict of only the outputs that changed,
+    e.g. {'wind_info_text': 'Winds: 240.0° @ 15.0 kts'}.
+    """
+
+    def __init__(self, wind_calculator, wind_dir=180, wind_speed=10, schedule=None):
+        self.wind_calculator = wind_calculator
+        self.wind_dir = wind_dir
+        self.wind_speed = wind_speed
+        self.schedule = schedule
+        self.mode = 'WIND'
+        self.slider_memory = {'WIND': .5, 'RWY': .5}
+        self.events = 0
+        self.flushes = 0
+        self._pending = {}
+        self._scheduled = False
+        self._listeners = []
+        self._outputs = {}
+        self._grid_key = None
+        self._grid = None
+        self._refresh()
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    @property
+    def outputs(self):
+        """The current label text, keyed like the change dicts sent to listeners."""
+        return {name: text for name, (_, text) in self._outputs.items()}
+
+    # events from the view
+
+    def dir_slider_moved(self, value):
+        """Record a direction slider value; it sets the wind or the runway depending on `mode`."""
+        self._pending['WIND' if self.mode == 'WIND' else 'RWY'] = value
+        self._event()
+
+    def speed_slider_moved(self, value):
+        self._pending['SPEED'] = value
+        self._event()
+
+    def set_mode(self, mode, slider_value):
+        """
+        Switch the direction slider between 'WIND' and 'RWY' and return the slider value to show.
+
+        The slider position of the mode being left is remembered for when it is selected again.
+        """
+        if mode not in self.slider_memory:
+            raise ValueError(f'mode must be one of {tuple(self.slider_memory)}, not {mode!r}')
+        self.flush()
+        if mode != self.mode:
+            self.slider_memory[self.mode] = slider_value
+            self.mode = mode
+        return self.slider_memory[mode]
+
+    def _event(self):
+        self.events += 1
+        if self.schedule is None:
+            self.flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            self.schedule(self.flush)
+
+    def flush(self):
+        """
+        Apply the latest pending slider values and notify listeners of changed outputs.
+        """
+        self._scheduled = False
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self.flushes += 1
+        if 'WIND' in pending:
+            self.wind_dir = slider_to_wind_dir(pending['WIND'])
+        if 'SPEED' in pending:
+            self.wind_speed = slider_to_wind_speed(pending['SPEED'])
+        if 'RWY' in pending:
+            heading = slider_to_runway(pending['RWY'])
+            if heading != self.wind_calculator.runway_heading:
+                self.wind_calculator.runway_heading = heading
+        self._refresh()
+
+    def _refresh(self):
+        inputs = {
+            'wind_info_text': (wind_info_text, (self.wind_dir, self.wind_speed, self.wind_calculator.units)),
+            'runway_text': (runway_text, (self.wind_calculator.runway_heading,)),
+        }
+        changed = {}
+        for name, (render, args) in inputs.items():
+            cached = self._outputs.get(name)
+            if cached is None or cached[0] != args:
+                text = render(*args)
+                self._outputs[name] = (args, text)
+                changed[name] = text
+        if changed:
+            for listener in self._listeners:
+                listener(changed)
+
+    # derived results
+
+    def components(self):
+        return self.wind_calculator.winds(self.wind_dir, self.wind_speed)
+
+    def _max_tail(self, phase):
+        if phase not in PHASES:
+            raise ValueError('phase must be "takeoff" or "landing"')
+        calc = self.wind_calculator
+        return calc.max_ldg_tailwind if phase == 'landing' else calc.max_to_tailwind
+
+    def grid(self, phase):
+        """
+        Return the max wind grid around the current wind for 'takeoff' or 'landing'.
+
+        The grid is a window into the cached `WindEnvelope` for the runway/limits, and the last
+        grid is reused as long as the wind, runway and limits are unchanged.
+        """
+        max_tail = self._max_tail(phase)
+        self.flush()
+        runway = self.wind_calculator.runway_heading
+        key = (runway, max_tail, self.wind_dir)
+        if key != self._grid_key:
+            self._grid = winds.get_envelope(runway, max_tail).window(self.wind_dir, GRID_NUM)
+            self._grid_key = key
+        return self._grid
+
+    def grid_results(self, phase, num=GRID_NUM, increment=10):
+        """
+        Return the same grid as `grid` as lazily formatted `GridResults` rows for the results table.
+
+        Rows are read straight from the cached `WindEnvelope`, so wide or fine grids (e.g. 180
+        rows either side at 1°) cost nothing until they are scrolled into view.
+        """
+        max_tail = self._max_tail(phase)
+        self.flush()
+        runway = self.wind_calculator.runway_heading
+        return GridResults.from_envelope(winds.get_envelope(runway, max_tail), self.wind_dir, num, increment,
+                                         units=self.wind_calculator.units)
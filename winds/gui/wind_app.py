@@ -1,11 +1,11 @@
 __version__ = '0.6.1'
 
 import ui
-from string import Template
 from pathlib import Path
 from functools import partial
 
 import winds
+from winds.gui.viewmodel import WindCalcViewModel, FRAME_INTERVAL
 
 import results
 import config
@@ -28,16 +28,30 @@ def initialize_wind_calculator(config):
     return wind_calc
 
 
-class WindCalcView(ui.View): 
-    WIND_INFO_LABEL_TEMPLATE = Template('Winds: ${wind_dir}° @ ${wind_speed} kts')
-    RUNWAY_DIR_LABEL_TEMPLATE = Template('Runway HDG: ${runway_dir}°')
- 
+class WindCalcView(ui.View):
+    """
+    Pythonista front end for `WindCalcViewModel`: forwards control events to the model and
+    copies the outputs it reports as changed into the labels.
+    """
+
     def __init__(self):
-        self.wind_calculator = initialize_wind_calculator(default_config)
-        self.wind_dir, self.wind_speed = 180, 10
-        self._last_wind_dir_slider_val = .5
-        self._last_runway_slider_val = .5
-    
+        self.view_model = WindCalcViewModel(
+            initialize_wind_calculator(default_config),
+            schedule=partial(ui.delay, seconds=FRAME_INTERVAL),
+        )
+
+    @property
+    def wind_calculator(self):
+        return self.view_model.wind_calculator
+
+    @property
+    def wind_dir(self):
+        return self.view_model.wind_dir
+
+    @property
+    def wind_speed(self):
+        return self.view_model.wind_speed
+
     def did_load(self):
         self.wind_info_label = self['wind_info_label']
         self.wind_dir_slider = self['wind_dir_slider']
@@ -56,53 +70,28 @@ class WindCalcView(ui.View):
         self.calculation_type_controller = self['calculation_type_controller']
         
         self.results_nav_view = self['results_nav_view']
-         
-        self.update_wind_info_label()
-        self.update_runway_dir_label()
+
+        self.view_model.subscribe(self.render)
+        self.render(self.view_model.outputs)
         self.snap_slider_to_prev_val(self.runway_wind_controller)
-        
-    def update_wind_info_label(self):
-        kwargs = {'wind_dir': f'{self.wind_dir:.1f}', 'wind_speed': f'{self.wind_speed:.1f}'}
-        self.wind_info_label.text = self.WIND_INFO_LABEL_TEMPLATE.safe_substitute(**kwargs)
-        
-    def update_runway_dir_label(self):
-        val = self.wind_calculator.runway_heading
-        self.runway_dir_label.text = self.RUNWAY_DIR_LABEL_TEMPLATE.safe_substitute(runway_dir=f'{val:.0f}')
-        
+
+    def render(self, changed):
+        labels = {
+            'wind_info_text': self.wind_info_label,
+            'runway_text': self.runway_dir_label,
+        }
+        for name, text in changed.items():
+            labels[name].text = text
+
     def snap_slider_to_prev_val(self, wind_rwy):
-        val = wind_rwy.segments[wind_rwy.selected_index]
-        prev = 'WIND' if val == 'RWY' else 'RWY'
-        slider_val = self.wind_dir_slider.value
-        if prev == 'WIND':
-            self._last_wind_dir_slider_val = slider_val
-            self.wind_dir_slider.value = self._last_runway_slider_val
-        else:
-            self._last_runway_slider_val = slider_val
-            self.wind_dir_slider.value = self._last_wind_dir_slider_val
+        mode = wind_rwy.segments[wind_rwy.selected_index]
+        self.wind_dir_slider.value = self.view_model.set_mode(mode, self.wind_dir_slider.value)
   
     def dir_slider_moved(self, sender):
-        def update_wind(slider):
-            INCREMENTS = 10
-            val = int((slider.value * (360 / INCREMENTS)) % 360) * INCREMENTS
-            self.wind_dir = val
-            self.update_wind_info_label()
-            
-        def update_runway(slider):
-            val = int((slider.value * 360) % 360)
-            self.wind_calculator.runway_heading = val
-            self.update_runway_dir_label()         
-            
-        func = {
-            'RWY': update_runway,
-            'WIND': update_wind,
-        }.get(self.runway_wind_controller.segments[self.runway_wind_controller.selected_index])
-        func(sender)
+        self.view_model.dir_slider_moved(sender.value)
               
     def wind_speed_slider_moved(self, sender):
-        MAX = 100
-        val = sender.value * MAX
-        self.wind_speed = int(val)
-        self.update_wind_info_label()
+        self.view_model.speed_slider_moved(sender.value)
         
     def calculate_button_pressed(self, button):
         controller = self.calculation_type_controller
@@ -124,19 +113,7 @@ class WindCalcView(ui.View):
         """
         Create and push the results view
         """
-        phases = {
-            'takeoff': self.wind_calculator.max_to_tailwind,
-            'landing': self.wind_calculator.max_ldg_tailwind
-        }
-        if phase not in ['takeoff', 'landing']:
-            raise ValueError('phase must be "takeoff" or "landing"')
-        grid = winds.max_wind_grid(
-            self.wind_dir,
-            7,
-            phases[phase],
-            runway_hdg=self.wind_calculator.runway_heading
-            )
-        view = results.make_grid_view(grid)
+        view = results.make_grid_view(self.view_model.grid_results(phase))
         self.results_nav_view.push_view(view)
         
                
@@ -0,0 +1,106 @@
+"""
+Module containing gust and variable direction (worst case) wind component calculations
+"""
+import math
+from collections import OrderedDict, namedtuple
+from math import radians
+
+from ._compat import np, broadcast_lists
+from .grid import wind_grid
+
+WorstCaseWind = namedtuple('WorstCaseWind', ['x_wind', 't_wind'])
+
+
+def worst_case_winds(wind_dir, velocity, gust=None, variable_from=None, variable_to=None, runway=360):
+    """
+    Return WorstCaseWind(x_wind, t_wind): the largest crosswind and tailwind magnitudes for a wind.
+
+    The peak speed is the larger of `velocity` and `gust`. If `variable_from`/`variable_to` are
+    given the wind may blow from anywhere in the clockwise sector between them, otherwise only from
+    `wind_dir`. A `wind_dir` of None/NaN with no sector (VRB) may blow from any direction. `t_wind`
+    is 0 when no tailwind is possible.
+
+    Every argument may be a scalar or an array; the worst case over each sector is found in closed
+    form (sector end points plus the 90°/180°/270° extremes it contains), so whole arrays of
+    observations are evaluated in one pass. Returns arrays with NumPy installed, lists otherwise.
+
+    Example:
+
+        >>> worst_case_winds(240, 15, 25, 240, 300, runway=270)
+        WorstCaseWind(x_wind=array([12.5]), t_wind=array([0.]))
+    """
+    if np is None:
+        return _worst_case_python(wind_dir, velocity, gust, variable_from, variable_to, runway)
+
+    def as_array(val):
+        return np.atleast_1d(np.asarray(np.nan if val is None else val, dtype=float))
+
+    wind_dir, velocity, gust = as_array(wind_dir), as_array(velocity), as_array(gust)
+    variable_from, variable_to, runway = as_array(variable_from), as_array(variable_to), as_array(runway)
+    peak = np.fmax(velocity, gust)
+
+    has_sector = ~(np.isnan(variable_from) | np.isnan(variable_to))
+    start = np.where(has_sector, variable_from, wind_dir)
+    width = np.where(has_sector, np.mod(variable_to - variable_from, 360), 0.0)
+    all_round = np.isnan(start)
+    start = np.mod(np.where(all_round, 0.0, start) - runway, 360)
+    width = np.where(all_round, 360.0, width)
+    end = start + width
+
+    def contains(angle):
+        return np.mod(angle - start, 360) <= width
+
+    x_factor = np.maximum(np.abs(np.sin(np.radians(start))), np.abs(np.sin(np.radians(end))))
+    x_factor = np.where(contains(90) | contains(270), 1.0, x_factor)
+    t_factor = np.maximum(-np.cos(np.radians(start)), -np.cos(np.radians(end)))
+    t_factor = np.where(contains(180), 1.0, np.maximum(t_factor, 0.0))
+    return WorstCaseWind(x_factor * peak, t_factor * peak)
+
+
+def gust_wind_grid(wind_hdg, num, max_tail=-1, max_cross=-1, increment=10, runway_hdg=360, gust_factor=0):
+    """
+    Return an OrderedDict like `max_wind_grid` holding the max steady velocity per direction when
+    gusts run `gust_factor` above the steady wind, so the gust stays within the limits.
+
+    Directions where the limits leave no room for the gust factor get 0, incalculable ones keep -1.
+    """
+    return apply_gust_factor(wind_grid(wind_hdg, num, max_tail, max_cross, increment, runway_hdg), gust_factor)
+
+
+def apply_gust_factor(grid, gust_factor):
+    """
+    Return a copy of a max wind grid with every calculable velocity reduced by `gust_factor`.
+    """
+    return OrderedDict(
+        (hdg, val if val == -1 else max(val - gust_factor, 0)) for hdg, val in grid.items()
+    )
+
+
+def _worst_case_python(wind_dir, velocity, gust, variable_from, variable_to, runway):
+    x_winds, t_winds = [], []
+    for w, v, g, v_from, v_to, r in zip(*broadcast_lists(wind_dir, velocity, gust, variable_from,
+                                                          variable_to, runway)):
+        peak = v if g is None or g != g else max(v, g)
+        if v_from is not None and v_to is not None and v_from == v_from and v_to == v_to:
+            start, width = v_from, (v_to - v_from) % 360
+        elif w is None or w != w:
+            start, width = 0, 360
+        else:
+            start, width = w, 0
+        start = (start - r) % 360
+        end = start + width
+
+        def contains(angle):
+            return (angle - start) % 360 <= width
+
+        if contains(90) or contains(270):
+            x_factor = 1.0
+        else:
+            x_factor = max(abs(math.sin(radians(start))), abs(math.sin(radians(end))))
+        if contains(180):
+            t_factor = 1.0
+        else:
+            t_factor = max(-math.cos(radians(start)), -math.cos(radians(end)), 0.0)
+        x_winds.append(x_factor * peak)
+        t_winds.append(t_factor * peak)
+    return WorstCaseWind(x_winds, t_winds)
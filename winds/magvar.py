@@ -0,0 +1,264 @@
+"""
+Module containing the magnetic variation (declination) model
+
+METAR and TAF winds are reported relative to true north while runway headings are magnetic, so a
+wind has to be turned by the local declination before its components are taken:
+
+    magnetic = true - declination    (declination in degrees, east positive)
+
+Evaluating a geomagnetic model per observation is far too slow for backtests, so the model is
+evaluated once onto a regular lat/lon grid (`build_grid`) that is memory-mapped when loaded and
+bilinearly interpolated for whole batches of positions (`DeclinationGrid`).
+
+The bundled grid comes from the degree 1-8 Gauss coefficients of IGRF-13 (epoch 2020.0) on a
+spherical Earth: good to about a degree away from the magnetic poles, which is plenty for wind
+components, and not for navigation.
+
+    python -m winds.magvar build winds/data/declination.f32 --step 2
+    python -m winds.magvar 40.64 -73.78
+"""
+import argparse
+import math
+import mmap
+import struct
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from ._compat import np
+
+DEFAULT_GRID = Path(__file__).parent.joinpath('data', 'declination.f32')
+GRID_STEP = 2
+MODEL_EPOCH = 2020.0
+
+# magic, model epoch, grid step (degrees), rows (latitudes), columns (longitudes); the grid follows as
+# little endian float32 declinations, row by row from -90° to 90° latitude, columns from -180° to 180°
+HEADER = struct.Struct('<4sffII')
+MAGIC = b'DECL'
+
+# IGRF-13 main field at 2020.0, nT: {(n, m): (g, h)}
+IGRF_2020 = {
+    (1, 0): (-29404.8, 0.0), (1, 1): (-1450.9, 4652.5),
+    (2, 0): (-2499.6, 0.0), (2, 1): (2982.0, -2991.6), (2, 2): (1677.0, -734.6),
+    (3, 0): (1363.2, 0.0), (3, 1): (-2381.2, -82.1), (3, 2): (1236.2, 241.9), (3, 3): (525.7, -543.4),
+    (4, 0): (903.0, 0.0), (4, 1): (809.5, 281.9), (4, 2): (86.3, -158.4), (4, 3): (-309.4, 199.7),
+    (4, 4): (48.0, -349.7),
+    (5, 0): (-234.3, 0.0), (5, 1): (363.2, 47.7), (5, 2): (187.8, 208.3), (5, 3): (-140.7, -121.2),
+    (5, 4): (-151.2, 32.3), (5, 5): (13.5, 98.9),
+    (6, 0): (66.0, 0.0), (6, 1): (65.5, -19.1), (6, 2): (72.9, 25.1), (6, 3): (-121.5, 52.8),
+    (6, 4): (-36.2, -64.5), (6, 5): (13.5, 8.9), (6, 6): (-64.7, 68.1),
+    (7, 0): (80.6, 0.0), (7, 1): (-76.7, -51.5), (7, 2): (-8.2, -16.9), (7, 3): (56.5, 2.2),
+    (7, 4): (15.8, 23.5), (7, 5): (6.4, -2.2), (7, 6): (-7.2, -27.2), (7, 7): (9.8, -1.8),
+    (8, 0): (23.7, 0.0), (8, 1): (9.7, 8.4), (8, 2): (-17.6, -15.3), (8, 3): (-0.5, 12.8),
+    (8, 4): (-21.1, -11.7), (8, 5): (15.3, 14.9), (8, 6): (13.7, 3.6), (8, 7): (-16.5, -6.9),
+    (8, 8): (-0.3, 2.8),
+}
+
+
+def model_declination(lat, lon, coefficients=None):
+    """
+    Return the declination in degrees (east positive) at a position from spherical harmonic
+    Gauss coefficients ({(n, m): (g, h)}, `IGRF_2020` by default).
+
+    This is the slow, exact path used to build grids.
+
+    Example:
+
+        >>> round(model_declination(40.64, -73.78))
+        -13
+    """
+    coefficients = IGRF_2020 if coefficients is None else coefficients
+    degree = max(n for n, _ in coefficients)
+    # keep clear of the geographic poles, where declination is undefined
+    theta = math.radians(90 - max(min(lat, 89.99), -89.99))
+    phi = math.radians(lon)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+
+    # Schmidt semi-normalized associated Legendre functions and their theta derivatives
+    p, dp = {(0, 0): 1.0}, {(0, 0): 0.0}
+    for m in range(degree + 1):
+        if m:
+            scale = 1.0 if m == 1 else math.sqrt((2 * m - 1) / (2 * m))
+            p[m, m] = scale * sin_t * p[m - 1, m - 1]
+            dp[m, m] = scale * (cos_t * p[m - 1, m - 1] + sin_t * dp[m - 1, m - 1])
+        for n in range(m + 1, degree + 1):
+            prev2 = math.sqrt((n - 1) ** 2 - m ** 2)
+            p2, dp2 = (p[n - 2, m], dp[n - 2, m]) if n - 2 >= m else (0.0, 0.0)
+            norm = math.sqrt(n ** 2 - m ** 2)
+            p[n, m] = ((2 * n - 1) * cos_t * p[n - 1, m] - prev2 * p2) / norm
+            dp[n, m] = ((2 * n - 1) * (cos_t * dp[n - 1, m] - sin_t * p[n - 1, m]) - prev2 * dp2) / norm
+
+    north = east = 0.0
+    for (n, m), (g, h) in coefficients.items():
+        cos_m, sin_m = math.cos(m * phi), math.sin(m * phi)
+        north += (g * cos_m + h * sin_m) * dp[n, m]
+        east += m * (g * sin_m - h * cos_m) * p[n, m] / sin_t
+    return math.degrees(math.atan2(east, north))
+
+
+def build_grid(path=DEFAULT_GRID, step=GRID_STEP, coefficients=None, epoch=MODEL_EPOCH):
+    """
+    Evaluate the model every `step` degrees of latitude and longitude and write the grid to `path`.
+
+    Return the number of grid points written.
+    """
+    rows, cols = int(180 // step) + 1, int(360 // step) + 1
+    values = [model_declination(-90 + row * step, -180 + col * step, coefficients)
+              for row in range(rows) for col in range(cols)]
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as fileobj:
+        fileobj.write(HEADER.pack(MAGIC, epoch, step, rows, cols))
+        fileobj.write(struct.pack(f'<{len(values)}f', *values))
+    return len(values)
+
+
+class DeclinationGrid:
+    """
+    A declination grid written by `build_grid`, memory-mapped and bilinearly interpolated.
+
+    `declination(lats, lons)` takes scalars or sequences/arrays of positions (broadcast against
+    each other) and returns a float or an ndarray (a list without NumPy).
+    """
+
+    def __init__(self, path=DEFAULT_GRID):
+        self.path = Path(path)
+        with open(self.path, 'rb') as fileobj:
+            self._mmap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.epoch, self.step, self.rows, self.cols = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or len(self._mmap) != HEADER.size + self.rows * self.cols * 4:
+            self._mmap.close()
+            raise ValueError(f'{self.path} is not a declination grid')
+        if np is not None:
+            self.values = np.frombuffer(self._mmap, dtype='<f4', offset=HEADER.size).reshape(self.rows, self.cols)
+        else:
+            self.values = memoryview(self._mmap)[HEADER.size:].cast('f')
+
+    def __repr__(self):
+        return f'DeclinationGrid({str(self.path)!r}, epoch={self.epoch}, step={self.step:g}°)'
+
+    def close(self):
+        if np is not None:
+            self.values = None
+        else:
+            self.values.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def declination(self, lat, lon):
+        """
+        Return the interpolated declination (degrees, east positive) at `lat`, `lon`.
+        """
+        scalar = not hasattr(lat, '__iter__') and not hasattr(lon, '__iter__')
+        if np is None:
+            if scalar:
+                return self._declination_python(lat, lon)
+            from ._compat import broadcast_lists
+            return [self._declination_python(a, o) for a, o in zip(*broadcast_lists(lat, lon))]
+        row = (np.clip(np.asarray(lat, dtype=float), -90, 90) + 90) / self.step
+        col = (np.mod(np.asarray(lon, dtype=float) + 180, 360)) / self.step
+        row0 = np.minimum(row.astype(np.intp), self.rows - 2)
+        col0 = np.minimum(col.astype(np.intp), self.cols - 2)
+        fr, fc = row - row0, col - col0
+        v = self.values
+        low = v[row0, col0] * (1 - fc) + v[row0, col0 + 1] * fc
+        high = v[row0 + 1, col0] * (1 - fc) + v[row0 + 1, col0 + 1] * fc
+        result = (low * (1 - fr) + high * fr).astype(float)
+        return float(result) if scalar else result
+
+    def _declination_python(self, lat, lon):
+        row = (min(max(float(lat), -90), 90) + 90) / self.step
+        col = ((float(lon) + 180) % 360) / self.step
+        row0, col0 = min(int(row), self.rows - 2), min(int(col), self.cols - 2)
+        fr, fc = row - row0, col - col0
+        v, cols = self.values, self.cols
+        low = v[row0 * cols + col0] * (1 - fc) + v[row0 * cols + col0 + 1] * fc
+        high = v[(row0 + 1) * cols + col0] * (1 - fc) + v[(row0 + 1) * cols + col0 + 1] * fc
+        return low * (1 - fr) + high * fr
+
+
+@lru_cache(maxsize=None)
+def default_grid():
+    """
+    Return the `DeclinationGrid` bundled with the package, building it if it is missing.
+    """
+    if not DEFAULT_GRID.exists():
+        build_grid(DEFAULT_GRID)
+    return DeclinationGrid(DEFAULT_GRID)
+
+
+def declination(lat, lon):
+    """
+    Return the declination (degrees, east positive) at one or many positions from the bundled grid.
+
+    Example:
+
+        >>> round(declination(51.47, -0.46))
+        0
+    """
+    return default_grid().declination(lat, lon)
+
+
+def true_to_magnetic(direction, declination):
+    """
+    Return true directions turned to magnetic (scalars or sequences/arrays, broadcast).
+
+    Example:
+
+        >>> true_to_magnetic(240, -13)
+        253
+    """
+    if not hasattr(direction, '__iter__') and not hasattr(declination, '__iter__'):
+        return (direction - declination) % 360
+    if np is not None:
+        return np.mod(np.asarray(direction, dtype=float) - np.asarray(declination, dtype=float), 360)
+    from ._compat import broadcast_lists
+    return [(d - v) % 360 for d, v in zip(*broadcast_lists(direction, declination))]
+
+
+def magnetic_to_true(direction, declination):
+    """
+    Return magnetic directions (e.g. runway headings) turned to true.
+
+    Example:
+
+        >>> magnetic_to_true(224, -13)
+        211
+    """
+    if not hasattr(declination, '__iter__'):
+        declination = -declination
+    elif np is not None:
+        declination = -np.asarray(declination, dtype=float)
+    else:
+        declination = [-v for v in declination]
+    return true_to_magnetic(direction, declination)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m winds.magvar', description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest='command')
+    build = commands.add_parser('build', help='evaluate the model onto a grid file')
+    build.add_argument('path', nargs='?', default=str(DEFAULT_GRID))
+    build.add_argument('--step', type=float, default=GRID_STEP)
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'build':
+        args = parser.parse_args(argv)
+        count = build_grid(args.path, args.step)
+        print(f'{count} grid points written to {args.path}')
+        return 0
+    position = argparse.ArgumentParser(prog='python -m winds.magvar', description='show the declination at a position')
+    position.add_argument('lat', type=float)
+    position.add_argument('lon', type=float)
+    args = position.parse_args(argv)
+    grid, model = declination(args.lat, args.lon), model_declination(args.lat, args.lon)
+    print(f'declination {grid:+.1f}° (grid), {model:+.1f}° (model)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Module containing the METAR/TAF wind group parser and the streaming METAR wind decoder
+"""
+import re
+from collections import namedtuple
+
+from .winds import WindVector
+
+MetarWind = namedtuple('MetarWind', ['station', 'time', 'wind'])
+
+UNITS = {
+    'KT': 'kts',
+    'MPS': 'mps',
+    'KMH': 'kmh',
+}
+
+# dddff(f)Ggg(g)KT [dddVddd], e.g. 24015G25KT 240V300, VRB03KT, 36010MPS, 270P49MPS
+WIND_GROUP_PATTERN = (
+    r'(?P<dir>\d{3}|VRB)'
+    r'P?(?P<speed>\d{2,3})'
+    r'(?:GP?(?P<gust>\d{2,3}))?'
+    r'(?P<unit>KT|MPS|KMH)'
+    r'(?:[ \t]+(?P<var_from>\d{3})V(?P<var_to>\d{3})(?!\S))?'
+)
+
+WIND_GROUP_RE = re.compile(r'(?<!\S)' + WIND_GROUP_PATTERN + r'(?!\S)')
+
+# One report per line: skip to the station/time/wind groups, then consume the rest of the line
+# so the scanner moves straight on to the next report.
+METAR_RE = re.compile(
+    r'(?m)^.*?\b'
+    r'(?P<station>[A-Z][A-Z0-9]{3}) +'
+    r'(?P<time>\d{6})Z +'
+    r'(?:(?:AUTO|COR|NIL) +)?'
+    + WIND_GROUP_PATTERN + r'(?!\S).*$'
+)
+
+READ_SIZE = 1 << 20
+
+
+def wind_from_match(match):
+    """
+    Return a WindVector from a match of `WIND_GROUP_RE` or `METAR_RE`
+    """
+    direction, speed, gust, unit, var_from, var_to = match.group(
+        'dir', 'speed', 'gust', 'unit', 'var_from', 'var_to')
+    return WindVector(
+        None if direction == 'VRB' else int(direction),
+        int(speed),
+        UNITS[unit],
+        gust=None if gust is None else int(gust),
+        variable_from=None if var_from is None else int(var_from),
+        variable_to=None if var_to is None else int(var_to),
+    )
+
+
+def parse_wind_group(text):
+    """
+    Return a WindVector from the first wind group in `text`, or None if there is none.
+
+    Example:
+
+        >>> parse_wind_group('KJFK 121651Z 24015G25KT 240V300 10SM FEW250')
+        Wind: 240° @ 15.0kts G25.0 (240V300)
+        >>> parse_wind_group('VRB03KT')
+        Wind: VRB @ 3.0kts
+    """
+    match = WIND_GROUP_RE.search(text)
+    return None if match is None else wind_from_match(match)
+
+
+def iter_metar_winds(fileobj, read_size=READ_SIZE):
+    """
+    Yield a MetarWind(station, time, wind) for every METAR/SPECI report in `fileobj`.
+
+    `time` is the report's 'DDHHMM' string. The file is read in blocks of about `read_size`
+    characters (always ending on a line boundary) and each block is scanned in a single pass by
+    one precompiled expression, so archives of any size stream with bounded memory. Reports
+    without a wind group (e.g. missing or '/////KT' winds) are skipped.
+    """
+    finditer = METAR_RE.finditer
+    while True:
+        block = fileobj.read(read_size)
+        if not block:
+            return
+        if not block.endswith('\n'):
+            block += fileobj.readline()
+        for match in finditer(block):
+            yield MetarWind(match.group('station'), match.group('time'), wind_from_match(match))
@@ -0,0 +1,300 @@
+"""
+Module containing the streaming runway wind limit monitor
+
+A `WindMonitor` watches runways at many stations and consumes a stream of observations
+(`MetarWind`s from `metar.iter_metar_winds`/`follow_metar_winds`, or (station, time, wind) tuples),
+emitting a `MonitorEvent` when a runway's crosswind or tailwind goes over its limit, and another
+when it comes back under the limit by at least `hysteresis`, so a wind hovering at the limit does
+not raise an alert per report.
+
+Each check is a lookup into 360° tables of the max wind velocity for the limit and for the limit
+less the hysteresis (the `WindEnvelope` tables, shared by every runway with the same profile); a
+variable sector (dddVddd) is two lookups into a range minimum table built from them. The alert
+state of every runway is two bytes, so memory stays flat however long the stream runs.
+
+    python -m winds.monitor metars.txt --airports KJFK KBOS --max-cross 38 --max-tail 10
+    tail -f metars.txt | python -m winds.monitor - --airports KJFK --follow
+"""
+import argparse
+import math
+import sys
+from collections import namedtuple
+from functools import lru_cache
+from time import sleep
+
+from .envelope import get_envelope
+from .gusts import worst_case_winds
+from .metar import METAR_RE, MetarWind, iter_metar_winds, wind_from_match
+from .units import DEFAULT_UNIT, conversion_factor
+from .winds import MAX_TO_TAILWIND, MAX_XWIND
+
+HYSTERESIS = 2
+CROSSWIND, TAILWIND = 'crosswind', 'tailwind'
+COMPONENTS = (CROSSWIND, TAILWIND)
+VRB_INDEX = 360
+
+MonitorEvent = namedtuple('MonitorEvent', ['station', 'time', 'runway', 'component', 'alert', 'value', 'limit'])
+
+
+@lru_cache(maxsize=None)
+def _limit_table(runway_hdg, max_tail, max_cross):
+    """
+    Return a tuple of the max wind velocity for every whole degree (inf without a limit), plus the
+    all-round (VRB) limit at index 360.
+    """
+    if max_tail == -1 and max_cross == -1:
+        return (math.inf,) * (VRB_INDEX + 1)
+    table = [math.inf if val == -1 else float(val) for val in get_envelope(runway_hdg, max_tail, max_cross).velocities]
+    return tuple(table + [min(table)])
+
+
+@lru_cache(maxsize=None)
+def _sector_table(runway_hdg, max_tail, max_cross):
+    """
+    Return a sparse (range minimum) table of `_limit_table` around the compass twice: level k holds
+    the min of every 2**k consecutive degrees, so any sector's min is the min of two entries.
+    """
+    levels = [_limit_table(runway_hdg, max_tail, max_cross)[:VRB_INDEX] * 2]
+    while 2 ** len(levels) <= VRB_INDEX:
+        previous, half = levels[-1], 2 ** (len(levels) - 1)
+        levels.append(tuple(min(previous[i], previous[i + half]) for i in range(len(previous) - half)))
+    return tuple(levels)
+
+
+def _sector_limit(levels, variable_from, variable_to):
+    start = int(variable_from) % 360
+    count = int((variable_to - variable_from) % 360) + 1
+    level = count.bit_length() - 1
+    values = levels[level]
+    return min(values[start], values[start + count - 2 ** level])
+
+
+class WindMonitor:
+    """
+    Crosswind/tailwind limit alerts with hysteresis for runways at many stations.
+
+    `max_cross`, `max_tail` and `hysteresis` (in `units`, -1 for no limit) are the defaults for
+    runways added with `watch`, and are fixed for a runway once it is watched. A component alerts
+    when the worst case for the observation (peak of speed and gust, over the whole variable sector
+    or all round for VRB) exceeds the limit, and clears once it is at or below the limit less
+    `hysteresis`.
+
+    `process` checks one observation and returns its events; `run` consumes a stream and yields them.
+    Observations for stations that are not watched are counted in `ignored` and skipped.
+    """
+
+    def __init__(self, max_cross=MAX_XWIND, max_tail=MAX_TO_TAILWIND, hysteresis=HYSTERESIS, units=DEFAULT_UNIT):
+        self.max_cross = max_cross
+        self.max_tail = max_tail
+        self.hysteresis = hysteresis
+        self.units = units
+        self.observations = 0
+        self.ignored = 0
+        self._stations = {}
+        self._runways = []
+        self._headings = []
+        self._limits = []
+        self._clear_limits = []
+        self._tables = []
+        self._sectors = []
+        self._state = bytearray()
+        self._factors = {}
+
+    def __repr__(self):
+        return f'WindMonitor(stations={len(self._stations)}, runways={len(self._runways)})'
+
+    @classmethod
+    def from_calculator(cls, calc, landing=False, hysteresis=HYSTERESIS):
+        """
+        Return a monitor using a `WindCalculator`'s crosswind and takeoff/landing tailwind limits and units
+        """
+        max_tail = calc.max_ldg_tailwind if landing else calc.max_to_tailwind
+        return cls(calc.max_crosswind, max_tail, hysteresis, calc.units)
+
+    def watch(self, station, runway, max_cross=None, max_tail=None, declination=0):
+        """
+        Watch `runway` (a magnetic heading or an `airports.Runway`) at `station`, with the default
+        limits unless given. Observed winds are true, so pass the station's `declination`.
+        """
+        heading = getattr(runway, 'heading', runway)
+        max_cross = self.max_cross if max_cross is None else max_cross
+        max_tail = self.max_tail if max_tail is None else max_tail
+        true_hdg = (heading + declination) % 360 if declination else heading
+        clear_cross = -1 if max_cross == -1 else max(max_cross - self.hysteresis, 0)
+        clear_tail = -1 if max_tail == -1 else max(max_tail - self.hysteresis, 0)
+        key = str(station).upper()
+        self._stations[key] = self._stations.get(key, ()) + (len(self._runways),)
+        self._runways.append(runway)
+        self._headings.append(true_hdg)
+        self._limits.append((max_cross, max_tail))
+        self._clear_limits.append((clear_cross, clear_tail))
+        # alert and clear tables for the crosswind, then for the tailwind
+        profiles = ((true_hdg, -1, max_cross), (true_hdg, -1, clear_cross),
+                    (true_hdg, max_tail, -1), (true_hdg, clear_tail, -1))
+        self._tables.append(tuple(_limit_table(*profile) for profile in profiles))
+        self._sectors.append(tuple(_sector_table(*profile) for profile in profiles))
+        self._state.extend(b'\0\0')
+
+    def watch_airport(self, ident, database=None, true_north=True, **limits):
+        """
+        Watch every runway end of an airport in the runway database (`airports.default_database()`
+        unless `database` is given), turning the observed true winds by the airport's declination.
+        """
+        from .airports import default_database
+        airport = (database or default_database()).airport(ident)
+        declination = 0
+        if true_north:
+            from .magvar import declination as declination_at
+            declination = declination_at(airport.lat, airport.lon)
+        for runway in airport.runways:
+            self.watch(airport.icao, runway, declination=declination, **limits)
+        return airport
+
+    def alerts(self):
+        """
+        Return a list of (station, runway, component) currently over limits.
+        """
+        out = []
+        for station, slots in self._stations.items():
+            for slot in slots:
+                for component, name in enumerate(COMPONENTS):
+                    if self._state[2 * slot + component]:
+                        out.append((station, self._runways[slot], name))
+        return out
+
+    def reset(self):
+        """Clear every alert without emitting events."""
+        self._state[:] = bytes(len(self._state))
+
+    def process(self, station, time, wind):
+        """
+        Return a list of `MonitorEvent`s (usually empty) for one observation.
+        """
+        self.observations += 1
+        station = str(station).upper()
+        slots = self._stations.get(station)
+        if slots is None:
+            self.ignored += 1
+            return []
+        factor = self._factors.get(wind.strength_unit)
+        if factor is None:
+            factor = self._factors[wind.strength_unit] = conversion_factor(wind.strength_unit, self.units)
+        peak = wind.strength if wind.gust is None or wind.gust < wind.strength else wind.gust
+        peak *= factor
+        sector = wind.variable_from is not None and wind.variable_to is not None
+        index = VRB_INDEX if wind.direction is None else int(round(wind.direction.value)) % 360
+
+        events = []
+        state = self._state
+        for slot in slots:
+            tables = self._sectors[slot] if sector else self._tables[slot]
+            for component in (0, 1):
+                alert_table, clear_table = tables[2 * component], tables[2 * component + 1]
+                at = 2 * slot + component
+                if not state[at]:
+                    limit = _sector_limit(alert_table, wind.variable_from, wind.variable_to) if sector \
+                        else alert_table[index]
+                    if peak > limit:
+                        state[at] = 1
+                        events.append(self._event(station, time, wind, peak, slot, component, True, limit))
+                else:
+                    limit = _sector_limit(clear_table, wind.variable_from, wind.variable_to) if sector \
+                        else clear_table[index]
+                    if peak <= limit:
+                        state[at] = 0
+                        events.append(self._event(station, time, wind, peak, slot, component, False, limit))
+        return events
+
+    def _event(self, station, time, wind, peak, slot, component, alert, velocity):
+        # a component scales with the wind speed, so it is the table's limit scaled by peak / velocity
+        limit = self._limits[slot][component]
+        table_limit = limit if alert else self._clear_limits[slot][component]
+        if velocity == math.inf:
+            value = 0.0
+        elif velocity:
+            value = table_limit * peak / velocity
+        else:
+            direction = None if wind.direction is None else wind.direction.value
+            worst = worst_case_winds(direction, peak, None, wind.variable_from, wind.variable_to, self._headings[slot])
+            value = float(worst[component][0])
+        return MonitorEvent(station, time, self._runways[slot], COMPONENTS[component], alert, value, limit)
+
+    def run(self, observations):
+        """
+        Yield a `MonitorEvent` for every limit crossing in a stream of (station, time, wind) observations.
+        """
+        process = self.process
+        for station, time, wind in observations:
+            yield from process(station, time, wind)
+
+
+def follow_metar_winds(fileobj, poll_interval=1.0, stop=None):
+    """
+    Yield a `MetarWind` for every METAR/SPECI line in `fileobj` as it is written, like `tail -f`.
+
+    At the end of the file the generator waits `poll_interval` seconds and reads again, also when
+    the last line is not finished yet; it returns once `stop()` is true at the end of the file
+    (never if `stop` is None), parsing an unterminated last line first. Works on anything with
+    `readline`, e.g. `socket.makefile('r')`.
+    """
+    pending = ''
+    while True:
+        line = fileobj.readline()
+        if line:
+            pending += line
+            if not pending.endswith('\n'):
+                continue
+        elif stop is None or not stop():
+            sleep(poll_interval)
+            continue
+        elif not pending:
+            return
+        match = METAR_RE.match(pending)
+        pending = ''
+        if match is not None:
+            yield MetarWind(match.group('station'), match.group('time'), wind_from_match(match))
+
+
+def format_event(event):
+    """
+    Return a one line description of a `MonitorEvent`.
+
+    Example:
+
+        >>> format_event(MonitorEvent('KJFK', '121651', 220, 'crosswind', True, 40.5, 38))
+        'KJFK 121651Z RWY 220 CROSSWIND 40.5 OVER LIMIT 38'
+    """
+    runway = getattr(event.runway, 'ident', event.runway)
+    status = 'OVER LIMIT' if event.alert else 'BACK WITHIN LIMIT'
+    return (f'{event.station} {event.time}Z RWY {runway} {event.component.upper()} {event.value:.1f} '
+            f'{status} {event.limit:g}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m winds.monitor', description=__doc__.splitlines()[1])
+    parser.add_argument('metars', help='METAR file, - for stdin')
+    parser.add_argument('--airports', nargs='+', required=True, help='airports to watch (every runway end)')
+    parser.add_argument('--max-cross', type=float, default=MAX_XWIND)
+    parser.add_argument('--max-tail', type=float, default=MAX_TO_TAILWIND)
+    parser.add_argument('--hysteresis', type=float, default=HYSTERESIS)
+    parser.add_argument('--follow', action='store_true', help='keep reading as the file grows')
+    args = parser.parse_args(argv)
+
+    monitor = WindMonitor(args.max_cross, args.max_tail, args.hysteresis)
+    for ident in args.airports:
+        monitor.watch_airport(ident)
+    fileobj = sys.stdin if args.metars == '-' else open(args.metars)
+    try:
+        stream = follow_metar_winds(fileobj) if args.follow else iter_metar_winds(fileobj)
+        for event in monitor.run(stream):
+            print(format_event(event), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if fileobj is not sys.stdin:
+            fileobj.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Module containing the process pool driver for network wide usability backtests
+
+Each airport's observations are copied once into a `multiprocessing.shared_memory` block and
+split into row range (time range) shards. Worker processes attach to the block by name and
+histogram their slice in place, so observation arrays are never pickled; only the shard
+description goes out and a sparse histogram comes back. Per airport results are merged in shard
+order, so the output does not depend on scheduling or worker count.
+"""
+import os
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from ._compat import np
+from .usability import WindStats
+
+SHARD_SIZE = 1 << 18
+
+# column name: dtype; rows are stored column after column in one shared block per airport
+SHARED_COLUMNS = (('direction', 'i2'), ('speed', 'u1'), ('gust', 'u1'))
+
+Shard = namedtuple('Shard', ['station', 'index', 'block', 'length', 'start', 'stop', 'gusts'])
+ShardResult = namedtuple('ShardResult', ['station', 'index', 'bins', 'counts', 'observations', 'pid',
+                                         'seconds'])
+WorkerThroughput = namedtuple('WorkerThroughput', ['pid', 'shards', 'observations', 'seconds', 'rate'])
+NetworkBacktest = namedtuple('NetworkBacktest', ['stats', 'usability', 'workers', 'seconds'])
+
+
+def _columns(source):
+    """
+    Return (direction, speed, gust) arrays from a WindArchive or a (directions, speeds[, gusts]) tuple,
+    with -1 for VRB directions like the archive.
+    """
+    if hasattr(source, 'chunks'):
+        return source.direction, source.speed, source.gust
+    directions, speeds, *gusts = source
+    directions = np.asarray(directions, dtype=float)
+    directions = np.where(np.isnan(directions), -1, np.rint(directions) % 360)
+    speeds = np.clip(np.rint(np.asarray(speeds, dtype=float)), 0, 255)
+    gusts = np.clip(np.rint(np.asarray(gusts[0], dtype=float)), 0, 255) if gusts else np.zeros(len(speeds))
+    return directions, speeds, gusts
+
+
+def _views(buf, length):
+    views, offset = [], 0
+    for _, dtype in SHARED_COLUMNS:
+        view = np.ndarray(length, dtype=dtype, buffer=buf, offset=offset)
+        views.append(view)
+        offset += view.nbytes
+    return views
+
+
+def _share(columns):
+    length = len(columns[0])
+    size = sum(np.dtype(dtype).itemsize for _, dtype in SHARED_COLUMNS) * length
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for view, column in zip(_views(block.buf, length), columns):
+        view[:] = column
+    return block, length
+
+
+def _run_shard(shard):
+    started = time.perf_counter()
+    block = shared_memory.SharedMemory(name=shard.block)
+    try:
+        direction, speed, gust = (view[shard.start:shard.stop] for view in _views(block.buf, shard.length))
+        # the shared int16 column marks VRB with -1
+        direction = np.where(direction == -1, np.nan, direction)
+        stats = WindStats()
+        stats.add_batch(direction, np.maximum(speed, gust) if shard.gusts else speed)
+        del direction, speed, gust
+    finally:
+        block.close()
+    flat = stats.counts.ravel()
+    bins = np.flatnonzero(flat)
+    return ShardResult(shard.station, shard.index, bins, flat[bins], stats.total, os.getpid(),
+                       time.perf_counter() - started)
+
+
+def backtest_airports(sources, profiles, workers=None, shard_size=SHARD_SIZE, gusts=False):
+    """
+    Return NetworkBacktest(stats, usability, workers, seconds) for many airports in parallel.
+
+    `sources` maps station to a `WindArchive` or a (directions, speeds[, gusts]) tuple of arrays
+    (NaN direction for VRB). `profiles` maps station to its (runway_hdg, max_tail, max_cross)
+    profiles, or is one list used for every station. `stats` holds the merged `WindStats` and
+    `usability` the `usability_table` per station, `workers` the per process WorkerThroughput.
+
+    `workers` is the process count (None for one per CPU); 0 runs every shard in this process,
+    which is also what happens without NumPy.
+    """
+    started = time.perf_counter()
+    stations = list(sources)
+    if not isinstance(profiles, dict):
+        profiles = {station: profiles for station in stations}
+    if np is None:
+        return _backtest_serial(sources, profiles, gusts, started)
+
+    blocks, shards = {}, []
+    try:
+        for station in stations:
+            block, length = _share(_columns(sources[station]))
+            blocks[station] = block
+            for index, start in enumerate(range(0, length, shard_size)):
+                shards.append(Shard(station, index, block.name, length, start, min(start + shard_size, length),
+                                    gusts))
+        if workers == 0:
+            results = [_run_shard(shard) for shard in shards]
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_run_shard, shards))
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+    stats = OrderedDict((station, WindStats()) for station in stations)
+    order = {station: i for i, station in enumerate(stations)}
+    for result in sorted(results, key=lambda r: (order[r.station], r.index)):
+        station_stats = stats[result.station]
+        station_stats.counts.ravel()[result.bins] += result.counts
+        station_stats.total += result.observations
+    return NetworkBacktest(stats, _usability(stats, profiles), _throughput(results),
+                           time.perf_counter() - started)
+
+
+def _backtest_serial(sources, profiles, gusts, started):
+    stats = OrderedDict()
+    for station, source in sources.items():
+        stats[station] = station_stats = WindStats()
+        if hasattr(source, 'chunks'):
+            station_stats.add_archive(source, gusts)
+        else:
+            directions, speeds, *gust_speeds = source
+            if gusts and gust_speeds:
+                speeds = [max(s, g) for s, g in zip(speeds, gust_speeds[0])]
+            station_stats.add_batch(directions, speeds)
+    seconds = time.perf_counter() - started
+    total = sum(s.total for s in stats.values())
+    throughput = [WorkerThroughput(os.getpid(), len(stats), total, seconds, total / seconds if seconds else 0)]
+    return NetworkBacktest(stats, _usability(stats, profiles), throughput, seconds)
+
+
+def _usability(stats, profiles):
+    return OrderedDict((station, s.usability_table(profiles[station])) for station, s in stats.items())
+
+
+def _throughput(results):
+    workers = OrderedDict()
+    for result in results:
+        shards, observations, seconds = workers.get(result.pid, (0, 0, 0.0))
+        workers[result.pid] = (shards + 1, observations + result.observations, seconds + result.seconds)
+    return [WorkerThroughput(pid, shards, observations, seconds, observations / seconds if seconds else 0)
+            for pid, (shards, observations, seconds) in sorted(workers.items())]
+
+
+def format_throughput(workers):
+    """
+    Return a printable table of per worker throughput.
+    """
+    lines = [f'{"pid":>8} {"shards":>7} {"observations":>13} {"busy s":>8} {"obs/s":>12}']
+    for worker in workers:
+        lines.append(f'{worker.pid:>8} {worker.shards:>7} {worker.observations:>13} {worker.seconds:>8.3f} '
+                     f'{worker.rate:>12,.0f}')
+    return '\n'.join(lines)
@@ -0,0 +1,149 @@
+"""
+Module containing the non-interactive batch pipeline for wind/runway records
+"""
+import csv
+import json
+from itertools import islice
+
+from ._compat import np
+from .batch import get_winds_batch
+from .units import convert_speed
+
+CHUNK_SIZE = 10000
+FORMATS = ('csv', 'jsonl')
+
+
+def guess_format(path, default='csv'):
+    """Return 'jsonl' or 'csv' from a file name, `default` for stdin/stdout or unknown extensions."""
+    if path in (None, '-'):
+        return default
+    path = str(path).lower()
+    if path.endswith(('.jsonl', '.json', '.ndjson')):
+        return 'jsonl'
+    return 'csv' if path.endswith('.csv') else default
+
+
+def read_chunks(fileobj, fmt='csv', chunk_size=CHUNK_SIZE):
+    """
+    Yield dicts of column lists, at most `chunk_size` records each, from a CSV or JSONL file object.
+
+    Only `chunk_size` records are held in memory at a time. Short CSV rows are padded with blank
+    cells, rows with more cells than the header raise ValueError naming the line, and JSONL chunks
+    have a column for every key found in any of their records (None where a record lacks it).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'fmt must be one of {FORMATS}')
+    if fmt == 'csv':
+        reader = csv.reader(fileobj)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [name.strip() for name in header]
+        rows = _padded_rows(reader, len(header))
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield dict(zip(header, (list(col) for col in zip(*chunk))))
+    else:
+        lines = (line for line in fileobj if line.strip())
+        while True:
+            records = [json.loads(line) for line in islice(lines, chunk_size)]
+            if not records:
+                return
+            keys = dict.fromkeys(key for record in records for key in record)
+            yield {key: [record.get(key) for record in records] for key in keys}
+
+
+def _padded_rows(reader, width):
+    for row in reader:
+        if not row:
+            continue
+        if len(row) > width:
+            raise ValueError(f'line {reader.line_num}: {len(row)} fields, the header has {width}')
+        yield row + [''] * (width - len(row))
+
+
+def _blank(value):
+    return value is None or str(value).strip() == ''
+
+
+def evaluate_chunk(columns, wind_calc):
+    """
+    Add the wind components and limit checks for a chunk of records to `columns` and return it.
+
+    `runway` and `phase` ('takeoff'/'landing', default takeoff) columns are optional; blank or
+    missing runways fall back to `wind_calc`'s runway heading. Limits come from `wind_calc`. Speeds
+    are in `wind_calc.units` unless a `unit` column gives each record's unit (e.g. KT, MPS, KMH,
+    blank for `wind_calc.units`); the whole chunk is then converted in one pass and the results are
+    in `wind_calc.units`.
+    """
+    size = len(columns['wind_dir'])
+    speed = columns['speed']
+    if columns.get('unit'):
+        units = [wind_calc.units if _blank(unit) else unit for unit in columns['unit']]
+        speed = convert_speed(speed, units, wind_calc.units)
+    runway = columns.get('runway') or [None] * size
+    runway = [wind_calc.runway_heading if _blank(rwy) else rwy for rwy in runway]
+    phase = columns.get('phase') or ['takeoff'] * size
+    tail_limits = {
+        p: wind_calc.max_ldg_tailwind if str(p).strip().lower().startswith('l') else wind_calc.max_to_tailwind
+        for p in set(phase)
+    }
+    max_tail = [tail_limits[p] for p in phase]
+
+    if np is not None:
+        wind_dir = np.asarray(columns['wind_dir'], dtype=float)
+        speed = np.asarray(speed, dtype=float)
+        h_wind, x_wind = get_winds_batch(wind_dir, speed, np.asarray(runway, dtype=float))
+        max_tail = np.asarray(max_tail, dtype=float)
+        within = (np.abs(x_wind) <= wind_calc.max_crosswind) & (h_wind >= -max_tail)
+        h_wind, x_wind, max_tail, within = (arr.tolist() for arr in (h_wind, x_wind, max_tail, within))
+    else:
+        h_wind, x_wind = get_winds_batch([float(w) for w in columns['wind_dir']],
+                                         [float(s) for s in speed],
+                                         [float(r) for r in runway])
+        within = [abs(x) <= wind_calc.max_crosswind and h >= -t for h, x, t in zip(h_wind, x_wind, max_tail)]
+
+    columns['h_wind'] = h_wind
+    columns['x_wind'] = x_wind
+    columns['max_crosswind'] = [wind_calc.max_crosswind] * size
+    columns['max_tailwind'] = max_tail
+    columns['within_limits'] = within
+    return columns
+
+
+def write_chunk(columns, fileobj, fmt='csv', write_header=False, precision=1):
+    """
+    Write a chunk of column lists to `fileobj` as CSV or JSONL, rounding result fields to `precision`.
+    """
+    names = list(columns)
+    for name in ('h_wind', 'x_wind'):
+        if name not in columns:
+            continue
+        if np is not None:
+            columns[name] = np.round(np.asarray(columns[name], dtype=float), precision).tolist()
+        else:
+            columns[name] = [round(val, precision) for val in columns[name]]
+    rows = zip(*(columns[name] for name in names))
+    if fmt == 'csv':
+        writer = csv.writer(fileobj, lineterminator='\n')
+        if write_header:
+            writer.writerow(names)
+        writer.writerows(rows)
+    elif fmt == 'jsonl':
+        fileobj.writelines(json.dumps(dict(zip(names, row))) + '\n' for row in rows)
+    else:
+        raise ValueError(f'fmt must be one of {FORMATS}')
+
+
+def run_batch(infile, outfile, wind_calc, in_fmt='csv', out_fmt='csv', chunk_size=CHUNK_SIZE):
+    """
+    Stream every record in `infile` through `wind_calc` into `outfile` and return the record count.
+    """
+    count = 0
+    for chunk in read_chunks(infile, in_fmt, chunk_size):
+        evaluate_chunk(chunk, wind_calc)
+        write_chunk(chunk, outfile, out_fmt, write_header=(count == 0))
+        count += len(chunk['wind_dir'])
+    return count
@@ -0,0 +1,70 @@
+"""
+Module containing the airport level best-runway selector
+"""
+from collections import namedtuple
+
+from ._compat import np, broadcast_lists
+from .batch import get_winds_batch
+
+RunwayRank = namedtuple('RunwayRank', ['runway', 'h_wind', 'x_wind', 'crosswind_margin', 'within_limits'])
+RunwaySelection = namedtuple('RunwaySelection', ['h_wind', 'x_wind', 'crosswind_margin', 'within_limits',
+                                                 'order'])
+
+
+def select_runways(runways, wind_dirs, velocities, max_cross, max_tail):
+    """
+    Return a RunwaySelection ranking every runway in `runways` for each wind.
+
+    Every field is indexed [wind][runway] except `order`, which holds the runway indices for
+    each wind sorted best first: runways within limits before those outside them, then by
+    greatest headwind, then by greatest crosswind margin. A runway is within limits when its
+    crosswind does not exceed `max_cross` and its tailwind does not exceed `max_tail`.
+
+    With NumPy installed all winds and runways are evaluated in one vectorized pass and the
+    fields are 2d arrays, otherwise they are lists of lists. A runway is a heading or anything
+    with a `heading`, such as an `airports.Runway`.
+    """
+    runways = [getattr(runway, 'heading', runway) for runway in runways]
+    if np is None:
+        return _select_runways_python(runways, wind_dirs, velocities, max_cross, max_tail)
+    wind_dirs = np.atleast_1d(np.asarray(wind_dirs, dtype=float))[:, None]
+    velocities = np.atleast_1d(np.asarray(velocities, dtype=float))[:, None]
+    h_wind, x_wind = get_winds_batch(wind_dirs, velocities, np.asarray(runways, dtype=float)[None, :])
+    margin = max_cross - np.abs(x_wind)
+    within_limits = (margin >= 0) & (h_wind >= -max_tail)
+    order = np.lexsort((-margin, -h_wind, ~within_limits))
+    return RunwaySelection(h_wind, x_wind, margin, within_limits, order)
+
+
+def rank_runways(runways, wind_dir, velocity, max_cross, max_tail):
+    """
+    Return a list of RunwayRank for a single wind, best runway first. Each rank's `runway` is the
+    item from `runways` it was computed for (a heading or e.g. an `airports.Runway`).
+
+    Example:
+
+        >>> [rank.runway for rank in rank_runways([90, 270, 180], 250, 15, 38, 10)]
+        [270, 180, 90]
+    """
+    runways = list(runways)
+    selection = select_runways(runways, [wind_dir], [velocity], max_cross, max_tail)
+    return [
+        RunwayRank(runways[i],
+                   float(selection.h_wind[0][i]),
+                   float(selection.x_wind[0][i]),
+                   float(selection.crosswind_margin[0][i]),
+                   bool(selection.within_limits[0][i]))
+        for i in selection.order[0]
+    ]
+
+
+def _select_runways_python(runways, wind_dirs, velocities, max_cross, max_tail):
+    fields = [[] for _ in RunwaySelection._fields]
+    for wind_dir, velocity in zip(*broadcast_lists(wind_dirs, velocities)):
+        h_wind, x_wind = get_winds_batch(wind_dir, velocity, runways)
+        margin = [max_cross - abs(x) for x in x_wind]
+        within_limits = [m >= 0 and h >= -max_tail for m, h in zip(margin, h_wind)]
+        order = sorted(range(len(runways)), key=lambda i: (not within_limits[i], -h_wind[i], -margin[i]))
+        for field, val in zip(fields, (h_wind, x_wind, margin, within_limits, order)):
+            field.append(val)
+    return RunwaySelection(*fields)
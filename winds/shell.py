@@ -8,11 +8,8 @@ from string import Template
 
 logger = logging.getLogger(__name__)
 
-print(logger)
-
 
 from .calculator import WindCalculator
-from . import max_wind_grid
 
 
 def catch_and_log_error(func):
@@ -55,14 +52,42 @@ class WindShell(cmd.Cmd):
     @catch_and_log_error
     def do_r(self, line):
         """
-        r(runway) heading
+        r(runway) heading | airport runway
+
+        Show runway if no argument provided, or set runway heading. An airport ident (ICAO or
+        IATA) and runway sets the magnetic heading of that runway from the runway database.
+
+        Example:
 
-        Show runway if no argument provided, or set runway heading
+            `r KJFK 22R`
+
+            KJFK RWY 22R (12079 ft ASPH)
+            Runway set to: 224.0°
         """
-        if line:
+        args = line.split()
+        if len(args) == 2:
+            runway = self.wind_calc.set_runway(*args)
+            print(f'{args[0].upper()} RWY {runway.ident} ({runway.length_ft} ft {runway.surface})')
+        elif line:
             self.wind_calc.runway_heading = float(line)
         print(f'Runway set to: {self.wind_calc.runway_heading:3.1f}°')
 
+    @catch_and_log_error
+    def do_apt(self, line):
+        """
+        apt(airport) ident | lat lon
+
+        Show an airport and its runways from the runway database, by ICAO/IATA ident or the
+        airport nearest a position.
+        """
+        from .airports import default_database, format_airport
+        args = line.split()
+        if len(args) == 2:
+            nearby = default_database().nearest(float(args[0]), float(args[1]))[0]
+            print(f'{nearby.distance_nm:.1f} nm: {format_airport(nearby.airport)}')
+        else:
+            print(format_airport(default_database().airport(args[0])))
+
     @catch_and_log_error
     def emptyline(self):
         self.do_show('')
@@ -70,9 +95,11 @@ class WindShell(cmd.Cmd):
     @catch_and_log_error
     def do_set(self, line):
         """
-        set [r[unway] | x[wind] | to[tail] | ldg[tail] value
+        set [r[unway] | x[wind] | to[tail] | ldg[tail] | rcam | u[nits]] value
 
-        set runway, xwind, takeoff tailwind, or landing tailwind limits
+        set runway, xwind, takeoff tailwind, or landing tailwind limits. Setting an RCAM code
+        sets the xwind limit for that runway condition. Setting the units (kts, mps, kmh or mph)
+        converts the limits, and velocities are entered and shown in those units from then on.
 
         Example:
 
@@ -87,9 +114,14 @@ class WindShell(cmd.Cmd):
                 'x': 'max_crosswind',
                 'to': 'max_to_tailwind',
                 'ldg': 'max_ldg_tailwind',
+                'rcam': 'rcam',
+                'u': 'units',
             }
             attr = props[args[0]]
-            val = float(args[1])
+            if attr == 'units':
+                val = args[1]
+            else:
+                val = int(args[1]) if attr == 'rcam' else float(args[1])
 
             setattr(self.wind_calc, attr, val)
         except Exception as e:
@@ -109,9 +141,11 @@ class WindShell(cmd.Cmd):
 
         s = ("""
         RWY HDG [set r]:        {0.runway_heading}º
-        MAX XWIND [set x]:      {0.max_crosswind} kts
-        MAX TO TAIL [set to]:   {0.max_to_tailwind} kts 
-        MAX LDG TAIL [set ldg]: {0.max_ldg_tailwind} kts""".format(self.wind_calc))
+        MAX XWIND [set x]:      {0.max_crosswind:.1f} {0.units}
+        MAX TO TAIL [set to]:   {0.max_to_tailwind:.1f} {0.units}
+        MAX LDG TAIL [set ldg]: {0.max_ldg_tailwind:.1f} {0.units}
+        RCAM [set rcam]:        {0.rcam}
+        UNITS [set u]:          {0.units}""".format(self.wind_calc))
         print(s)
 
     @catch_and_log_error
@@ -130,7 +164,7 @@ class WindShell(cmd.Cmd):
         args = self._cast_float(line)
         result = self.wind_calc.calculate_crosswind(*args)
         prefix = 'L' if result < 0 else 'R'
-        print(f'{prefix} {abs(result):.1f}kts')
+        print(f'{prefix} {abs(result):.1f}{self.wind_calc.units}')
 
     @catch_and_log_error
     def do_h(self, line):
@@ -146,7 +180,7 @@ class WindShell(cmd.Cmd):
         args = self._cast_float(line)
         result = self.wind_calc.calculate_headwind(*args)
         flag = 'TAILWIND' if result < 0 else 'HEADWIND'
-        print(f'{flag} {abs(result):.1f} kts')
+        print(f'{flag} {abs(result):.1f} {self.wind_calc.units}')
 
     @catch_and_log_error
     def do_maxt(self, line):
@@ -159,8 +193,9 @@ class WindShell(cmd.Cmd):
         args = line.split()
         landing_calc = True if args[-1] == 'l' else False
         wind_dir = float(args[0])
-        calc_type = f'Landing Calculation (limit: {self.wind_calc.max_ldg_tailwind:1.1f} kts)' if landing_calc \
-            else f'Takeoff Calculation (limit: {self.wind_calc.max_to_tailwind:1.1f} kts)'
+        units = self.wind_calc.units
+        calc_type = f'Landing Calculation (limit: {self.wind_calc.max_ldg_tailwind:1.1f} {units})' if landing_calc \
+            else f'Takeoff Calculation (limit: {self.wind_calc.max_to_tailwind:1.1f} {units})'
         try:
             result = self.wind_calc.calculate_max_tailwind_velocity(wind_dir, landing=landing_calc)
             print(calc_type)
@@ -178,10 +213,11 @@ class WindShell(cmd.Cmd):
     @catch_and_log_error
     def do_winds(self, line):
         """
-        winds wind_direction velocity
+        winds wind_direction velocity [gust]
 
         Use the current runway heading and calculate both the headwind/tailwind and the crosswind values
-        from a given wind direction and velocity.
+        from a given wind direction and velocity. If a gust is passed, also show the worst case
+        crosswind and tailwind at the gust speed.
 
         Example:
 
@@ -193,31 +229,76 @@ class WindShell(cmd.Cmd):
             Headwind: 15.3
         """
         args = self._cast_float(line)
-        result = self.wind_calc.winds(*args)
-        results = self.wind_calc.winds(*args)
+        wind_dir, velocity, *gust = args
+        results = self.wind_calc.winds(wind_dir, velocity)
         s = Template(
-            '\nWind Components for $wind_dir° @ ${velocity}kts from HDG: $hdg\n\n'
+            '\nWind Components for $wind_dir° @ ${velocity}$units from HDG: $hdg\n\n'
             'Crosswind: $l_or_r $xwind\n'
             '${h_or_t}wind: $hwind\n')
         vals = {
             'wind_dir': args[0],
             'velocity': args[1],
             'hdg': self.wind_calc.runway_heading,
+            'units': self.wind_calc.units,
             'xwind': round(abs(results.x_wind), 1),
             'hwind': round(abs(results.h_wind), 1),
             'h_or_t': 'Tail' if results.h_wind < 0 else 'Head',
             'l_or_r': 'L' if results.x_wind < 0 else 'R'
         }
         print(s.safe_substitute(vals))
+        if gust:
+            worst = self.wind_calc.worst_case_winds(wind_dir, velocity, gust[0])
+            print(f'Gusting {gust[0]}{self.wind_calc.units} worst case -> Crosswind: {worst.x_wind[0]:.1f} '
+                  f'Tailwind: {worst.t_wind[0]:.1f}\n')
+
+    @catch_and_log_error
+    def do_best(self, line):
+        """
+        best wind_direction velocity runway [runway ...] | airport [l]
+
+        Rank the runways at an airport for a wind, best first, using the current crosswind limit
+        and the takeoff tailwind limit (landing limit if `l` is passed). Pass the runway headings,
+        or an airport ident to rank its runways from the runway database.
+
+        Example:
+
+            `best 250 15 90 270 180 l`
+
+            RWY 270º: Headwind: 14.1  Crosswind: L 5.1  OK
+            RWY 180º: Headwind: 5.1   Crosswind: R 14.1 OK
+            RWY 090º: Tailwind: 14.1  Crosswind: R 5.1  OVER LIMITS
+        """
+        args = line.split()
+        landing_calc = args[-1] == 'l'
+        if landing_calc:
+            args = args[:-1]
+        if len(args) == 3 and not args[2].replace('.', '', 1).isdigit():
+            ranks = self.wind_calc.rank_airport(args[2], float(args[0]), float(args[1]), landing=landing_calc)
+        else:
+            wind_dir, velocity, *runways = (float(arg) for arg in args)
+            if not runways:
+                raise ValueError('at least one runway is required')
+            ranks = self.wind_calc.rank_runways(runways, wind_dir, velocity, landing=landing_calc)
+        for rank in ranks:
+            h_or_t = 'Tail' if rank.h_wind < 0 else 'Head'
+            l_or_r = 'L' if rank.x_wind < 0 else 'R'
+            status = 'OK' if rank.within_limits else 'OVER LIMITS'
+            if isinstance(rank.runway, (int, float)):
+                runway = f'{rank.runway % 360 or 360:03.0f}º'
+            else:
+                runway = f'{rank.runway.ident} {rank.runway.heading:03.0f}º'
+            print(f'RWY {runway}: {h_or_t}wind: {abs(rank.h_wind):<5.1f} '
+                  f'Crosswind: {l_or_r} {abs(rank.x_wind):<5.1f}{status}')
 
     @catch_and_log_error
     def do_grid(self, line):
         """
-        grid wind_dir [l(anding calculation]
+        grid wind_dir [l(anding calculation] [g(ust factor)N]
 
         Show max wind with respect to both x-wind and t/h-wind limits for a range of wind
         directions around 'wind_dir'. If 'l' is passed, use the landing limitation for the
-        calculations.
+        calculations. If 'gN' is passed (e.g. 'g10'), show the max steady wind when gusts run
+        N kts above it.
 
             -> r 90 l
             Runway set to: 90º
@@ -234,27 +315,30 @@ class WindShell(cmd.Cmd):
         ------------------------------------------------------
         |38.0 kts | 38.6 kts | 29.2 kts | 20.0 kts|  15.6 kts|
         """
-        args = line.split(' ')
+        args = line.split()
         landing_calc = 'l' in args
+        gust_factor = next((float(arg[1:]) for arg in args[1:] if arg.startswith('g')), 0)
 
         wind_dir = int(args[0])
 
-        ldg_or_head = f'Landing ({self.wind_calc.max_ldg_tailwind} kts)' if landing_calc \
-            else f'Takeoff ({self.wind_calc.max_to_tailwind} kts)'
+        ldg_or_head = f'Landing ({self.wind_calc.max_ldg_tailwind:.1f} {self.wind_calc.units})' if landing_calc \
+            else f'Takeoff ({self.wind_calc.max_to_tailwind:.1f} {self.wind_calc.units})'
         self.onecmd('show')
         print('{: ^50}'.format(f'Using {ldg_or_head} for calculation'))
+        if gust_factor:
+            print('{: ^50}'.format(f'Max steady wind for gusts +{gust_factor} {self.wind_calc.units}'))
         print()
 
-        t_wind_limit = self.wind_calc.max_ldg_tailwind if landing_calc else self.wind_calc.max_to_tailwind
-        max_cross = self.wind_calc.max_crosswind
-        rwy_hdg = self.wind_calc.runway_heading
-        grid = max_wind_grid(wind_dir, 2, t_wind_limit, max_cross, 10, rwy_hdg)
+        grid = self.wind_calc.envelope(landing=landing_calc).window(wind_dir, 2, 10)
+        if gust_factor:
+            from .gusts import apply_gust_factor
+            grid = apply_gust_factor(grid, gust_factor)
 
         def make_col(hdg, val, left_most=False):
             first_char = '|' if left_most else ' '
             header = f'{first_char}  {str(hdg).zfill(3)}º  |'
             if isinstance(val, (float, int)):
-                val_str = f'{first_char}{val: ^4.1f} kts|'
+                val_str = f'{first_char}{val: ^4.1f} {self.wind_calc.units}|'
             else:
                 val_str = f"{first_char}{val: ^8}|"
             out = '\n'.join([header, val_str])
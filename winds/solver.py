@@ -0,0 +1,132 @@
+"""
+Module containing the closed-form max wind solver for combined component limits
+
+For a wind at angle θ off the runway the components are linear in the wind speed, so each limit
+bounds the speed on its own:
+
+    crosswind   peak <= crosswind / |sin θ|
+    tailwind    peak <= tailwind / max(-cos θ, 0)
+    headwind    peak <= headwind / max(cos θ, 0)
+    total       speed <= total
+    gust        peak <= gust
+
+where peak is the steady speed plus the gust factor. The max speed is the smallest bound, and the
+limit giving it is the binding constraint. All directions are solved in one pass: a limit that
+does not apply (no limit, or no such component at that angle) is an inf bound rather than a -1
+sentinel, so results can be compared and reduced directly. A NaN direction is a variable wind
+(VRB) and is held to the worst case of every component.
+"""
+import math
+from collections import namedtuple
+
+from ._compat import np
+
+LIMIT_KINDS = ('crosswind', 'tailwind', 'headwind', 'total', 'gust')
+# components smaller than this fraction of the wind are treated as zero, so e.g. cos(90°) does not
+# turn into a 1e17 kt bound
+EPSILON = 1e-12
+
+WindLimits = namedtuple('WindLimits', LIMIT_KINDS, defaults=(None,) * len(LIMIT_KINDS))
+WindLimits.__doc__ = """
+Component limits for `solve_max_wind`. None (or a negative value, like the -1 used elsewhere)
+means no limit.
+"""
+LimitSolution = namedtuple('LimitSolution', ['velocities', 'binding'])
+
+
+def _limit(value):
+    return math.inf if value is None or value < 0 else float(value)
+
+
+def _factors_python(wind_dir, runway_hdg):
+    """Return the (crosswind, tailwind, headwind) per unit of wind speed, worst case for VRB."""
+    if wind_dir != wind_dir:
+        return 1.0, 1.0, 1.0
+    theta = math.radians(wind_dir - runway_hdg)
+    cross, head = abs(math.sin(theta)), math.cos(theta)
+    factors = cross, max(-head, 0.0), max(head, 0.0)
+    return tuple(0.0 if f < EPSILON else f for f in factors)
+
+
+def solve_max_wind(directions, limits, runway_hdg=360, gust_factor=0):
+    """
+    Return LimitSolution(velocities, binding): the max steady wind speed for every direction in
+    `directions` under `limits` (a `WindLimits`), and the name of the limit that sets it.
+
+    Speeds are inf (and the binding constraint None) where nothing limits the wind, and 0 where the
+    gust factor alone uses up a limit. Returns ndarrays with NumPy installed (`binding` an object
+    array), lists otherwise.
+
+    Example:
+
+        >>> limits = WindLimits(crosswind=38, tailwind=10, total=50)
+        >>> solution = solve_max_wind([270, 180, 90], limits, runway_hdg=270)
+        >>> solution.velocities.tolist(), solution.binding.tolist()
+        ([50.0, 38.0, 10.0], ['total', 'crosswind', 'tailwind'])
+    """
+    bounds = [_limit(getattr(limits, kind)) for kind in LIMIT_KINDS]
+    scalar = not hasattr(directions, '__iter__')
+    if np is None:
+        solution = _solve_python([directions] if scalar else list(directions), bounds, runway_hdg, gust_factor)
+        return LimitSolution(solution.velocities[0], solution.binding[0]) if scalar else solution
+
+    wind_dir = np.atleast_1d(np.asarray(directions, dtype=float))
+    theta = np.radians(wind_dir - runway_hdg)
+    vrb = np.isnan(theta)
+    cross, head = np.abs(np.sin(theta)), np.cos(theta)
+    factors = np.stack([cross, np.maximum(-head, 0.0), np.maximum(head, 0.0)])
+    factors = np.where(vrb, 1.0, np.where(factors < EPSILON, 0.0, factors))
+
+    component_limits = np.asarray(bounds[:3])[:, None]
+    peak = np.full(factors.shape, np.inf)
+    np.divide(component_limits, factors, out=peak, where=factors > 0)
+    candidates = np.vstack([
+        peak - gust_factor,
+        np.full((1, len(wind_dir)), bounds[3]),
+        np.full((1, len(wind_dir)), bounds[4] - gust_factor),
+    ])
+    binding_index = np.argmin(candidates, axis=0)
+    velocities = np.maximum(np.take_along_axis(candidates, binding_index[None], axis=0)[0], 0.0)
+    names = np.array(LIMIT_KINDS, dtype=object)
+    binding = np.where(np.isinf(velocities), None, names[binding_index])
+    if scalar:
+        return LimitSolution(float(velocities[0]), binding[0])
+    return LimitSolution(velocities, binding)
+
+
+def _solve_python(directions, bounds, runway_hdg, gust_factor):
+    velocities, binding = [], []
+    for wind_dir in directions:
+        wind_dir = math.nan if wind_dir is None else float(wind_dir)
+        candidates = [limit / factor - gust_factor if factor > 0 else math.inf
+                      for limit, factor in zip(bounds[:3], _factors_python(wind_dir, runway_hdg))]
+        candidates += [bounds[3], bounds[4] - gust_factor]
+        best = min(range(len(candidates)), key=candidates.__getitem__)
+        velocity = max(candidates[best], 0.0)
+        velocities.append(velocity)
+        binding.append(None if velocity == math.inf else LIMIT_KINDS[best])
+    return LimitSolution(velocities, binding)
+
+
+def solve_envelope(limits, runway_hdg=360, increment=1, gust_factor=0):
+    """
+    Return `solve_max_wind` for every direction around the compass, `increment` degrees apart
+    from 0°, as (directions, LimitSolution).
+    """
+    count = int(round(360 / increment))
+    directions = [i * increment for i in range(count)]
+    return directions, solve_max_wind(directions, limits, runway_hdg, gust_factor)
+
+
+def to_sentinel(velocities):
+    """
+    Return solver velocities with inf replaced by the -1 "no maximum" used by `max_wind_grid`.
+
+    Example:
+
+        >>> to_sentinel([10.0, math.inf])
+        [10.0, -1]
+    """
+    if np is not None and isinstance(velocities, np.ndarray):
+        return np.where(np.isinf(velocities), -1.0, velocities)
+    return [-1 if v == math.inf else v for v in velocities]
@@ -0,0 +1,149 @@
+"""
+Module containing a local stand-in for the METAR/TAF data API
+
+Serves recorded reports from a fixture directory laid out as `<kind>/<STATION>.txt`
+(e.g. `metar/KJFK.txt`) at the same paths `winds.fetch.MetarFetcher` requests, so tests and
+benchmarks run offline. Responses can be delayed and the first requests made to fail, to
+exercise timeouts and retries.
+
+    python -m winds.standin tests/fixtures --port 8080
+"""
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+
+def load_fixtures(directory):
+    """
+    Return {(kind, STATION): report text} for every `<kind>/<STATION>.txt` under `directory`.
+    """
+    return {
+        (path.parent.name.lower(), path.stem.upper()): path.read_text()
+        for path in Path(directory).glob('*/*.txt')
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server.standin
+        status, body = server.respond(self.path)
+        if server.delay:
+            time.sleep(server.delay)
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def setup(self):
+        super().setup()
+        with self.server.standin._lock:
+            self.server.standin.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StandInServer:
+    """
+    Threaded HTTP server serving `fixtures` (a directory or a {(kind, STATION): text} dict).
+
+    `url` is the base URL to hand to `MetarFetcher(base_url=...)`. Every response waits `delay`
+    seconds and the first `fail_first` requests get a 503. `requests` and `connections` count
+    what the server has seen. Use as a context manager or call `start` / `stop`.
+
+    Example:
+
+        >>> with StandInServer('tests/fixtures') as server:  # doctest: +SKIP
+        ...     fetch_winds(['KJFK'], base_url=server.url)
+        {'KJFK': Wind: 240° @ 15.0kts G25.0 (240V300)}
+    """
+
+    def __init__(self, fixtures, host='127.0.0.1', port=0, delay=0, fail_first=0):
+        self.fixtures = dict(fixtures) if isinstance(fixtures, dict) else load_fixtures(fixtures)
+        self.delay = delay
+        self.fail_first = fail_first
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.standin = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/api/data'
+
+    def respond(self, path):
+        """
+        Return (status, body) for a request path like '/api/data/metar?ids=KJFK,KBOS'.
+        """
+        with self._lock:
+            self.requests += 1
+            failing = self.requests <= self.fail_first
+        if failing:
+            return 503, 'Service Unavailable'
+        parts = urlsplit(path)
+        kind = parts.path.rstrip('/').rsplit('/', 1)[-1].lower()
+        stations = ','.join(parse_qs(parts.query).get('ids', [''])).upper().split(',')
+        reports = [self.fixtures[kind, station].strip() for station in stations if (kind, station) in self.fixtures]
+        if not reports:
+            return 404, ''
+        return 200, '\n'.join(reports) + '\n'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve recorded METAR/TAF fixtures over HTTP')
+    parser.add_argument('fixtures', help='directory holding <kind>/<STATION>.txt files')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--delay', type=float, default=0, help='seconds to wait before each response')
+    args = parser.parse_args(argv)
+
+    server = StandInServer(args.fixtures, args.host, args.port, args.delay)
+    print(f'Serving {len(server.fixtures)} reports at {server.url}')
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Module containing the TAF decoder and the forecast wind timeline
+
+A TAF is a base forecast followed by change groups:
+
+    FMDDHHmm            from this time the forecast is replaced
+    BECMG DDHH/DDHH     changing during the period: either wind may blow, then the new one prevails
+    TEMPO DDHH/DDHH     temporarily, on top of the prevailing wind
+    PROBnn [TEMPO] ...  with a probability of nn%, on top of the prevailing wind
+
+`taf_periods` expands the groups into consecutive periods, each holding every wind that may blow
+during it. A `TafTimeline` adds the worst case crosswind/tailwind for a runway to each period, so
+"does the runway stay within limits from 1630Z to 1900Z" is a scan of a few periods. Components
+are computed in one batch per distinct wind and kept, so an amendment (`TafTimeline.amend`) only
+computes the winds it introduces.
+
+    python -m winds.taf taf.txt --runway 220 --max-cross 38 --max-tail 10 --year 2019 --month 7
+"""
+import argparse
+import calendar
+import math
+import re
+import sys
+import time
+from collections import namedtuple
+
+from .archive import metar_timestamp
+from .gusts import worst_case_winds
+from .metar import parse_wind_group
+from .units import DEFAULT_UNIT, convert_speed
+
+Taf = namedtuple('Taf', ['station', 'issued', 'valid_from', 'valid_to', 'amendment', 'groups'])
+TafGroup = namedtuple('TafGroup', ['kind', 'start', 'end', 'wind', 'probability'])
+TafPeriod = namedtuple('TafPeriod', ['start', 'end', 'winds'])
+TimelineInterval = namedtuple('TimelineInterval', ['start', 'end', 'winds', 'x_wind', 't_wind'])
+IntervalMargin = namedtuple('IntervalMargin', ['start', 'end', 'x_margin', 't_margin', 'within_limits'])
+
+# group kinds, in the order a TAF may use them
+BASE, FM, BECMG, TEMPO, PROB = 'BASE', 'FM', 'BECMG', 'TEMPO', 'PROB'
+
+TAF_RE = re.compile(
+    r'(?<!\S)TAF(?:\s+(?P<amendment>AMD|COR))?\s+'
+    r'(?P<station>[A-Z][A-Z0-9]{3})\s+'
+    r'(?P<issued>\d{6})Z\s+'
+    r'(?P<valid>\d{4}/\d{4})(?!\S)'
+)
+CHANGE_RE = re.compile(
+    r'(?<!\S)(?:FM(?P<from>\d{6})'
+    r'|(?:PROB(?P<probability>\d{2})\s+)?(?P<kind>TEMPO|BECMG)\s+(?P<period>\d{4}/\d{4})'
+    r'|PROB(?P<prob_only>\d{2})\s+(?P<prob_period>\d{4}/\d{4}))(?!\S)'
+)
+
+
+def _taf_time(ddhhmm, issued, year, month):
+    """Return epoch seconds for a 'DDHH' or 'DDHHMM' TAF time on or after the issue day."""
+    day, hour, minute = int(ddhhmm[:2]), int(ddhhmm[2:4]), int(ddhhmm[4:6] or 0)
+    timestamp = calendar.timegm((year, month, day, hour, minute, 0))
+    if timestamp < issued - 15 * 86400:
+        # the forecast runs into the next month
+        timestamp += calendar.monthrange(year, month)[1] * 86400
+    return timestamp
+
+
+def parse_taf(text, year, month):
+    """
+    Return a `Taf` decoded from the first TAF in `text`.
+
+    Report times only carry day/hour(/minute), so the `year` and `month` of issue are needed;
+    periods running into the next month are handled. Times are epoch seconds, and each
+    `TafGroup.end` is the end of its period (the end of the TAF for BASE and FM groups). Change
+    groups without a wind group keep their `wind` as None.
+
+    Example:
+
+        >>> taf = parse_taf('TAF KJFK 121130Z 1212/1318 24012KT P6SM FM121800 24018G28KT P6SM', 2019, 7)
+        >>> [(g.kind, g.wind) for g in taf.groups]
+        [('BASE', Wind: 240° @ 12.0kts), ('FM', Wind: 240° @ 18.0kts G28.0)]
+    """
+    header = TAF_RE.search(text)
+    if header is None:
+        raise ValueError(f'no TAF header in {text[:40]!r}')
+    issued = metar_timestamp(header.group('issued'), year, month)
+    valid = header.group('valid').split('/')
+    valid_from, valid_to = (_taf_time(ddhh, issued, year, month) for ddhh in valid)
+    body = text[header.end():].split('=')[0]
+
+    changes = list(CHANGE_RE.finditer(body))
+    base_wind = parse_wind_group(body[:changes[0].start()] if changes else body)
+    if base_wind is None:
+        raise ValueError(f'TAF {header.group("station")} has no wind in its base forecast')
+    groups = [TafGroup(BASE, valid_from, valid_to, base_wind, None)]
+    for i, change in enumerate(changes):
+        segment = body[change.end():changes[i + 1].start() if i + 1 < len(changes) else len(body)]
+        wind = parse_wind_group(segment)
+        if change.group('from'):
+            start, end = _taf_time(change.group('from'), issued, year, month), valid_to
+            groups.append(TafGroup(FM, start, end, wind, None))
+            continue
+        period = change.group('period') or change.group('prob_period')
+        start, end = (_taf_time(ddhh, issued, year, month) for ddhh in period.split('/'))
+        probability = change.group('probability') or change.group('prob_only')
+        kind = change.group('kind') or PROB
+        if probability is not None and kind == TEMPO:
+            kind = PROB
+        groups.append(TafGroup(kind, start, end, wind, None if probability is None else int(probability)))
+    return Taf(header.group('station'), issued, valid_from, valid_to, header.group('amendment'), groups)
+
+
+def _winds_at(groups, moment):
+    prevailing, temporary = [], []
+    for group in groups:
+        if group.wind is None or group.start > moment:
+            continue
+        if group.kind in (BASE, FM):
+            prevailing = [group.wind]
+        elif group.kind == BECMG:
+            prevailing = [group.wind] if group.end <= moment else prevailing + [group.wind]
+        elif moment < group.end:
+            temporary.append(group.wind)
+    return tuple(dict.fromkeys(prevailing + temporary))
+
+
+def taf_periods(taf):
+    """
+    Return the TAF as a list of consecutive TafPeriod(start, end, winds).
+
+    `winds` is a tuple of every wind that may blow during the period: the prevailing wind, both
+    winds during a BECMG change and any TEMPO/PROB winds. Neighbouring periods with the same winds
+    are merged.
+    """
+    times = {taf.valid_from, taf.valid_to}
+    for group in taf.groups:
+        times.update(t for t in (group.start, group.end) if taf.valid_from < t < taf.valid_to)
+    times = sorted(times)
+    periods = []
+    for start, end in zip(times, times[1:]):
+        winds = _winds_at(taf.groups, start)
+        if periods and periods[-1].winds == winds:
+            periods[-1] = periods[-1]._replace(end=end)
+        else:
+            periods.append(TafPeriod(start, end, winds))
+    return periods
+
+
+class TafTimeline:
+    """
+    The worst case wind components on a runway through a TAF, period by period.
+
+    `intervals` is a list of TimelineInterval(start, end, winds, x_wind, t_wind) where `x_wind` and
+    `t_wind` are the largest crosswind and tailwind (in `units`) of any wind in the period,
+    allowing for gusts and variable sectors as `worst_case_winds` does. TAF winds are true: pass
+    the station's `declination` for a magnetic `runway_hdg`.
+
+    `margins` and `within_limits` check the intervals against `max_cross`/`max_tail` (-1 for no
+    limit); change the limits freely, the components do not depend on them.
+    """
+
+    def __init__(self, taf, runway_hdg, max_tail=-1, max_cross=-1, units=DEFAULT_UNIT, declination=0):
+        self.station = taf.station
+        self.runway_hdg = runway_hdg
+        self.max_tail = max_tail
+        self.max_cross = max_cross
+        self.units = units
+        self.declination = declination
+        self.intervals = []
+        self.amendments = 0
+        self._components = {}
+        self._extend(taf_periods(taf))
+
+    def __repr__(self):
+        return f'TafTimeline({self.station}, runway={self.runway_hdg}, intervals={len(self.intervals)})'
+
+    @property
+    def valid_from(self):
+        return self.intervals[0].start
+
+    @property
+    def valid_to(self):
+        return self.intervals[-1].end
+
+    def amend(self, taf):
+        """
+        Apply an amended (or the next) TAF for the station: the timeline from the new TAF's
+        validity start on is replaced, everything before it is kept as it is.
+
+        Only winds the timeline has not seen before have their components computed; return how
+        many that was.
+        """
+        if taf.station != self.station:
+            raise ValueError(f'TAF for {taf.station} cannot amend the {self.station} timeline')
+        kept = [interval for interval in self.intervals if interval.start < taf.valid_from]
+        if kept and kept[-1].end > taf.valid_from:
+            kept[-1] = kept[-1]._replace(end=taf.valid_from)
+        self.intervals = kept
+        self.amendments += 1
+        return self._extend(taf_periods(taf))
+
+    def _extend(self, periods):
+        computed = self._compute({wind for period in periods for wind in period.winds})
+        for period in periods:
+            components = [self._components[wind] for wind in period.winds]
+            interval = TimelineInterval(period.start, period.end, period.winds,
+                                        max(x for x, _ in components), max(t for _, t in components))
+            last = self.intervals[-1] if self.intervals else None
+            if last is not None and last.winds == interval.winds and last.end == interval.start:
+                self.intervals[-1] = last._replace(end=interval.end)
+            else:
+                self.intervals.append(interval)
+        return computed
+
+    def _compute(self, winds):
+        """Compute the worst case components of every new wind in one batch."""
+        pending = [wind for wind in winds if wind not in self._components]
+        if not pending:
+            return 0
+        unit_of = [wind.strength_unit for wind in pending]
+        speeds = convert_speed([wind.strength for wind in pending], unit_of, self.units)
+        gusts = convert_speed([wind.strength if wind.gust is None else wind.gust for wind in pending],
+                              unit_of, self.units)
+        x_wind, t_wind = worst_case_winds(
+            [None if wind.direction is None else wind.direction.value for wind in pending], speeds, gusts,
+            [wind.variable_from for wind in pending], [wind.variable_to for wind in pending],
+            (self.runway_hdg + self.declination) % 360,
+        )
+        for wind, x, t in zip(pending, x_wind, t_wind):
+            self._components[wind] = (float(x), float(t))
+        return len(pending)
+
+    def window(self, start=None, end=None):
+        """
+        Return the intervals overlapping [start, end) (epoch seconds, open ended when None).
+        """
+        start = -math.inf if start is None else start
+        end = math.inf if end is None else end
+        return [interval for interval in self.intervals if interval.end > start and interval.start < end]
+
+    def margins(self, start=None, end=None):
+        """
+        Return an IntervalMargin(start, end, x_margin, t_margin, within_limits) for each interval
+        overlapping [start, end). A margin is the limit less the worst case component (negative
+        when over the limit, inf without a limit).
+        """
+        max_cross = math.inf if self.max_cross == -1 else self.max_cross
+        max_tail = math.inf if self.max_tail == -1 else self.max_tail
+        out = []
+        for interval in self.window(start, end):
+            x_margin, t_margin = max_cross - interval.x_wind, max_tail - interval.t_wind
+            out.append(IntervalMargin(interval.start, interval.end, x_margin, t_margin,
+                                      x_margin >= 0 and t_margin >= 0))
+        return out
+
+    def within_limits(self, start=None, end=None):
+        """
+        Return True if the runway stays within limits for every interval overlapping [start, end).
+        """
+        return all(margin.within_limits for margin in self.margins(start, end))
+
+
+def format_time(timestamp):
+    """
+    Return epoch seconds as a 'DDHHMMZ' report time.
+
+    Example:
+
+        >>> format_time(1562950260)
+        '121651Z'
+    """
+    return time.strftime('%d%H%MZ', time.gmtime(timestamp))
+
+
+def format_timeline(timeline, start=None, end=None):
+    """
+    Return a printable table of the timeline's margins over [start, end).
+    """
+    lines = []
+    for margin, interval in zip(timeline.margins(start, end), timeline.window(start, end)):
+        status = 'OK' if margin.within_limits else 'OVER LIMITS'
+        lines.append(f'{format_time(margin.start)}-{format_time(margin.end)}  '
+                     f'XW {interval.x_wind:5.1f} ({margin.x_margin:+.1f})  '
+                     f'TW {interval.t_wind:5.1f} ({margin.t_margin:+.1f})  {status}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m winds.taf', description=__doc__.splitlines()[1])
+    parser.add_argument('tafs', nargs='+', help='files holding a TAF; later files amend the first')
+    parser.add_argument('--runway', type=float, required=True, help='magnetic runway heading')
+    parser.add_argument('--max-cross', type=float, default=-1)
+    parser.add_argument('--max-tail', type=float, default=-1)
+    parser.add_argument('--declination', type=float, default=0, help='degrees east')
+    parser.add_argument('--year', type=int, required=True)
+    parser.add_argument('--month', type=int, required=True)
+    args = parser.parse_args(argv)
+
+    tafs = []
+    for path in args.tafs:
+        with open(path) as fileobj:
+            tafs.append(parse_taf(fileobj.read(), args.year, args.month))
+    timeline = TafTimeline(tafs[0], args.runway, args.max_tail, args.max_cross, declination=args.declination)
+    for taf in tafs[1:]:
+        timeline.amend(taf)
+    print(format_timeline(timeline))
+    return 0 if timeline.within_limits() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
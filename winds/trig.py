@@ -0,0 +1,45 @@
+"""
+Module containing the precomputed sin/cos lookup table used as an optional trig backend
+"""
+import math
+from math import radians
+
+
+class TrigTable:
+    """
+    Precomputed cos/sin values for every table point in [0, 360).
+
+    Table points are spaced `1 / resolution` degrees apart, so the default resolution of 1
+    holds every whole degree and a resolution of 10 holds every tenth of a degree. Each
+    entry is computed with the same `math` calls the wind functions use, so a table hit
+    returns exactly the value the exact path would have.
+
+    Example:
+
+        >>> table = TrigTable()
+        >>> table.cos_sin(90) == (math.cos(radians(90)), math.sin(radians(90)))
+        True
+        >>> table.cos_sin(90.5) is None
+        True
+    """
+
+    def __init__(self, resolution=1):
+        if int(resolution) != resolution or resolution < 1:
+            raise ValueError('resolution must be a positive whole number of points per degree')
+        self.resolution = int(resolution)
+        self.lookup = {}
+        for i in range(360 * self.resolution):
+            theta = i / self.resolution
+            self.lookup[theta] = (math.cos(radians(theta)), math.sin(radians(theta)))
+
+    def __repr__(self):
+        return f'TrigTable(resolution={self.resolution})'
+
+    def __len__(self):
+        return len(self.lookup)
+
+    def cos_sin(self, theta):
+        """
+        Return (cos, sin) of `theta` degrees if `theta` falls on a table point, else None
+        """
+        return self.lookup.get(theta)
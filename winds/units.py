@@ -0,0 +1,122 @@
+"""
+Module containing the wind speed units engine
+
+Speeds are converted through a table of knots per unit, so converting a whole batch is a single
+multiply (an ndarray with NumPy installed, a list otherwise), even when every value carries its
+own unit. NumPy is only imported the first time an array is converted.
+"""
+from collections import OrderedDict
+
+UNITS = ('kts', 'mps', 'kmh', 'mph')
+DEFAULT_UNIT = 'kts'
+
+METERS_PER_HOUR = {
+    'kts': 1852,
+    'mps': 3600,
+    'kmh': 1000,
+    'mph': 1609.344,
+}
+KNOTS_PER_UNIT = {unit: meters / METERS_PER_HOUR['kts'] for unit, meters in METERS_PER_HOUR.items()}
+
+# spellings seen in METARs, data files and user input
+ALIASES = {
+    'kt': 'kts', 'kts': 'kts', 'knot': 'kts', 'knots': 'kts',
+    'mps': 'mps', 'm/s': 'mps',
+    'kmh': 'kmh', 'km/h': 'kmh', 'kph': 'kmh',
+    'mph': 'mph',
+}
+
+
+def _numpy():
+    from ._compat import np
+    return np
+
+
+def normalize_unit(unit):
+    """
+    Return the canonical name ('kts', 'mps', 'kmh' or 'mph') of a unit spelling.
+
+    Example:
+
+        >>> normalize_unit('KT'), normalize_unit('m/s')
+        ('kts', 'mps')
+    """
+    try:
+        return ALIASES[str(unit).strip().lower()]
+    except KeyError:
+        raise ValueError(f'{unit!r} is not a known speed unit... available units are {list(UNITS)}')
+
+
+def conversion_factor(from_unit, to_unit=DEFAULT_UNIT):
+    """
+    Return the factor that converts a speed in `from_unit` to `to_unit`.
+
+    Example:
+
+        >>> round(conversion_factor('mps', 'kts'), 4)
+        1.9438
+    """
+    from_unit, to_unit = normalize_unit(from_unit), normalize_unit(to_unit)
+    if from_unit == to_unit:
+        return 1.0
+    return METERS_PER_HOUR[from_unit] / METERS_PER_HOUR[to_unit]
+
+
+def _factors(units, to_unit):
+    """Return one conversion factor per entry of `units`, looking each distinct unit up once."""
+    units = units if hasattr(units, '__len__') else list(units)
+    lookup = {unit: conversion_factor(unit, to_unit) for unit in set(units)}
+    np = _numpy()
+    if np is not None:
+        return np.fromiter(map(lookup.__getitem__, units), dtype=float, count=len(units))
+    return list(map(lookup.__getitem__, units))
+
+
+def convert_speed(values, from_unit, to_unit=DEFAULT_UNIT):
+    """
+    Return `values` converted from `from_unit` to `to_unit`.
+
+    `values` is a number (a float is returned) or a sequence/array (an ndarray with NumPy
+    installed, a list otherwise). `from_unit` is one unit for every value, or a sequence with a
+    unit per value for mixed unit batches, e.g. decoded METARs reporting in KT and MPS.
+
+    Example:
+
+        >>> convert_speed(10, 'mps', 'kts')
+        19.438444924406046
+        >>> [round(float(v), 1) for v in convert_speed([10, 10, 10], ['kts', 'mps', 'kmh'])]
+        [10.0, 19.4, 5.4]
+    """
+    mixed = not isinstance(from_unit, str)
+    if not hasattr(values, '__iter__'):
+        if mixed:
+            raise ValueError('a single value needs a single unit')
+        return float(values) * conversion_factor(from_unit, to_unit)
+    factors = _factors(from_unit, to_unit) if mixed else conversion_factor(from_unit, to_unit)
+    np = _numpy()
+    if np is not None:
+        values = np.asarray(values, dtype=float)
+        if mixed and len(factors) != len(values):
+            raise ValueError(f'got {len(factors)} units for {len(values)} values')
+        return values * factors
+    if not mixed:
+        return [float(value) * factors for value in values]
+    values = list(values)
+    if len(factors) != len(values):
+        raise ValueError(f'got {len(factors)} units for {len(values)} values')
+    return [float(value) * factor for value, factor in zip(values, factors)]
+
+
+def convert_grid(grid, from_unit, to_unit=DEFAULT_UNIT):
+    """
+    Return a copy of a {direction: max speed} grid with the speeds in `to_unit`.
+
+    The -1 "no maximum" entries are kept as -1.
+
+    Example:
+
+        >>> convert_grid({0: 10, 90: -1}, 'kts', 'kmh')
+        OrderedDict([(0, 18.52), (90, -1)])
+    """
+    factor = conversion_factor(from_unit, to_unit)
+    return OrderedDict((hdg, speed if speed == -1 else speed * factor) for hdg, speed in grid.items())
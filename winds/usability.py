@@ -0,0 +1,226 @@
+"""
+Module containing the wind rose and runway usability statistics engine
+"""
+import math
+from collections import OrderedDict, namedtuple
+from itertools import accumulate
+
+from ._compat import np
+from .envelope import get_envelope
+from .units import convert_speed
+
+VRB_BIN = 360
+MAX_SPEED = 255
+DIRECTION_BINS = VRB_BIN + 1
+SPEED_BINS = MAX_SPEED + 1
+
+ROSE_SECTORS = 16
+ROSE_SPEEDS = (0, 4, 7, 11, 17, 22, 28, 34, 41)
+CALM_SPEED = 3
+
+# ICAO Annex 14 usability: runways should be usable >= 95% of the time with the crosswind limit
+# for the aeroplane reference field length (< 1200 m, 1200-1499 m, >= 1500 m)
+USABILITY_CRITERION = .95
+ICAO_CROSSWIND_LIMITS = {
+    'A': 10,
+    'B': 13,
+    'C': 20,
+}
+
+WindRose = namedtuple('WindRose', ['sectors', 'speeds', 'counts', 'calm', 'variable', 'total'])
+Usability = namedtuple('Usability', ['usable', 'total', 'fraction'])
+
+
+def _direction_bin(direction):
+    return VRB_BIN if direction is None or direction != direction else int(round(direction)) % 360
+
+
+def _speed_bin(speed):
+    return min(max(int(round(speed)), 0), MAX_SPEED)
+
+
+class WindStats:
+    """
+    Incrementally accumulated wind observations for one airport.
+
+    Observations land in a fixed 361 x 256 histogram (1° direction bins plus one VRB bin, by
+    whole knots), so adding one is O(1) and memory does not grow with the data set. Wind roses and
+    usability for any runway and limit profile are read from the histogram, never from the
+    observations, so new data only has to be added, never rescanned.
+
+    Example:
+
+        >>> stats = WindStats()
+        >>> stats.add_batch([220, 240, 310, None], [12, 25, 18, 3])
+        >>> stats.usability(220, max_tail=10, max_cross=15)
+        Usability(usable=3, total=4, fraction=0.75)
+    """
+
+    def __init__(self):
+        if np is not None:
+            self.counts = np.zeros((DIRECTION_BINS, SPEED_BINS), dtype=np.int64)
+        else:
+            self.counts = [[0] * SPEED_BINS for _ in range(DIRECTION_BINS)]
+        self.total = 0
+
+    def __repr__(self):
+        return f'WindStats(total={self.total})'
+
+    def __iadd__(self, other):
+        self.merge(other)
+        return self
+
+    def add(self, direction, speed):
+        """
+        Add one observation: direction in degrees (None for VRB) and speed in knots.
+        """
+        self.counts[_direction_bin(direction)][_speed_bin(speed)] += 1
+        self.total += 1
+
+    def add_batch(self, directions, speeds):
+        """
+        Add many observations at once. NaN (or None) directions are counted as VRB, and every
+        other direction is wrapped to [0, 360) like `add`.
+        """
+        if np is None:
+            for direction, speed in zip(directions, speeds):
+                self.add(direction, speed)
+            return
+        directions = np.asarray(directions, dtype=float)
+        speeds = np.asarray(speeds, dtype=float)
+        vrb = np.isnan(directions)
+        dir_bins = np.where(vrb, VRB_BIN, np.mod(np.rint(np.where(vrb, 0, directions)), 360)).astype(np.intp)
+        speed_bins = np.clip(np.rint(speeds), 0, MAX_SPEED).astype(np.intp)
+        flat = np.bincount(dir_bins * SPEED_BINS + speed_bins, minlength=DIRECTION_BINS * SPEED_BINS)
+        self.counts += flat.reshape(DIRECTION_BINS, SPEED_BINS)
+        self.total += len(directions)
+
+    def add_wind(self, wind, gusts=False):
+        """
+        Add a WindVector, converted to knots. With `gusts` the gust (if any) is counted instead of
+        the mean wind.
+        """
+        speed = wind.gust if gusts and wind.gust is not None else wind.strength
+        self.add(None if wind.direction is None else wind.direction.value,
+                 convert_speed(speed, wind.strength_unit))
+
+    def add_archive(self, archive, gusts=False, chunk_size=None):
+        """
+        Add every observation in a `archive.WindArchive`, chunk by chunk.
+        """
+        kwargs = {} if chunk_size is None else {'chunk_size': chunk_size}
+        for _, direction, speed, gust in archive.chunks(**kwargs):
+            if np is not None:
+                direction = np.where(np.asarray(direction) == -1, np.nan, direction)
+                speed = np.maximum(speed, gust) if gusts else speed
+                self.add_batch(direction, speed)
+            else:
+                for d, s, g in zip(direction, speed, gust):
+                    self.add(None if d == -1 else d, max(s, g) if gusts else s)
+
+    def merge(self, other):
+        """Add the observations accumulated in another WindStats."""
+        if np is not None:
+            self.counts += np.asarray(other.counts)
+        else:
+            for row, other_row in zip(self.counts, other.counts):
+                for i, val in enumerate(other_row):
+                    row[i] += val
+        self.total += other.total
+
+    def wind_rose(self, sectors=ROSE_SECTORS, speeds=ROSE_SPEEDS, calm=CALM_SPEED):
+        """
+        Return WindRose(sectors, speeds, counts, calm, variable, total).
+
+        `sectors` are the sector center headings and `speeds` the lower bounds (knots) of the speed
+        bands; `counts[i][j]` is the number of observations in sector i and band j. Winds at or
+        below `calm` knots are counted in `calm`, other VRB winds in `variable`, and neither
+        appear in `counts`.
+        """
+        width = 360 / sectors
+        centers = [round(i * width, 1) for i in range(sectors)]
+        band_of_speed = [max(j for j, lower in enumerate(speeds) if lower <= s) for s in range(SPEED_BINS)]
+        sector_of_dir = [int(((d + width / 2) % 360) // width) for d in range(360)]
+
+        if np is not None:
+            # one-hot (sector x direction) @ counts @ (speed x band) sums every bin into its cell
+            # (float64 matmul is exact for counts below 2**53 and far faster than int64)
+            to_sector = np.zeros((sectors, 360))
+            to_sector[sector_of_dir, np.arange(360)] = 1
+            to_band = np.zeros((SPEED_BINS - calm - 1, len(speeds)))
+            to_band[np.arange(SPEED_BINS - calm - 1), band_of_speed[calm + 1:]] = 1
+            rose = (to_sector @ self.counts[:360, calm + 1:] @ to_band).astype(np.int64).tolist()
+            calm_count = int(self.counts[:, :calm + 1].sum())
+            variable = int(self.counts[VRB_BIN, calm + 1:].sum())
+            return WindRose(centers, list(speeds), rose, calm_count, variable, self.total)
+
+        rose = [[0] * len(speeds) for _ in range(sectors)]
+        for direction in range(360):
+            row, sector = self.counts[direction], rose[sector_of_dir[direction]]
+            for speed in range(calm + 1, SPEED_BINS):
+                if row[speed]:
+                    sector[band_of_speed[speed]] += row[speed]
+        calm_count = sum(sum(row[:calm + 1]) for row in self.counts)
+        variable = sum(self.counts[VRB_BIN][calm + 1:])
+        return WindRose(centers, list(speeds), rose, calm_count, variable, self.total)
+
+    def usable_speeds(self, runway_hdg, max_tail=-1, max_cross=-1):
+        """
+        Return the highest usable whole knot speed for every direction bin (VRB last).
+
+        Limits come from `get_max_wind_velocity` via the cached `WindEnvelope`; directions without
+        a limit allow every speed, and VRB winds are held to the lowest limit around the compass.
+        """
+        limits = [MAX_SPEED if val == -1 else min(math.floor(val), MAX_SPEED)
+                  for val in get_envelope(runway_hdg, max_tail, max_cross).velocities]
+        return limits + [min(limits)]
+
+    def usability(self, runway_hdg, max_tail=-1, max_cross=-1):
+        """
+        Return Usability(usable, total, fraction) for one runway and limit profile.
+        """
+        return self._usability(self.usable_speeds(runway_hdg, max_tail, max_cross))
+
+    def usability_table(self, profiles):
+        """
+        Return an OrderedDict {(runway_hdg, max_tail, max_cross): Usability} for every profile, plus
+        a 'combined' entry: the share of observations for which at least one runway is usable.
+
+        All profiles are read from the same histogram, so adding runways or profiles costs no
+        pass over the data.
+        """
+        table = OrderedDict()
+        combined = None
+        cumulative = self._cumulative()
+        for profile in profiles:
+            profile = tuple(profile)
+            speeds = self.usable_speeds(*profile)
+            table[profile] = self._usability(speeds, cumulative)
+            combined = speeds if combined is None else [max(a, b) for a, b in zip(combined, speeds)]
+        if combined is not None:
+            table['combined'] = self._usability(combined, cumulative)
+        return table
+
+    def meets_criterion(self, runways, max_cross, max_tail=-1, criterion=USABILITY_CRITERION):
+        """
+        Return True if the runways together are usable at least `criterion` of the time.
+
+        `max_cross` may be an ICAO field length code from `ICAO_CROSSWIND_LIMITS` ('A', 'B', 'C').
+        """
+        max_cross = ICAO_CROSSWIND_LIMITS.get(max_cross, max_cross)
+        table = self.usability_table((runway, max_tail, max_cross) for runway in runways)
+        return table['combined'].fraction >= criterion
+
+    def _cumulative(self):
+        """Return counts summed over speed, so [direction][speed] counts winds at or below that speed."""
+        if np is not None:
+            return np.cumsum(self.counts, axis=1)
+        return [list(accumulate(row)) for row in self.counts]
+
+    def _usability(self, usable_speeds, cumulative=None):
+        cumulative = self._cumulative() if cumulative is None else cumulative
+        if np is not None:
+            usable = int(cumulative[np.arange(DIRECTION_BINS), usable_speeds].sum())
+        else:
+            usable = sum(row[speed] for row, speed in zip(cumulative, usable_speeds))
+        return Usability(usable, self.total, usable / self.total if self.total else float('nan'))
@@ -6,45 +6,52 @@ __version__ = '1.0.0'
 
 from math import radians
 import math
+import numbers
 from collections import namedtuple, OrderedDict
-import cmd
-from string import Template
-import logging
-from functools import wraps
-import argparse
+
+from .config import Config
 
 Wind = namedtuple('Wind', ['h_wind', 'x_wind'])
 
-# TODO: Add RCAM value mapping
 # TODO: Add max x_wind value to grid function header
 
 MAX_XWIND = 38
 MAX_TO_TAILWIND = 15
 MAX_LAND_TAILWIND = 10
 
+GRID_PRECISION = 6
+
 
 class Direction:
+    """
+    Immutable compass direction. Values are normalized to [0, 360) and compared, hashed and
+    displayed rounded to `PRECISION` decimal places.
+    """
+    __slots__ = ('_value',)
     PRECISION = 1
+
     def __init__(self, initial):
-        self._value = initial
-        
+        if isinstance(initial, Direction):
+            initial = initial._value
+        object.__setattr__(self, '_value', initial)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __reduce__(self):
+        return type(self), (self._value,)
+
     def __repr__(self):
         return f'Direction({self.value})'
-       
+
     @staticmethod
     def normalize(value):
         return value % 360
-        
+
     @property
     def value(self):
-        return round(self.normalize(self._value), self.PRECISION)
-        
-    @value.setter
-    def value(self, val):
-        if not isinstance(val, (float, int)):
-            raise TypeError('val must be int or float')
-        self._value = val
-        
+        return round(self._value % 360, self.PRECISION)
+
     def theta(self, other):
         """
         Return the number of degrees clockwise from object's `value` attribute to 
@@ -60,17 +67,17 @@ class Direction:
         if isinstance(other, Direction):
             other = other._value
         return Direction(float((other - self._value) % 360))
-         
+
     def __add__(self, other):
         if isinstance(other, Direction):
             other = other._value
         return Direction(self._value + other)
-        
+
     def __sub__(self, other):
         if isinstance(other, Direction):
             other = other._value
-        return self + Direction(-1 * other)
-        
+        return Direction(self._value - other)
+
     def __eq__(self, other):
         """
         Return True if other == self within the precision of `Direction`
@@ -82,32 +89,117 @@ class Direction:
             True
             
         """
-        if not isinstance(other, Direction):
-            other = Direction(other)
-        return other.value == self.value
-        
+        if isinstance(other, Direction):
+            other = other._value
+        elif not isinstance(other, numbers.Real):
+            return NotImplemented
+        return round(other % 360, self.PRECISION) == self.value
+
+    def __hash__(self):
+        return hash(self.value)
 
 
 class WindVector:
-    def __init__(self, direction, strength, strength_unit='kts'):
-        self.direction = Direction(direction)
-        self.strength = strength
-        self.strength_unit = strength_unit
-        
+    """
+    Immutable wind: a `Direction` and a strength in `strength_unit`.
+
+    `direction` is None for variable (VRB) winds. `gust` is the gust strength, and
+    `variable_from`/`variable_to` hold the sector of a variable direction group (e.g. 240V300).
+    """
+    __slots__ = ('direction', 'strength', 'strength_unit', 'gust', 'variable_from', 'variable_to')
+
+    def __init__(self, direction, strength, strength_unit='kts', gust=None, variable_from=None,
+                 variable_to=None):
+        set_attr = object.__setattr__
+        set_attr(self, 'direction', None if direction is None else Direction(direction))
+        set_attr(self, 'strength', strength)
+        set_attr(self, 'strength_unit', strength_unit)
+        set_attr(self, 'gust', gust)
+        set_attr(self, 'variable_from', variable_from)
+        set_attr(self, 'variable_to', variable_to)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __reduce__(self):
+        direction = None if self.direction is None else self.direction._value
+        return type(self), (direction, self.strength, self.strength_unit, self.gust, self.variable_from,
+                            self.variable_to)
+
     def __repr__(self):
-        return f'Wind: {self.direction.value}° @ {self.strength:.1f}{self.strength_unit}'
-        
+        direction = 'VRB' if self.direction is None else f'{self.direction.value}°'
+        gust = '' if self.gust is None else f' G{self.gust:.1f}'
+        variable = '' if self.variable_from is None else f' ({self.variable_from}V{self.variable_to})'
+        return f'Wind: {direction} @ {self.strength:.1f}{self.strength_unit}{gust}{variable}'
+
+    def __eq__(self, other):
+        if not isinstance(other, WindVector):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def _key(self):
+        return (self.direction, self.strength, self.strength_unit, self.gust, self.variable_from,
+                self.variable_to)
+
+    @property
+    def is_variable(self):
+        return self.direction is None or self.variable_from is not None
+
+    def to_unit(self, unit):
+        """
+        Return this wind with its strength and gust converted to `unit` ('kts', 'mps', 'kmh' or 'mph').
+
+        Example:
+
+            >>> WindVector(240, 10, 'mps', gust=15).to_unit('kts')
+            Wind: 240° @ 19.4kts G29.2
+        """
+        from .units import convert_speed, normalize_unit
+        unit = normalize_unit(unit)
+        gust = None if self.gust is None else convert_speed(self.gust, self.strength_unit, unit)
+        return WindVector(self.direction, convert_speed(self.strength, self.strength_unit, unit), unit, gust,
+                          self.variable_from, self.variable_to)
+
     def to_tuple(self):
-        return (self.direction.value, self.strength)
-        
+        return (None if self.direction is None else self.direction.value, self.strength)
+
+
+_trig_lookup = None
+
+
+def set_trig_table(table):
+    """
+    Use a `trig.TrigTable` for the component functions, or pass None to go back to exact math.
+
+    When a table is set, `get_winds`, `get_headwind` and `get_crosswind` read cos/sin from the
+    table whenever the runway relative angle falls on a table point and call `math` otherwise.
+    Results are identical either way.
+
+    Example:
+
+        >>> from winds.trig import TrigTable
+        >>> set_trig_table(TrigTable(resolution=10))
+        >>> set_trig_table(None)
+    """
+    global _trig_lookup
+    _trig_lookup = None if table is None else table.lookup
+
 
 def get_winds(wind, velocity, runway=360):
     """Return Wind(h_wind, x_wind) tuple."""
     runway %= 360
     wind %= 360
     theta = (runway - wind) % 360
-    x_wind = get_crosswind(wind, velocity, runway)
-    h_wind = get_headwind(wind, velocity, runway)
+    if _trig_lookup is not None:
+        cos_sin = _trig_lookup.get(theta)
+        if cos_sin is not None:
+            return Wind(cos_sin[0] * velocity, cos_sin[1] * velocity * -1)
+    theta = radians(theta)
+    h_wind = math.cos(theta) * velocity
+    x_wind = math.sin(theta) * velocity * -1
     return Wind(h_wind, x_wind)
 
 
@@ -116,6 +208,10 @@ def get_headwind(wind, velocity, runway=360):
     runway %= 360
     wind %= 360
     theta = (runway - wind) % 360
+    if _trig_lookup is not None:
+        cos_sin = _trig_lookup.get(theta)
+        if cos_sin is not None:
+            return cos_sin[0] * velocity
     return math.cos(radians(theta)) * velocity
 
 
@@ -124,6 +220,10 @@ def get_crosswind(wind, velocity, runway=360):
     runway %= 360
     wind %= 360
     theta = (runway - wind) % 360
+    if _trig_lookup is not None:
+        cos_sin = _trig_lookup.get(theta)
+        if cos_sin is not None:
+            return cos_sin[1] * velocity * -1
     return math.sin(radians(theta)) * velocity * -1
 
 
@@ -149,55 +249,97 @@ def get_max_tailwind_velocity(max_component, wind_dir, runway=360):
             return -1
 
 
+def grid_headings(wind_hdg, num, increment=10):
+    """
+    Return the `2 * num + 1` wind headings, `increment` degrees apart, centered on `wind_hdg`.
+
+    Headings are normalized to [0, 360). Float increments are rounded to `GRID_PRECISION`
+    decimals so accumulated float error does not leak into the headings.
+
+    Example:
+
+        >>> grid_headings(360, 2)
+        [340, 350, 0, 10, 20]
+        >>> grid_headings(90, 1, .1)
+        [89.9, 90.0, 90.1]
+    """
+    left_bucket = wind_hdg - (num * increment)
+    headings = [(left_bucket + i * increment) % 360 for i in range(2 * num + 1)]
+    if all(isinstance(val, int) for val in (wind_hdg, increment)):
+        return headings
+    return [round(hdg, GRID_PRECISION) % 360 for hdg in headings]
+
+
+def get_max_wind_velocity(max_tail, max_cross, wind_dir, runway=360):
+    """
+    Return the maximum velocity for a wind direction that satisfies both the tailwind and the
+    crosswind limits. Pass -1 for a limit to ignore it. Return -1 if the value is incalculable.
+    """
+    find_xwind = max_cross >= 0
+    find_twind = max_tail >= 0
+
+    if find_xwind:
+        max_xwind_velocity = get_max_crosswind_velocity(max_cross, wind_dir, runway)
+        if not find_twind:
+            return max_xwind_velocity
+    else:
+        max_xwind_velocity = -1
+
+    if find_twind:
+        max_twind_velocity = get_max_tailwind_velocity(max_tail, wind_dir, runway)
+        if not find_xwind:
+            return max_twind_velocity
+    else:
+        max_twind_velocity = -1
+
+    # both requested both calculable
+    if max_twind_velocity != -1 and max_xwind_velocity != -1:
+        return min(max_xwind_velocity, max_twind_velocity)
+    return max(max_twind_velocity, max_xwind_velocity)
+
+
 def max_wind_grid(wind_hdg,
                   num,
                   max_tail=-1,
                   max_cross=-1,
                   increment=10,
-                  runway_hdg=360):
+                  runway_hdg=360,
+                  rcam=None,
+                  unit='kts',
+                  to_unit=None):
+    """
+    Return an OrderedDict of the max wind velocity for each of the `2 * num + 1` directions around
+    `wind_hdg` (-1 where there is no maximum).
+
+    `max_tail` and `max_cross` are in `unit` (an RCAM crosswind limit is converted to it), and so
+    are the velocities unless `to_unit` asks for another unit.
+
+    Example:
+
+        >>> max_wind_grid(180, 1, max_tail=10, increment=90, to_unit='kmh')
+        OrderedDict([(90, -1), (180, 18.52), (270, -1)])
+    """
+    if rcam is not None:
+        max_cross = Config().get_max_crosswind(rcam)
+        if unit != 'kts':
+            from .units import convert_speed
+            max_cross = convert_speed(max_cross, 'kts', unit)
     try:
         find_xwind = True if max_cross >= 0 else False
         find_twind = True if max_tail >= 0 else False
         assert any([find_twind, find_xwind])
     except AssertionError as e:
         raise ValueError('must provide either max_tail or max_cross')
-    left_bucket = (wind_hdg - (num * increment)) % 360
-    right_bucket = ((wind_hdg) + (num * increment)) % 360
-    buckets = []
-    idx = left_bucket - increment
-    idx %= 360
-    while idx != right_bucket:
-        idx += increment
-        idx %= 360
-        buckets.append(idx)
+    buckets = grid_headings(wind_hdg, num, increment)
 
     out = OrderedDict()
 
     for theta in buckets:
+        out[theta] = get_max_wind_velocity(max_tail, max_cross, theta, runway_hdg)
 
-        if find_xwind:
-            max_xwind_velocity = get_max_crosswind_velocity(max_cross, theta, runway_hdg)
-            if not find_twind:
-                out[theta] = max_xwind_velocity
-                continue
-        else:
-            max_xwind_velocity = -1
-
-        if find_twind:
-            max_twind_velocity = get_max_tailwind_velocity(max_tail, theta, runway_hdg)
-            if not find_xwind:
-                out[theta] = max_twind_velocity
-                continue
-        else:
-            max_twind_velocity = -1
-
-        # both requested both calculable
-        if max_twind_velocity != -1 and max_xwind_velocity != -1:
-            out[theta] = min(max_xwind_velocity, max_twind_velocity)
-            continue
-        else:
-            out[theta] = max(max_twind_velocity, max_xwind_velocity)
-
+    if to_unit is not None and to_unit != unit:
+        from .units import convert_grid
+        return convert_grid(out, unit, to_unit)
     return out
 
 